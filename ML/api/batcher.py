@@ -0,0 +1,65 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Tuple
+
+
+class MicroBatcher:
+    """
+    Объединяет одновременные запросы на классификацию в один пакет:
+    фоновый поток ждёт до max_wait секунд (или до max_batch текстов)
+    и вызывает predict_batch один раз для всех накопленных запросов.
+    """
+
+    def __init__(self, predict_batch: Callable[[List[str]], List], max_batch: int = 64, max_wait: float = 0.01):
+        self.predict_batch = predict_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batches = 0
+        self.requests = 0
+        self._queue: "queue.Queue[Tuple[List[str], Future]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._worker, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def submit(self, texts: List[str], timeout: float | None = None) -> List:
+        future: Future = Future()
+        self._queue.put((list(texts), future))
+        return future.result(timeout=timeout)
+
+    def _worker(self):
+        while True:
+            batch = [self._queue.get()]
+            count = len(batch[0][0])
+            deadline = time.monotonic() + self.max_wait
+            while count < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                count += len(item[0])
+            self._run(batch)
+
+    def _run(self, batch: List[Tuple[List[str], Future]]):
+        texts = [text for chunk, _ in batch for text in chunk]
+        try:
+            results = self.predict_batch(texts)
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.requests += len(batch)
+        offset = 0
+        for chunk, future in batch:
+            future.set_result(results[offset:offset + len(chunk)])
+            offset += len(chunk)
@@ -0,0 +1,117 @@
+import logging
+import os
+import threading
+import traceback
+from flask import Flask, request
+from ML.api.batcher import MicroBatcher
+from ML.classifier.model_registry import ModelRegistry
+
+logger = logging.getLogger(__name__)
+
+ML_API_PORT = int(os.getenv("ML_API_PORT", "8000"))
+ML_MODELS_DIR = os.getenv("ML_MODELS_DIR") or None
+ML_API_MAX_BATCH = int(os.getenv("ML_API_MAX_BATCH", "64"))
+ML_API_MAX_WAIT = float(os.getenv("ML_API_MAX_WAIT", "0.01"))
+ML_API_REQUEST_TIMEOUT = float(os.getenv("ML_API_REQUEST_TIMEOUT", "30"))
+
+
+class InferenceApp:
+    """HTTP-сервис классификации писем: модель живёт здесь, а не в процессе бота."""
+
+    def __init__(self, model_dir: str | None = ML_MODELS_DIR, max_batch: int = ML_API_MAX_BATCH,
+                 max_wait: float = ML_API_MAX_WAIT, registry: ModelRegistry | None = None):
+        self.app = Flask(__name__)
+        self.registry = registry or ModelRegistry(model_dir)
+        self.load_error: str | None = None
+        self.batcher = MicroBatcher(self._predict_batch, max_batch=max_batch, max_wait=max_wait)
+        self._register_routes()
+
+    @property
+    def classifier(self):
+        return self.registry.active
+
+    def load_model(self):
+        try:
+            self.registry.check()
+            self.load_error = None if self.registry.active else "модель не загружена, подробности в логе"
+        except Exception as e:
+            self.load_error = str(e)
+            logger.error(f"Не удалось загрузить модель: {e}\n{traceback.format_exc()}")
+
+    def _predict_batch(self, texts):
+        return self.registry.batch_predict(texts)
+
+    def _register_routes(self):
+        @self.app.route("/predict", methods=["POST"])
+        def predict():
+            if self.classifier is None:
+                return {"error": "model is not loaded"}, 503
+            data = request.get_json(silent=True) or {}
+            text = data.get("text")
+            if not isinstance(text, str):
+                return {"error": "field 'text' is required"}, 400
+            return self.batcher.submit([text], timeout=ML_API_REQUEST_TIMEOUT)[0], 200
+
+        @self.app.route("/predict_batch", methods=["POST"])
+        def predict_batch():
+            if self.classifier is None:
+                return {"error": "model is not loaded"}, 503
+            data = request.get_json(silent=True) or {}
+            texts = data.get("texts")
+            if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                return {"error": "field 'texts' must be a list of strings"}, 400
+            return {"results": self.batcher.submit(texts, timeout=ML_API_REQUEST_TIMEOUT)}, 200
+
+        @self.app.route("/health")
+        def health():
+            return {
+                "status": "ok",
+                "batches": self.batcher.batches,
+                "requests": self.batcher.requests,
+                "queue_depth": self.batcher.depth,
+                "cache": self.registry.cache.stats() if self.registry.cache else None,
+                "model_version": self.registry.active_version,
+            }, 200
+
+        @self.app.route("/ready")
+        def ready():
+            if self.classifier is None:
+                return {"status": "error" if self.load_error else "loading", "error": self.load_error}, 503
+            return {
+                "status": "ready",
+                "model_version": self.registry.active_version,
+                "categories": [str(c) for c in self.classifier.label_encoder.classes_],
+            }, 200
+
+        @self.app.route("/model")
+        def model_status():
+            return self.registry.status(), 200
+
+        @self.app.route("/model/activate", methods=["POST"])
+        def model_activate():
+            data = request.get_json(silent=True) or {}
+            version = data.get("version")
+            if not isinstance(version, str):
+                return {"error": "field 'version' is required"}, 400
+            if not self.registry.activate(version):
+                return {"error": f"version {version} could not be loaded"}, 409
+            return self.registry.status(), 200
+
+        @self.app.route("/model/rollback", methods=["POST"])
+        def model_rollback():
+            try:
+                self.registry.rollback()
+            except ValueError as e:
+                return {"error": str(e)}, 409
+            return self.registry.status(), 200
+
+    def run(self, port: int = ML_API_PORT):
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        threading.Thread(target=self.load_model, name="model-loader", daemon=True).start()
+        self.registry.start_watching()
+        logger.info(f"Запуск InferenceApp на порту {port}")
+        self.app.run(host='0.0.0.0', port=port, threaded=True, use_reloader=False)
+
+
+if __name__ == "__main__":
+    InferenceApp().run()
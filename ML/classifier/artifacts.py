@@ -0,0 +1,180 @@
+"""
+Экспорт обученной модели в формат, который можно отображать в память (np.load(mmap_mode='r')).
+
+Поддерживаются два формата: "linear-npy" (словарь TfidfVectorizer в vocabulary.json)
+и "hashing-npy" (HashingTfidfVectorizer, словаря нет вовсе — только idf.npy).
+
+Вместо pickle каждый процесс открывает одни и те же .npy файлы: страницы с весами
+SVM и idf берутся из page cache ОС и разделяются между воркерами на одном хосте,
+а холодная загрузка сводится к чтению небольшого manifest.json и словаря.
+
+Запуск: python -m ML.classifier.artifacts [--model-dir ML/models] [--out ML/models]
+"""
+import argparse
+import json
+import logging
+import os
+import pickle
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.preprocessing import LabelEncoder
+from ML.classifier.hashing_vectorizer import HashingTfidfVectorizer, normalize_rows
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+VOCABULARY_FILE = "vocabulary.json"
+FORMAT_NAME = "linear-npy"
+HASHING_FORMAT_NAME = "hashing-npy"
+FORMAT_VERSION = 1
+
+# Параметры TfidfVectorizer, которые нужны для воспроизведения transform
+_VECTORIZER_PARAMS = (
+    'analyzer', 'binary', 'lowercase', 'ngram_range', 'stop_words', 'strip_accents', 'token_pattern',
+)
+_TFIDF_PARAMS = ('norm', 'use_idf', 'sublinear_tf')
+
+
+class ArtifactVectorizer:
+    """TF-IDF поверх CountVectorizer с фиксированным словарём и idf из .npy"""
+
+    def __init__(self, vocabulary: dict, idf: np.ndarray | None, params: dict, norm: str | None = 'l2',
+                 sublinear_tf: bool = False):
+        params = dict(params)
+        if params.get('ngram_range') is not None:
+            params['ngram_range'] = tuple(params['ngram_range'])
+        self._counter = CountVectorizer(vocabulary=vocabulary, dtype=np.float64, **params)
+        self.vocabulary_ = vocabulary
+        self.idf_ = idf
+        self.norm = norm
+        self.sublinear_tf = sublinear_tf
+
+    def transform(self, texts):
+        features = self._counter.transform(texts)
+        if self.sublinear_tf:
+            np.log(features.data, features.data)
+            features.data += 1
+        if self.idf_ is not None:
+            features.data *= self.idf_[features.indices]
+        if self.norm:
+            normalize_rows(features, self.norm)
+        return features
+
+
+class ArtifactLinearModel:
+    """decision_function/predict линейной модели (LinearSVC) на весах из .npy"""
+
+    def __init__(self, coef: np.ndarray, intercept: np.ndarray, classes: np.ndarray):
+        self.coef_ = coef
+        self.intercept_ = intercept
+        self.classes_ = classes
+
+    def decision_function(self, features) -> np.ndarray:
+        scores = np.asarray(features @ self.coef_.T) + self.intercept_
+        return scores.ravel() if scores.shape[1] == 1 else scores
+
+    def predict(self, features) -> np.ndarray:
+        scores = self.decision_function(features)
+        if scores.ndim == 1:
+            return self.classes_[(scores > 0).astype(int)]
+        return self.classes_[scores.argmax(axis=1)]
+
+
+def export_artifacts(vectorizer, model, label_encoder, out_dir: str, source_metadata: dict | None = None) -> dict:
+    """Сохраняет веса и словарь обученных vectorizer/model/label_encoder в out_dir."""
+    os.makedirs(out_dir, exist_ok=True)
+    params = vectorizer.get_params()
+    hashing = isinstance(vectorizer, HashingTfidfVectorizer)
+
+    np.save(os.path.join(out_dir, "coef.npy"), np.ascontiguousarray(model.coef_, dtype=np.float64))
+    np.save(os.path.join(out_dir, "intercept.npy"), np.asarray(model.intercept_, dtype=np.float64))
+    np.save(os.path.join(out_dir, "model_classes.npy"), np.asarray(model.classes_))
+    if hashing or params.get('use_idf', True):
+        np.save(os.path.join(out_dir, "idf.npy"), np.asarray(vectorizer.idf_, dtype=np.float64))
+
+    manifest = {
+        'format': HASHING_FORMAT_NAME if hashing else FORMAT_NAME,
+        'format_version': FORMAT_VERSION,
+        'categories': [str(c) for c in label_encoder.classes_],
+        'created_at': (source_metadata or {}).get('created_at'),
+    }
+    if hashing:
+        manifest['vectorizer'] = params
+        manifest['features'] = int(np.count_nonzero(vectorizer.idf_))
+    else:
+        vocabulary = {term: int(index) for term, index in vectorizer.vocabulary_.items()}
+        with open(os.path.join(out_dir, VOCABULARY_FILE), 'w', encoding='utf-8') as f:
+            json.dump(vocabulary, f, ensure_ascii=False)
+        manifest['vectorizer'] = {name: params[name] for name in _VECTORIZER_PARAMS}
+        manifest['tfidf'] = {name: params[name] for name in _TFIDF_PARAMS}
+        manifest['features'] = len(vocabulary)
+
+    with open(os.path.join(out_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    return manifest
+
+
+def read_manifest(model_dir: str) -> dict | None:
+    path = os.path.join(model_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('format') not in (FORMAT_NAME, HASHING_FORMAT_NAME) or manifest.get('format_version') != FORMAT_VERSION:
+        logger.warning(f"Неизвестный формат артефактов в {path}: {manifest.get('format')}")
+        return None
+    return manifest
+
+
+def load_artifacts(model_dir: str, manifest: dict, mmap_mode: str | None = 'r'):
+    """Возвращает (vectorizer, model, label_encoder); массивы отображаются в память."""
+    def load(name):
+        return np.load(os.path.join(model_dir, name), mmap_mode=mmap_mode)
+
+    if manifest['format'] == HASHING_FORMAT_NAME:
+        vectorizer = HashingTfidfVectorizer(idf=load("idf.npy"), **manifest['vectorizer'])
+    else:
+        with open(os.path.join(model_dir, VOCABULARY_FILE), encoding='utf-8') as f:
+            vocabulary = json.load(f)
+        tfidf = manifest['tfidf']
+        vectorizer = ArtifactVectorizer(
+            vocabulary,
+            load("idf.npy") if tfidf.get('use_idf', True) else None,
+            manifest['vectorizer'],
+            norm=tfidf.get('norm'),
+            sublinear_tf=tfidf.get('sublinear_tf', False),
+        )
+    model = ArtifactLinearModel(load("coef.npy"), load("intercept.npy"), load("model_classes.npy"))
+
+    label_encoder = LabelEncoder()
+    label_encoder.classes_ = np.array(manifest['categories'], dtype=object)
+    return vectorizer, model, label_encoder
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Экспорт модели в формат .npy для mmap-загрузки")
+    default_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models")
+    parser.add_argument("--model-dir", default=default_dir, help="папка с model.pkl, vectorizer.pkl, label_encoder.pkl")
+    parser.add_argument("--out", default=None, help="куда сохранить артефакты (по умолчанию --model-dir)")
+    args = parser.parse_args()
+
+    import joblib
+    model = joblib.load(os.path.join(args.model_dir, "model.pkl"))
+    with open(os.path.join(args.model_dir, "vectorizer.pkl"), 'rb') as f:
+        vectorizer = pickle.load(f)
+    with open(os.path.join(args.model_dir, "label_encoder.pkl"), 'rb') as f:
+        label_encoder = pickle.load(f)
+
+    metadata = None
+    metadata_path = os.path.join(args.model_dir, "metadata.json")
+    if os.path.exists(metadata_path):
+        with open(metadata_path, encoding='utf-8') as f:
+            metadata = json.load(f)
+
+    out_dir = args.out or args.model_dir
+    manifest = export_artifacts(vectorizer, model, label_encoder, out_dir, metadata)
+    print(f"Артефакты сохранены в {out_dir}: {manifest['features']} признаков, категории {manifest['categories']}")
+
+
+if __name__ == "__main__":
+    main()
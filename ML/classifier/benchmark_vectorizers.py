@@ -0,0 +1,113 @@
+"""
+Сравнение векторизаторов: vectorizer.pkl (TfidfVectorizer), тот же словарь в формате
+linear-npy и HashingTfidfVectorizer (hashing-npy).
+
+Для каждого варианта измеряются время загрузки, память процесса после загрузки
+(tracemalloc; mmap-массивы в него не попадают — отдельно выводится размер .npy
+файлов модели вместе с весами SVM, они разделяются между процессами),
+пропускная способность transform на пакетах и точность классификатора на test.csv.
+
+Запуск: python -m ML.classifier.benchmark_vectorizers [--batch-size 256] [--repeats 5]
+"""
+import argparse
+import gc
+import os
+import pickle
+import statistics
+import time
+import tracemalloc
+import warnings
+import numpy as np
+import pandas as pd
+from ML.classifier.artifacts import load_artifacts, read_manifest
+from ML.classifier.predictor import EmailClassifier
+from ML.classifier.preprocessor import clean_email_texts
+
+ML_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODELS_DIR = os.path.join(ML_DIR, "models")
+
+
+def _load_pickle_vectorizer(model_dir):
+    with open(os.path.join(model_dir, "vectorizer.pkl"), 'rb') as f:
+        return pickle.load(f)
+
+
+def _load_npy_vectorizer(model_dir):
+    return load_artifacts(model_dir, read_manifest(model_dir))[0]
+
+
+def _pickle_classifier(model_dir):
+    return EmailClassifier(model_dir, prefer_artifacts=False)
+
+
+def _mapped_size(model_dir) -> int:
+    return sum(os.path.getsize(os.path.join(model_dir, name)) for name in os.listdir(model_dir) if name.endswith('.npy'))
+
+
+def measure(name, load_vectorizer, load_classifier, model_dir, texts, clean_texts, labels, batch_size, repeats):
+    load_times = []
+    for _ in range(repeats):
+        gc.collect()
+        started = time.perf_counter()
+        load_vectorizer(model_dir)
+        load_times.append(time.perf_counter() - started)
+
+    gc.collect()
+    tracemalloc.start()
+    vectorizer = load_vectorizer(model_dir)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    batches = [clean_texts[i:i + batch_size] for i in range(0, len(clean_texts), batch_size)]
+    started = time.perf_counter()
+    for _ in range(repeats):
+        for batch in batches:
+            vectorizer.transform(batch)
+    throughput = repeats * len(clean_texts) / (time.perf_counter() - started)
+
+    classifier = load_classifier(model_dir)
+    predicted = [r['category'] for r in classifier.batch_predict(texts)]
+    accuracy = float(np.mean(np.asarray(predicted) == np.asarray(labels)))
+
+    return {
+        'name': name,
+        'load_ms': statistics.median(load_times) * 1000,
+        'heap_kb': memory / 1024,
+        'mmap_kb': _mapped_size(model_dir) / 1024 if load_vectorizer is not _load_pickle_vectorizer else 0.0,
+        'texts_per_s': throughput,
+        'accuracy': accuracy,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк TF-IDF и hashing векторизаторов")
+    parser.add_argument("--data", default=os.path.join(ML_DIR, "data", "test.csv"))
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore", module="sklearn")
+
+    test_df = pd.read_csv(args.data)
+    texts = test_df['text'].tolist()
+    clean_texts = clean_email_texts(texts)
+    labels = test_df['category'].tolist()
+
+    variants = [
+        ("vectorizer.pkl", _load_pickle_vectorizer, _pickle_classifier, MODELS_DIR),
+        ("linear-npy", _load_npy_vectorizer, EmailClassifier, MODELS_DIR),
+        ("hashing-npy", _load_npy_vectorizer, EmailClassifier, os.path.join(MODELS_DIR, "hashing")),
+    ]
+    results = [
+        measure(name, load_vectorizer, load_classifier, model_dir, texts, clean_texts, labels,
+                args.batch_size, args.repeats)
+        for name, load_vectorizer, load_classifier, model_dir in variants
+    ]
+
+    print(f"{'вариант':<16}{'загрузка, мс':>14}{'heap, КБ':>12}{'mmap, КБ':>12}{'текстов/с':>12}{'accuracy':>10}")
+    for r in results:
+        print(f"{r['name']:<16}{r['load_ms']:>14.2f}{r['heap_kb']:>12.1f}{r['mmap_kb']:>12.1f}"
+              f"{r['texts_per_s']:>12.0f}{r['accuracy']:>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
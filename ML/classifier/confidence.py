@@ -0,0 +1,93 @@
+"""
+Уверенность классификатора из decision_function: softmax по оценкам классов с температурой.
+
+LinearSVC не выдаёт вероятностей, а его оценки — расстояния до гиперплоскостей.
+Температура подбирается на отложенной выборке (минимум log-loss), после чего
+softmax(scores / T) ведёт себя как откалиброванная вероятность.
+
+Калибровка готовой модели: python -m ML.classifier.confidence [--model-dir ML/models]
+(температура записывается в metadata.json как confidence_temperature).
+"""
+import argparse
+import json
+import os
+import numpy as np
+
+TEMPERATURE_GRID = np.geomspace(0.01, 10, 200)
+
+
+def as_class_scores(scores: np.ndarray) -> np.ndarray:
+    """Приводит decision_function к матрице (n_samples, n_classes), в том числе для бинарной модели."""
+    scores = np.asarray(scores, dtype=np.float64)
+    if scores.ndim == 1:
+        return np.column_stack([-scores, scores])
+    return scores
+
+
+def softmax(scores: np.ndarray, temperature: float = 1.0) -> np.ndarray:
+    scaled = scores / temperature
+    scaled -= scaled.max(axis=1, keepdims=True)
+    np.exp(scaled, out=scaled)
+    scaled /= scaled.sum(axis=1, keepdims=True)
+    return scaled
+
+
+def fit_temperature(scores: np.ndarray, labels: np.ndarray) -> float:
+    """Температура с минимальным log-loss на (scores, labels); labels — индексы классов."""
+    scores = as_class_scores(scores)
+    labels = np.asarray(labels)
+    rows = np.arange(len(labels))
+
+    def log_loss(temperature):
+        return -np.log(softmax(scores, temperature)[rows, labels] + 1e-12).mean()
+
+    return float(min(TEMPERATURE_GRID, key=log_loss))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Калибровка уверенности LinearSVC (temperature scaling)")
+    ml_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser.add_argument("--model-dir", default=os.path.join(ml_dir, "models"))
+    parser.add_argument("--data-dir", default=os.path.join(ml_dir, "data"))
+    args = parser.parse_args()
+
+    import pandas as pd
+    from sklearn.model_selection import train_test_split
+    from ML.classifier.predictor import EmailClassifier
+    from ML.classifier.preprocessor import clean_email_texts
+
+    classifier = EmailClassifier(model_dir=args.model_dir)
+    classifier.cache = None
+    train_df = pd.read_csv(os.path.join(args.data_dir, "train.csv"))
+    test_df = pd.read_csv(os.path.join(args.data_dir, "test.csv"))
+    classes = [str(c) for c in classifier.label_encoder.classes_]
+
+    # та же отложенная часть train.csv, что и при обучении в ноутбуке
+    _, val_texts, _, val_labels = train_test_split(
+        train_df['text'], train_df['category'], test_size=0.15, random_state=42, stratify=train_df['category']
+    )
+    val_scores = classifier.decision_scores(clean_email_texts(val_texts))
+    temperature = fit_temperature(val_scores, np.array([classes.index(c) for c in val_labels]))
+
+    test_scores = classifier.decision_scores(clean_email_texts(test_df['text']))
+    test_labels = np.array([classes.index(c) for c in test_df['category']])
+    probabilities = softmax(as_class_scores(test_scores), temperature)
+    correct = probabilities.argmax(axis=1) == test_labels
+    confidence = probabilities.max(axis=1)
+
+    metadata_path = os.path.join(args.model_dir, "metadata.json")
+    with open(metadata_path, encoding='utf-8') as f:
+        metadata = json.load(f)
+    metadata['confidence_temperature'] = temperature
+    with open(metadata_path, 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, indent=2)
+
+    print(f"Температура: {temperature:.4f}")
+    print(f"Тест: средняя уверенность {confidence.mean():.4f}, точность {correct.mean():.4f}")
+    for threshold in (0.5, 0.7, 0.9):
+        kept = confidence >= threshold
+        print(f"  уверенность >= {threshold}: {kept.mean():.1%} писем, точность {correct[kept].mean():.4f}")
+
+
+if __name__ == "__main__":
+    main()
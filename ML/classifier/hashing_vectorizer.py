@@ -0,0 +1,83 @@
+import math
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+
+
+def normalize_rows(features, norm: str):
+    """Нормировка строк CSR-матрицы на месте (как в TfidfTransformer, без check_array)"""
+    values = np.abs(features.data) if norm == 'l1' else features.data ** 2
+    row_lengths = np.diff(features.indptr)
+    sums = np.add.reduceat(values, features.indptr[:-1][row_lengths > 0]) if values.size else values
+    norms = np.ones(features.shape[0])
+    norms[row_lengths > 0] = sums if norm == 'l1' else np.sqrt(sums)
+    norms[norms == 0] = 1.0
+    features.data /= np.repeat(norms, row_lengths)
+
+
+class HashingTfidfVectorizer:
+    """
+    TF-IDF без словаря: n-граммы хешируются в n_features корзин (HashingVectorizer),
+    а idf хранится в numpy-массиве той же длины. Отбор признаков (min_df, max_df,
+    max_features) сводится к нулевому idf у отброшенных корзин.
+    """
+
+    def __init__(self, n_features: int = 2 ** 16, ngram_range=(1, 2), stop_words='english',
+                 lowercase: bool = True, min_df=1, max_df=1.0, max_features: int | None = None,
+                 norm: str | None = 'l2', idf: np.ndarray | None = None):
+        self.n_features = n_features
+        self.ngram_range = tuple(ngram_range)
+        self.stop_words = stop_words
+        self.lowercase = lowercase
+        self.min_df = min_df
+        self.max_df = max_df
+        self.max_features = max_features
+        self.norm = norm
+        self.idf_ = idf
+        self._hasher = HashingVectorizer(
+            n_features=n_features, ngram_range=self.ngram_range, stop_words=stop_words,
+            lowercase=lowercase, alternate_sign=False, norm=None, dtype=np.float64,
+        )
+
+    def get_params(self) -> dict:
+        return {
+            'n_features': self.n_features,
+            'ngram_range': list(self.ngram_range),
+            'stop_words': self.stop_words,
+            'lowercase': self.lowercase,
+            'min_df': self.min_df,
+            'max_df': self.max_df,
+            'max_features': self.max_features,
+            'norm': self.norm,
+        }
+
+    def fit(self, texts):
+        counts = self._hasher.transform(texts)
+        n_docs = counts.shape[0]
+        df = np.bincount(counts.indices, minlength=self.n_features)
+        idf = np.log((1 + n_docs) / (1 + df)) + 1
+
+        min_count = self.min_df if isinstance(self.min_df, int) else math.ceil(self.min_df * n_docs)
+        max_count = self.max_df if isinstance(self.max_df, int) else self.max_df * n_docs
+        keep = (df >= min_count) & (df <= max_count)
+        if self.max_features is not None and keep.sum() > self.max_features:
+            totals = np.asarray(counts.sum(axis=0)).ravel()
+            totals[~keep] = -1
+            keep = np.zeros_like(keep)
+            keep[np.argsort(-totals, kind='stable')[:self.max_features]] = True
+
+        idf[~keep] = 0.0
+        self.idf_ = idf
+        return self
+
+    def transform(self, texts):
+        if self.idf_ is None:
+            raise ValueError("HashingTfidfVectorizer не обучен: вызовите fit или передайте idf")
+        features = self._hasher.transform(texts)
+        features.data *= self.idf_[features.indices]
+        features.eliminate_zeros()
+        if self.norm:
+            normalize_rows(features, self.norm)
+        return features
+
+    def fit_transform(self, texts):
+        return self.fit(texts).transform(texts)
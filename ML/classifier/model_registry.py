@@ -0,0 +1,201 @@
+"""
+Реестр версий модели с горячей заменой.
+
+Версии лежат в <models_dir>/versions/<версия>/ (имена сортируются по времени, например
+20260105_120000, как каталоги email_classifier_<дата> из ноутбука). Версия считается готовой,
+когда в каталоге появился metadata.json — его нужно копировать последним. Если каталога
+versions нет, используется сама models_dir, как раньше.
+
+Фоновый поток периодически ищет новую версию, загружает её, прогоняет пробный пакет
+и атомарно подменяет активную модель; текущие запросы дообрабатываются старой.
+"""
+import logging
+import os
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Tuple
+from ML.classifier.predictor import EmailClassifier
+from ML.classifier.prediction_cache import PredictionCache, ML_CACHE_SIZE
+
+logger = logging.getLogger(__name__)
+
+ML_MODEL_CHECK_INTERVAL = float(os.getenv("ML_MODEL_CHECK_INTERVAL", "30"))
+ML_MODEL_VERSION = os.getenv("ML_MODEL_VERSION") or None
+VERSIONS_DIR = "versions"
+READY_MARKER = "metadata.json"
+
+WARMUP_TEXTS = [
+    "Your verification code is 123456. Do not share it with anyone.",
+    "Big summer sale: 50% off everything in our store this weekend only!",
+    "New reply in the thread you follow on the community forum.",
+    "Your order has shipped and will arrive on Monday.",
+]
+
+
+class ModelRegistry:
+    """
+    Держит активную версию классификатора и несколько предыдущих для отката.
+    batch_predict/predict делегируются активной версии; model_version есть в каждом результате.
+    """
+
+    def __init__(self, models_dir: str | None = None, loader: Callable[..., EmailClassifier] = EmailClassifier,
+                 pinned_version: str | None = ML_MODEL_VERSION, keep_previous: int = 2,
+                 warmup_texts: List[str] | None = None):
+        self.models_dir = os.path.expanduser(models_dir or _default_models_dir())
+        self.loader = loader
+        self.pinned_version = pinned_version
+        self.warmup_texts = WARMUP_TEXTS if warmup_texts is None else warmup_texts
+        self.cache = PredictionCache() if ML_CACHE_SIZE > 0 else None
+        self.swaps = 0
+        # (ключ версии, классификатор); ключ None — модель прямо в models_dir
+        self._active: Tuple[str | None, EmailClassifier] | None = None
+        self._previous: deque = deque(maxlen=keep_previous)
+        self._rejected: set = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def versions_dir(self) -> str:
+        return os.path.join(self.models_dir, VERSIONS_DIR)
+
+    @property
+    def active(self) -> EmailClassifier | None:
+        active = self._active
+        return active[1] if active else None
+
+    @property
+    def active_version(self) -> str | None:
+        active = self._active
+        return active[1].model_version if active else None
+
+    def versions(self) -> List[str]:
+        """Готовые к загрузке версии, от старых к новым."""
+        if not os.path.isdir(self.versions_dir):
+            return []
+        return sorted(
+            entry.name for entry in os.scandir(self.versions_dir)
+            if entry.is_dir() and not entry.name.startswith('.')
+            and os.path.exists(os.path.join(entry.path, READY_MARKER))
+        )
+
+    def _target(self) -> str | None:
+        if self.pinned_version:
+            return self.pinned_version
+        candidates = [version for version in self.versions() if version not in self._rejected]
+        return candidates[-1] if candidates else None
+
+    def check(self) -> bool:
+        """Загружает новую версию, если она появилась. True — если модель сменилась."""
+        target = self._target()
+        active = self._active
+        if (active is not None and active[0] == target) or target in self._rejected:
+            return False
+        return self.activate(target)
+
+    def activate(self, version: str | None) -> bool:
+        """Загружает, прогревает и делает активной версию (None — models_dir без версий)."""
+        with self._lock:
+            if self._active is not None and self._active[0] == version:
+                return True
+            classifier = self._take_previous(version) or self._load(version)
+            if classifier is None:
+                return False
+            self._rejected.discard(version)
+            self._swap(version, classifier)
+            return True
+
+    def rollback(self) -> str | None:
+        """Возвращает предыдущую версию; текущая больше не подхватывается автоматически."""
+        with self._lock:
+            if self._active is None:
+                raise ValueError("Нет активной модели")
+            current = self._active[0]
+            if self._previous:
+                version, classifier = self._previous.pop()
+            else:
+                older = [v for v in self.versions() if current is not None and v < current and v not in self._rejected]
+                if not older:
+                    raise ValueError("Нет предыдущей версии для отката")
+                version, classifier = older[-1], self._load(older[-1])
+                if classifier is None:
+                    raise ValueError(f"Не удалось загрузить версию {older[-1]}")
+            if current is not None:
+                self._rejected.add(current)
+            self._swap(version, classifier, keep_current=False)
+            logger.warning(f"Откат модели: {current} -> {version}")
+            return self.active_version
+
+    def _take_previous(self, version: str | None) -> EmailClassifier | None:
+        for i, (previous_version, classifier) in enumerate(self._previous):
+            if previous_version == version:
+                del self._previous[i]
+                return classifier
+        return None
+
+    def _load(self, version: str | None) -> EmailClassifier | None:
+        model_dir = self.models_dir if version is None else os.path.join(self.versions_dir, version)
+        try:
+            classifier = self.loader(model_dir=model_dir, cache=self.cache, model_version=version)
+            self._warm_up(classifier)
+        except Exception as e:
+            logger.error(f"Версия модели {version or model_dir} не загружена: {e}")
+            if version is not None:
+                self._rejected.add(version)
+            return None
+        return classifier
+
+    def _warm_up(self, classifier: EmailClassifier):
+        if not self.warmup_texts:
+            return
+        results = classifier.batch_predict(self.warmup_texts)
+        if len(results) != len(self.warmup_texts) or not all(r.get('category') for r in results):
+            raise ValueError("пробный пакет классифицирован некорректно")
+
+    def _swap(self, version: str | None, classifier: EmailClassifier, keep_current: bool = True):
+        previous = self._active
+        self._active = (version, classifier)
+        self.swaps += 1
+        if previous is not None and keep_current:
+            self._previous.append(previous)
+        logger.warning(f"Активная модель: {classifier.model_version}")
+
+    def batch_predict(self, texts) -> List[Dict]:
+        classifier = self.active
+        if classifier is None:
+            raise RuntimeError("Модель не загружена")
+        return classifier.batch_predict(texts)
+
+    def predict(self, text) -> Dict:
+        return self.batch_predict([text])[0]
+
+    def status(self) -> Dict:
+        return {
+            'active': self.active_version,
+            'available': self.versions(),
+            'previous': [classifier.model_version for _, classifier in self._previous],
+            'rejected': sorted(self._rejected),
+            'pinned': self.pinned_version,
+            'swaps': self.swaps,
+        }
+
+    def start_watching(self, interval: float = ML_MODEL_CHECK_INTERVAL):
+        """Запускает фоновый поток, который подхватывает новые версии."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._watch, args=(interval,), name="model-registry", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _watch(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Ошибка проверки новых версий модели: {e}")
+
+
+def _default_models_dir() -> str:
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models")
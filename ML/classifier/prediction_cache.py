@@ -0,0 +1,135 @@
+import atexit
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+ML_CACHE_SIZE = int(os.getenv("ML_CACHE_SIZE", "10000"))
+ML_CACHE_TTL = float(os.getenv("ML_CACHE_TTL", "86400"))
+ML_CACHE_PATH = os.getenv("ML_CACHE_PATH") or None
+
+
+class PredictionCache:
+    """
+    LRU-кэш результатов классификации с TTL. Ключ — хеш очищенного текста и версии модели,
+    поэтому одинаковые рассылки разным пользователям классифицируются один раз.
+    При смене версии модели (set_model_version) кэш очищается.
+    """
+
+    def __init__(self, max_size: int = ML_CACHE_SIZE, ttl: float = ML_CACHE_TTL, path: str | None = ML_CACHE_PATH,
+                 clock: Callable[[], float] = time.time):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.path = path
+        self.clock = clock
+        self.model_version: str | None = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, tuple[float, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        if path:
+            self.load()
+            # процессы пула классификации (spawn) только читают кэш, сохраняет родительский процесс
+            if multiprocessing.parent_process() is None:
+                atexit.register(self.save)
+
+    @staticmethod
+    def key(clean_text: str, model_version: str | None) -> str:
+        return hashlib.blake2b(f"{model_version}\0{clean_text}".encode('utf-8'), digest_size=16).hexdigest()
+
+    def set_model_version(self, version: str | None):
+        with self._lock:
+            if version == self.model_version:
+                return
+            if self._entries:
+                logger.info(f"Модель сменилась ({self.model_version} -> {version}), кэш предсказаний очищен")
+            self.model_version = version
+            self._entries.clear()
+
+    def get(self, key: str) -> Dict | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self.clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry[1])
+
+    def put(self, key: str, value: Dict):
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, dict(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    def save(self, path: str | None = None):
+        path = path or self.path
+        if not path:
+            return
+        now = self.clock()
+        with self._lock:
+            data = {
+                'model_version': self.model_version,
+                'entries': [[key, expires_at, value] for key, (expires_at, value) in self._entries.items()
+                            if expires_at > now],
+            }
+        # свой временный файл у каждого писателя: несколько экземпляров кэша сохраняются в один path
+        directory, name = os.path.split(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(prefix=f"{name}.", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def load(self, path: str | None = None):
+        path = path or self.path
+        if not path or not os.path.exists(path):
+            return
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Не удалось прочитать кэш предсказаний {path}: {e}")
+            return
+
+        now = self.clock()
+        with self._lock:
+            self.model_version = data.get('model_version')
+            self._entries.clear()
+            for key, expires_at, value in data.get('entries', [])[-self.max_size:]:
+                if expires_at > now:
+                    self._entries[key] = (expires_at, value)
+        logger.info(f"Загружено {len(self._entries)} записей кэша предсказаний из {path}")
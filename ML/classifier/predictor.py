@@ -1,12 +1,17 @@
-from ML.classifier.preprocessor import clean_email_text
+from ML.classifier.preprocessor import clean_email_texts
+from ML.classifier.artifacts import read_manifest, load_artifacts
+from ML.classifier.confidence import as_class_scores, softmax
+from ML.classifier.prediction_cache import PredictionCache, ML_CACHE_SIZE
 import joblib
+import json
 import pickle
 import os
 import logging
 
 
 class EmailClassifier:
-    def __init__(self, model_dir=None):
+    def __init__(self, model_dir=None, mmap_mode='r', cache: PredictionCache | None = None, model_version=None,
+                 prefer_artifacts=True):
         if model_dir is None:
             current_dir = os.path.dirname(os.path.abspath(__file__))
             project_root = os.path.dirname(os.path.dirname(current_dir))
@@ -16,6 +21,29 @@ class EmailClassifier:
 
         logging.getLogger(__name__).warning(f"🔄 Загружаю модели из: {model_dir}")
 
+        # prefer_artifacts=False загружает pickle даже при наличии .npy (для сравнения в бенчмарке)
+        manifest = read_manifest(model_dir) if prefer_artifacts else None
+        if manifest is not None and self._is_stale(model_dir, manifest):
+            logging.getLogger(__name__).warning("⚠️ Артефакты .npy старше metadata.json, загружаю pickle")
+            manifest = None
+
+        if manifest is not None:
+            # веса отображаются в память и разделяются между процессами
+            self.vectorizer, self.model, self.label_encoder = load_artifacts(model_dir, manifest, mmap_mode=mmap_mode)
+        else:
+            self._load_pickles(model_dir)
+
+        metadata = self._read_metadata(model_dir)
+        self.model_version = model_version or metadata.get('created_at') or self._files_version(model_dir)
+        self.confidence_temperature = float(metadata.get('confidence_temperature', 1.0))
+        self.cache = cache if cache is not None else (PredictionCache() if ML_CACHE_SIZE > 0 else None)
+        if self.cache is not None:
+            # записи прежней модели больше не нужны
+            self.cache.set_model_version(self.model_version)
+
+        logging.getLogger(__name__).warning(f"✅ Модели загружены. Доступные категории: {list(self.label_encoder.classes_)}")
+
+    def _load_pickles(self, model_dir):
         model_path = os.path.join(model_dir, "model.pkl")
         vectorizer_path = os.path.join(model_dir, "vectorizer.pkl")
         label_encoder_path = os.path.join(model_dir, "label_encoder.pkl")
@@ -33,31 +61,85 @@ class EmailClassifier:
         with open(label_encoder_path, 'rb') as f:
             self.label_encoder = pickle.load(f)
 
-        logging.getLogger(__name__).warning(f"✅ Модели загружены. Доступные категории: {list(self.label_encoder.classes_)}")
+    @staticmethod
+    def _is_stale(model_dir, manifest):
+        metadata_path = os.path.join(model_dir, "metadata.json")
+        if not os.path.exists(metadata_path):
+            return False
+        with open(metadata_path, encoding='utf-8') as f:
+            return json.load(f).get('created_at') != manifest.get('created_at')
+
+    @staticmethod
+    def _read_metadata(model_dir):
+        metadata_path = os.path.join(model_dir, "metadata.json")
+        if not os.path.exists(metadata_path):
+            return {}
+        with open(metadata_path, encoding='utf-8') as f:
+            return json.load(f)
+
+    @staticmethod
+    def _files_version(model_dir):
+        return str(max(entry.stat().st_mtime_ns for entry in os.scandir(model_dir) if entry.is_file()))
 
     def predict(self, email_text):
         """
-        Простая предсказательная функция: возвращает только категорию.
-        Не использует predict_proba / decision_function.
+        Предсказание для одного письма: категория, уверенность и вероятности классов.
+        """
+        return self.batch_predict([email_text])[0]
+
+    def batch_predict(self, email_texts):
+        """
+        Предсказание для списка писем: один вызов vectorizer.transform
+        и model.decision_function на весь список.
+        Письма, уже классифицированные этой версией модели, берутся из кэша,
+        одинаковые письма внутри списка классифицируются один раз.
         """
-        clean_text = clean_email_text(email_text)
+        clean_texts = clean_email_texts(email_texts)
+        if not clean_texts:
+            return []
+        if self.cache is None:
+            return self._predict_clean(clean_texts)
 
-        features = self.vectorizer.transform([clean_text])
+        keys = [self.cache.key(clean_text, self.model_version) for clean_text in clean_texts]
+        results = [self.cache.get(key) for key in keys]
+        missing = {}
+        for i, (key, result) in enumerate(zip(keys, results)):
+            if result is None:
+                missing.setdefault(key, []).append(i)
 
-        prediction = self.model.predict(features)[0]
+        if missing:
+            computed = self._predict_clean([clean_texts[positions[0]] for positions in missing.values()])
+            for (key, positions), result in zip(missing.items(), computed):
+                self.cache.put(key, result)
+                for i in positions:
+                    results[i] = dict(result)
+        return results
 
-        try:
-            category = self.label_encoder.inverse_transform([prediction])[0]
-        except Exception:
-            category = prediction
+    def decision_scores(self, clean_texts):
+        """Матрица decision_function для уже очищенных текстов."""
+        return self.model.decision_function(self.vectorizer.transform(clean_texts))
 
-        return {
-            'category': category,
-            'confidence': None,
-            'probabilities': {},
-            'clean_text': clean_text[:100] + "..." if len(clean_text) > 100 else clean_text
-        }
+    def _predict_clean(self, clean_texts):
+        # decision_function считается один раз: из неё берутся и метка, и уверенность
+        scores = as_class_scores(self.decision_scores(clean_texts))
+        probabilities = softmax(scores, self.confidence_temperature)
+        best = scores.argmax(axis=1)
+        class_names = [str(name) for name in self._decode(self.model.classes_)]
 
-    def batch_predict(self, email_texts):
-        """Предсказание для списка писем"""
-        return [self.predict(text) for text in email_texts]
\ No newline at end of file
+        return [
+            {
+                'category': class_names[index],
+                'confidence': float(row_probabilities[index]),
+                'probabilities': dict(zip(class_names, row_probabilities.tolist())),
+                'scores': dict(zip(class_names, row_scores.tolist())),
+                'model_version': self.model_version,
+                'clean_text': clean_text[:100] + "..." if len(clean_text) > 100 else clean_text
+            }
+            for index, row_probabilities, row_scores, clean_text in zip(best, probabilities, scores, clean_texts)
+        ]
+
+    def _decode(self, labels):
+        try:
+            return self.label_encoder.inverse_transform(labels)
+        except Exception:
+            return labels
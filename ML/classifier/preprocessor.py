@@ -1,28 +1,54 @@
 import re
-import pandas as pd
-import nltk
-from nltk.corpus import stopwords
-
-nltk.download('stopwords')
-
-STOP_WORDS = set(stopwords.words('english'))
+from decimal import Decimal
+from pathlib import Path
+from typing import Iterable, List
+
+# Список стоп-слов NLTK (english) лежит рядом с модулем, чтобы импорт не ходил в сеть
+STOP_WORDS = frozenset(Path(__file__).with_name('stopwords_en.txt').read_text(encoding='utf-8').split())
+
+# Шаблоны компилируются один раз. Результат совпадает с исходной цепочкой re.sub:
+#   \s+ -> ' '                      заменено на split/join (те же пробельные символы, что и у \s);
+#   http\S+|www\S+|https\S+         ветка https покрывается веткой http;
+#   <.*?> и [^a-z\s]                объединены в один проход: после нормализации в тексте
+#                                   нет переводов строк, и единственный пробельный символ — ' '.
+_URL_RE = re.compile(r'(?:http|www)\S+')
+_EMAIL_RE = re.compile(r'\S+@\S+')
+_TAG_OR_NON_ALPHA_RE = re.compile(r'<[^>]*>|[^a-z ]')
+
+
+def _is_missing(value) -> bool:
+    """Аналог pd.isna для скалярных значений: None, NaN, NaT, pd.NA."""
+    if value is None:
+        return True
+    if isinstance(value, Decimal):
+        return value.is_nan()
+    if type(value).__name__ in ('NAType', 'NaTType'):
+        return True
+    try:
+        return bool(value != value)
+    except (TypeError, ValueError):
+        return False
 
 
 def clean_email_text(text):
     """Оптимизированная функция очистки текста"""
-    if pd.isna(text):
-        return ""
-
-    text = str(text)
-
-    text = text.lower()
-    text = re.sub(r'\s+', ' ', text)
-    text = re.sub(r'http\S+|www\S+|https\S+', '', text, flags=re.MULTILINE)
-    text = re.sub(r'\S+@\S+', '', text)
-    text = re.sub(r'<.*?>', '', text)
-    text = re.sub(r'[^a-z\s]', '', text)
-
-    words = text.split()
-    words = [word for word in words if word not in STOP_WORDS and len(word) > 2]
-
-    return ' '.join(words)
\ No newline at end of file
+    if type(text) is not str:
+        if _is_missing(text):
+            return ""
+        text = str(text)
+
+    text = ' '.join(text.lower().split())
+    if 'http' in text or 'www' in text:
+        text = _URL_RE.sub('', text)
+    if '@' in text:
+        text = _EMAIL_RE.sub('', text)
+    text = _TAG_OR_NON_ALPHA_RE.sub('', text)
+
+    stop_words = STOP_WORDS
+    return ' '.join([word for word in text.split() if len(word) > 2 and word not in stop_words])
+
+
+def clean_email_texts(texts: Iterable) -> List[str]:
+    """Пакетная очистка списка текстов"""
+    clean = clean_email_text
+    return [clean(text) for text in texts]
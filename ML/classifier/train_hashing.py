@@ -0,0 +1,76 @@
+"""
+Обучение классификатора на HashingTfidfVectorizer и экспорт в формат "hashing-npy".
+
+Повторяет обучение из ML_for_gmail_bot.ipynb (очистка текста, LinearSVC, отложенные 15%
+для валидации), но без словаря: признаки — корзины хеша n-грамм, idf — numpy-массив.
+
+Запуск: python -m ML.classifier.train_hashing [--data-dir ML/data] [--out ML/models/hashing]
+"""
+import argparse
+import json
+import os
+from datetime import datetime
+import pandas as pd
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import LabelEncoder
+from sklearn.svm import LinearSVC
+from ML.classifier.artifacts import export_artifacts
+from ML.classifier.confidence import fit_temperature
+from ML.classifier.hashing_vectorizer import HashingTfidfVectorizer
+from ML.classifier.preprocessor import clean_email_texts
+
+ML_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def train(train_df: pd.DataFrame, test_df: pd.DataFrame, n_features: int = 2 ** 16):
+    vectorizer = HashingTfidfVectorizer(n_features=n_features, ngram_range=(1, 2), min_df=5, max_df=0.8)
+    X_train = vectorizer.fit_transform(clean_email_texts(train_df['text']))
+    X_test = vectorizer.transform(clean_email_texts(test_df['text']))
+
+    label_encoder = LabelEncoder()
+    y_train = label_encoder.fit_transform(train_df['category'])
+    y_test = label_encoder.transform(test_df['category'])
+
+    X_train_final, X_val, y_train_final, y_val = train_test_split(
+        X_train, y_train, test_size=0.15, random_state=42, stratify=y_train
+    )
+    model = LinearSVC(max_iter=1000, random_state=42).fit(X_train_final, y_train_final)
+    accuracy = accuracy_score(y_test, model.predict(X_test))
+    temperature = fit_temperature(model.decision_function(X_val), y_val)
+
+    metadata = {
+        'model_name': 'Linear SVM (hashing)',
+        'accuracy': float(accuracy),
+        'train_samples': X_train.shape[0],
+        'test_samples': X_test.shape[0],
+        'features': int((vectorizer.idf_ > 0).sum()),
+        'n_features': n_features,
+        'categories': label_encoder.classes_.tolist(),
+        'created_at': datetime.now().isoformat(),
+        'confidence_temperature': temperature,
+    }
+    return vectorizer, model, label_encoder, metadata
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Обучение LinearSVC на хешированных признаках")
+    parser.add_argument("--data-dir", default=os.path.join(ML_DIR, "data"))
+    parser.add_argument("--out", default=os.path.join(ML_DIR, "models", "hashing"))
+    parser.add_argument("--n-features", type=int, default=2 ** 16, help="число корзин хеша")
+    args = parser.parse_args()
+
+    train_df = pd.read_csv(os.path.join(args.data_dir, "train.csv"))
+    test_df = pd.read_csv(os.path.join(args.data_dir, "test.csv"))
+    vectorizer, model, label_encoder, metadata = train(train_df, test_df, args.n_features)
+
+    export_artifacts(vectorizer, model, label_encoder, args.out, metadata)
+    with open(os.path.join(args.out, "metadata.json"), 'w') as f:
+        json.dump(metadata, f, indent=2)
+
+    print(f"Точность на тесте: {metadata['accuracy']:.4f}, признаков: {metadata['features']}")
+    print(f"Модель сохранена в {args.out}")
+
+
+if __name__ == "__main__":
+    main()
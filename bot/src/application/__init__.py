@@ -1,5 +1,5 @@
 from bot.src.application.email_oauth import OAuthService
-from bot.src.application.gmail_client import GmailService
+from bot.src.application.gmail_client import GmailService, AsyncGmailService
 from .email_monitor_service import EmailMonitorService
 
-__all__ = ['OAuthService', 'GmailService', 'EmailMonitorService']
+__all__ = ['OAuthService', 'GmailService', 'AsyncGmailService', 'EmailMonitorService']
@@ -0,0 +1,80 @@
+import asyncio
+import inspect
+import logging
+from typing import Dict, List, Tuple
+from bot.src.config.monitor_config import CLASSIFY_BATCH_SIZE, CLASSIFY_BATCH_DELAY
+
+logger = logging.getLogger(__name__)
+
+
+class ClassificationBatcher:
+    """
+    Собирает письма, пришедшие за короткое окно от разных пользователей,
+    и классифицирует их одним вызовом batch_predict.
+    Классификатор — локальный EmailClassifier или асинхронный MLApiClient.
+    """
+
+    def __init__(self, classifier, max_batch: int = CLASSIFY_BATCH_SIZE, max_delay: float = CLASSIFY_BATCH_DELAY):
+        self.classifier = classifier
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.batches = 0
+        self.texts = 0
+        self._pending: List[Tuple[List[str], asyncio.Future]] = []
+        self._pending_count = 0
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._tasks = set()
+
+    async def classify(self, texts: List[str]) -> List[Dict | None]:
+        """Возвращает результаты в порядке texts; None — если письмо классифицировать не удалось."""
+        if not texts:
+            return []
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((list(texts), future))
+        self._pending_count += len(texts)
+
+        if self._pending_count >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_delay, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending, self._pending_count = self._pending, [], 0
+        if pending:
+            task = asyncio.create_task(self._run_batch(pending))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, pending: List[Tuple[List[str], asyncio.Future]]):
+        texts = [text for chunk, _ in pending for text in chunk]
+        results = await self._predict(texts)
+        self.batches += 1
+        self.texts += len(texts)
+        offset = 0
+        for chunk, future in pending:
+            if not future.done():
+                future.set_result(results[offset:offset + len(chunk)])
+            offset += len(chunk)
+
+    async def _predict(self, texts: List[str]) -> List[Dict | None]:
+        try:
+            return await _resolve(self.classifier.batch_predict(texts))
+        except Exception as e:
+            logger.error(f"Пакетная классификация не удалась, классифицируем по одному: {e}")
+        return [await self._predict_one(text) for text in texts]
+
+    async def _predict_one(self, text: str) -> Dict | None:
+        try:
+            return await _resolve(self.classifier.predict(text))
+        except Exception as e:
+            logger.error(f"Ошибка классификации письма: {e}")
+            return None
+
+
+async def _resolve(result):
+    return await result if inspect.isawaitable(result) else result
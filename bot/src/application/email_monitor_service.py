@@ -1,230 +1,277 @@
 import asyncio
-import sys
-import importlib
-import importlib.util
-from pathlib import Path
+import functools
 import logging
-import os
-import json
-from typing import List
+from collections import defaultdict
+from contextlib import aclosing
+from typing import Dict, List
 from googleapiclient.errors import HttpError
+from google.auth.exceptions import RefreshError
 from aiogram import Bot
-from email.utils import parsedate_to_datetime
-from bot.src.domain.entities.user_state import UserState
-from bot.src.domain.entities.email_message_class import EmailMessage
 from bot.src.domain.repositories.token_repositories import TokenRepository
 from bot.src.domain.repositories.state_repository import StateRepository
-from bot.src.application.gmail_client import GmailService
-USER_CATEGORIES_PATH = str(Path(__file__).resolve().parents[3] / "user_categories.json")
-
-
-def _find_predictor_path() -> Path | None:
-    """Ищет файл predictor.py в родительских директориях и в ~/hse_python_project."""
-    cur = Path(__file__).resolve()
-    for _ in range(7):
-        candidate = cur.parent / "ML" / "classifier" / "predictor.py"
-        if candidate.exists():
-            return candidate
-        cur = cur.parent
-    home_candidate = Path.home() / "hse_python_project" / "ML" / "classifier" / "predictor.py"
-    if home_candidate.exists():
-        return home_candidate
-    return None
-
-
-def _import_email_classifier():
-    predictor_path = _find_predictor_path()
-    if predictor_path is None:
-        logging.getLogger(__name__).warning(
-            "Не удалось найти ML/classifier/predictor.py в проекте и в ~/hse_python_project. "
-            "Проверь путь к ML."
-        )
-        return None, None
-
-    ml_root = predictor_path.parents[1]
-    project_root = ml_root.parent
-    if str(project_root) not in sys.path:
-        sys.path.insert(0, str(project_root))
-
-    try:
-        module = importlib.import_module("ML.classifier.predictor")
-    except Exception:
-        try:
-            spec = importlib.util.spec_from_file_location("predictor_from_path", str(predictor_path))
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)  # type: ignore
-        except Exception as e:
-            logging.getLogger(__name__).error(f"Не удалось импортировать predictor.py: {e}")
-            return None, None
-
-    EmailClassifier = getattr(module, "EmailClassifier", None)
-    if EmailClassifier is None:
-        logging.getLogger(__name__).error("В predictor.py не найден класс EmailClassifier")
-        return None, None
+from bot.src.domain.repositories.category_repository import CategoryRepository
+from bot.src.application.gmail_client import AsyncGmailService, iter_history
+from bot.src.application.poll_scheduler import PollScheduler, AdaptivePollScheduler, CycleStats
+from bot.src.application.email_pipeline import EmailPipeline
+from bot.src.application.classification_batcher import ClassificationBatcher
+from bot.src.application.notification_queue import NotificationQueue
+from bot.src.application.user_health import UserHealthTracker
+from bot.src.application.gmail_quota import QuotaAccountant
+from bot.src.application.sharding import ShardCoordinator
+from bot.src.application.ml_api_client import MLApiClient
+from bot.src.application.lazy_classifier import LazyClassifier, load_email_classifier
+from bot.src.application.process_pool_classifier import ProcessPoolClassifier
+from bot.src.config.ml_config import ML_API_URL, ML_POOL_WORKERS
+from bot.src.application.push_notifications import WatchManager, PushNotificationQueue
+from bot.src.config.monitor_config import POLL_INTERVAL, HISTORY_PAGE_SIZE, HISTORY_MESSAGE_BUDGET, ADAPTIVE_POLLING
+from bot.src.config.push_config import FALLBACK_POLL_INTERVAL
 
-    candidate_models_dir = ml_root / "models"
-    if candidate_models_dir.exists():
-        model_dir = str(candidate_models_dir)
-    else:
-        fallback = Path.home() / "hse_python_project" / "ML" / "models"
-        model_dir = str(fallback) if fallback.exists() else None
-
-    return EmailClassifier, model_dir
-
-_EMAIL_CLASSIFIER_CLS, _EMAIL_CLASSIFIER_MODEL_DIR = _import_email_classifier()
-if _EMAIL_CLASSIFIER_CLS is None:
-    logging.getLogger(__name__).warning("EmailClassifier не импортирован — классификация будет отключена.")
-else:
-    logging.getLogger(__name__).info(f"EmailClassifier импортирован. model_dir: {_EMAIL_CLASSIFIER_MODEL_DIR}")
 
 
 class EmailMonitorService:
-    def __init__(self, bot: Bot, token_repo: TokenRepository, state_repo: StateRepository, gmail_service: GmailService):
+    def __init__(self, bot: Bot, token_repo: TokenRepository, state_repo: StateRepository,
+                 gmail_service: AsyncGmailService, watch_manager: WatchManager | None = None,
+                 push_queue: PushNotificationQueue | None = None,
+                 category_repo: CategoryRepository | None = None,
+                 message_budget: int = HISTORY_MESSAGE_BUDGET, history_page_size: int = HISTORY_PAGE_SIZE,
+                 quota: QuotaAccountant | None = None, adaptive_polling: bool = ADAPTIVE_POLLING,
+                 shard: ShardCoordinator | None = None):
         self.bot = bot
+        self.shard = shard
+        self.quota = quota
         self.token_repo = token_repo
         self.state_repo = state_repo
         self.gmail_service = gmail_service
-        self.classifier = None
-        if _EMAIL_CLASSIFIER_CLS is not None:
-            try:
-                if _EMAIL_CLASSIFIER_MODEL_DIR:
-                    self.classifier = _EMAIL_CLASSIFIER_CLS(model_dir=_EMAIL_CLASSIFIER_MODEL_DIR)
-                else:
-                    self.classifier = _EMAIL_CLASSIFIER_CLS()
-            except FileNotFoundError as e:
-                logging.getLogger(__name__).error(f"Файлы модели не найдены: {e}")
-                self.classifier = None
-            except Exception as e:
-                logging.getLogger(__name__).error(f"Не удалось инициализировать EmailClassifier: {e}")
-                self.classifier = None
-
-    def _load_user_categories_file(self):
+        self.watch_manager = watch_manager
+        self.push_queue = push_queue
+        self.category_repo = category_repo or CategoryRepository()
+        self.message_budget = message_budget
+        self.history_page_size = history_page_size
+        self.health = UserHealthTracker(token_repo.token_version)
+        self._user_locks = defaultdict(asyncio.Lock)
+        # новые last_history_id копятся за цикл и записываются одной транзакцией
+        self._pending_history_ids: Dict[int, str] = {}
+        # версия токена, при которой накоплен курсор: после повторной /auth он устарел
+        self._pending_token_versions: Dict[int, int | None] = {}
+        # в push-режиме опрос лишь страховка, его интервал не подстраивается под активность
+        scheduler_class = AdaptivePollScheduler if adaptive_polling and not push_queue else PollScheduler
+        self.scheduler = scheduler_class(
+            self._process_user,
+            interval=FALLBACK_POLL_INTERVAL if push_queue else POLL_INTERVAL,
+            on_cycle=self._report_cycle,
+            interval_scale=quota.stretch if quota else None,
+            on_timeout=self._on_user_timeout,
+        )
+        if ML_API_URL:
+            self.classifier = MLApiClient(ML_API_URL, fallback_factory=load_email_classifier)
+        elif ML_POOL_WORKERS > 0:
+            # модель в отдельных процессах: классификация не держит GIL и event loop бота
+            self.classifier = ProcessPoolClassifier(ML_POOL_WORKERS)
+        else:
+            # модель грузится в фоне, бот тем временем уже отвечает на команды
+            self.classifier = LazyClassifier(load_email_classifier)
+        self.batcher = ClassificationBatcher(self.classifier)
+        # отправка в Telegram не задерживает опрос: сообщения уходят из очереди своими воркерами
+        self.notifier = NotificationQueue(bot)
+        self.pipeline = EmailPipeline(bot, gmail_service, self.category_repo, self.batcher, notifier=self.notifier)
+
+    async def monitor_all_users(self):
+        if isinstance(self.classifier, (LazyClassifier, ProcessPoolClassifier)):
+            self.classifier.start_loading()
+        if self.push_queue is None or self.watch_manager is None:
+            background = [self.category_repo.watch(), self.notifier.run()]
+            if self.shard is not None:
+                await asyncio.to_thread(self.shard.refresh)
+                background.append(self.shard.run(on_rebalance=functools.partial(self._flush_history_ids, handoff=True)))
+            await asyncio.gather(*background, self.scheduler.run_forever(self._get_connected_users))
+            return
+
+        # push-режим: письма обрабатываются по уведомлениям, редкий опрос остаётся страховкой
+        await asyncio.gather(
+            self.category_repo.watch(),
+            self.notifier.run(),
+            self.watch_manager.run(self._get_connected_users, can_renew=self.health.is_healthy),
+            self.push_queue.consume(self._process_user_now),
+            self.scheduler.run_forever(self._get_connected_users),
+        )
+
+    def shutdown(self):
+        if isinstance(self.classifier, ProcessPoolClassifier):
+            self.classifier.shutdown()
+
+    def _report_cycle(self, stats: CycleStats):
+        self._flush_history_ids()
+        logging.getLogger(__name__).info(f"Конвейер писем (прошло/отброшено): {self.pipeline.summary()}")
+        logging.getLogger(__name__).info(f"Очередь уведомлений: {self.notifier.summary()}")
+        if self.quota is not None:
+            logging.getLogger(__name__).info(f"Квота Gmail: {self.quota.summary()}")
+        if self.health.parked() or self.health.backing_off():
+            logging.getLogger(__name__).warning(f"Проблемные аккаунты: {self.health.summary()}")
+
+    async def _process_user_now(self, user_id: int):
+        await self.scheduler.run_now(user_id)
+        self._flush_history_ids()
+
+    def _flush_history_ids(self, handoff: bool = False):
         """
-        Возвращает dict: {user_id: set(category_id, ...), ...}
-        Если файл не найден или ошибка — возвращает {}.
+        Записывает накопленные historyId. При перебалансировке (handoff) пишутся сразу все курсоры,
+        пока новый владелец не начал опрос; позже курсор переехавшего пользователя отбрасывается,
+        чтобы не лечь поверх более нового курсора другого воркера. Курсоры, накопленные
+        до повторной авторизации, тоже отбрасываются: колбэк OAuth уже записал свежий historyId.
         """
+        pending, self._pending_history_ids = self._pending_history_ids, {}
+        versions, self._pending_token_versions = self._pending_token_versions, {}
+        if self.shard is not None and not handoff:
+            lost = [user_id for user_id in pending if not self.shard.owns(user_id)]
+            for user_id in lost:
+                del pending[user_id]
+            if lost:
+                logging.getLogger(__name__).info(
+                    f"Курсоры {len(lost)} пользователей, переехавших к другим воркерам, не записываются"
+                )
+        for user_id in [user_id for user_id in pending if self._is_stale_cursor(user_id, versions.get(user_id))]:
+            del pending[user_id]
+        if not pending:
+            return
         try:
-            if not os.path.exists(USER_CATEGORIES_PATH):
-                return {}
-            with open(USER_CATEGORIES_PATH, 'r', encoding='utf-8') as f:
-                raw = json.load(f)
-            result = {}
-            for user_id_str, categories in raw.items():
-                try:
-                    result[int(user_id_str)] = set(categories)
-                except Exception:
-                    continue
-            return result
+            self.state_repo.save_last_history_ids(pending)
         except Exception as e:
-            logging.getLogger(__name__).error(f"Ошибка при чтении {USER_CATEGORIES_PATH}: {e}")
-            return {}
+            logging.getLogger(__name__).error(f"Не удалось сохранить historyId {len(pending)} пользователей: {e}")
+            self._pending_history_ids = {**pending, **self._pending_history_ids}
+            self._pending_token_versions = {
+                **{user_id: versions.get(user_id) for user_id in pending}, **self._pending_token_versions
+            }
 
-    async def monitor_all_users(self):
-        while True:
-            await asyncio.sleep(60)
-            for user_id in self._get_connected_users():
-                await self._process_user_emails(user_id)
+    def _is_stale_cursor(self, user_id: int, token_version: int | None) -> bool:
+        if self.token_repo.token_version(user_id) == token_version:
+            return False
+        logging.getLogger(__name__).info(f"Пользователь {user_id} авторизовался заново, накопленный курсор отброшен")
+        return True
 
-    def _get_connected_users(self) -> List[int]:
-        return [
-            int(file[:-5]) for file in os.listdir(self.token_repo.tokens_dir)
-            if file.endswith('.json') and not file.endswith('_state.json')
-        ]
+    def _set_history_id(self, user_id: int, history_id: str):
+        if user_id not in self._pending_token_versions:
+            self._pending_token_versions[user_id] = self.token_repo.token_version(user_id)
+        self._pending_history_ids[user_id] = history_id
 
-    async def _process_user_emails(self, user_id: int):
-        if not self.token_repo.exists(user_id) or not self.state_repo.exists(user_id):
-            return
+    def _get_history_id(self, user_id: int) -> str | None:
+        pending = self._pending_history_ids.get(user_id)
+        if pending is not None:
+            if not self._is_stale_cursor(user_id, self._pending_token_versions.get(user_id)):
+                return pending
+            del self._pending_history_ids[user_id]
+            self._pending_token_versions.pop(user_id, None)
+        state = self.state_repo.get(user_id)
+        return state.last_history_id if state else None
 
-        user_state = UserState(user_id, self.token_repo.tokens_dir)
-        if not user_state.last_history_id:
+    async def _process_user(self, user_id: int):
+        if self.shard is not None and not self.shard.owns(user_id):
+            # пользователь переехал к другому воркеру после перебалансировки
             return
-
-        service = self.gmail_service.get_service(user_id)
-        if not service:
+        if not self.health.allow(user_id):
             return
+        async with self._user_locks[user_id]:
+            await self._process_user_emails(user_id)
 
-        try:
-            history_response = self.gmail_service.get_history(service, user_state.last_history_id)
-            histories = history_response.get('history', [])
-            new_history_id = history_response.get('historyId') or user_state.last_history_id
-
-            for hist in histories:
-                for msg_added in hist.get('messagesAdded', []):
-                    msg = msg_added['message']
-                    full_msg = self.gmail_service.get_message(service, msg['id'])
-                    email = EmailMessage(full_msg)
-                    date_str = email.headers.get('Date', '')
-                    try:
-                        date_obj = parsedate_to_datetime(date_str)
-                        formatted_date = date_obj.strftime("%d %b %Y, %H:%M")
-                    except Exception:
-                        formatted_date = date_str
-
-                    text_for_classification = None
-                    for attr in ("full_text", "body", "plain_text", "snippet"):
-                        if hasattr(email, attr):
-                            value = getattr(email, attr)
-                            if value:
-                                text_for_classification = value
-                                break
-                    if not text_for_classification:
-                        text_for_classification = (email.subject or "") + "\n" + (email.snippet or "")
-
-                    category = None
-                    if self.classifier:
-                        try:
-                            cls_result = self.classifier.predict(text_for_classification)
-                            category = cls_result.get('category')
-                        except Exception as e:
-                            logging.getLogger(__name__).error(f"Ошибка классификации письма {msg['id']}: {e}")
-                            category = None
-                    else:
-                        logging.getLogger(__name__).info("Классификатор не загружен — пропускаем")
-                        continue
-
-                    if not category:
-                        logging.getLogger(__name__).info(f"Письмо {msg['id']} пропущено: категория не определена")
-                        continue
-
-                    user_categories_map = self._load_user_categories_file()
-                    selected_for_user = user_categories_map.get(user_id, set())
-
-                    if not selected_for_user:
-                        logging.getLogger(__name__).info(
-                            f"Письмо {msg['id']} пропущено для пользователя {user_id}: нет выбранных категорий")
-                        continue
-
-                    if category not in selected_for_user:
-                        logging.getLogger(__name__).info(
-                            f"Письмо {msg['id']} пропущено: категория '{category}' не выбрана пользователем {user_id}"
-                        )
-                        continue
-
-                    notification = (
-                        f"📬 *НОВОЕ ПИСЬМО*\n\n"
-                        f"👤 *От:* {email.from_}\n"
-                        f"📅 *Дата:* {formatted_date}\n"
-                        f"📌 *Тема:* {email.subject}\n"
-                        f"📂 *Категория:* {category}\n\n"
-                        f"📄 *Содержание:*\n{email.snippet}\n\n"
-                        "━━━━━━━━━━━━━━━━━━━━"
-                    )
+    def _get_connected_users(self) -> List[int]:
+        users = self.token_repo.connected_users()
+        if self.shard is not None:
+            return self.shard.filter(users)
+        return users
 
-                    await self.bot.send_message(
-                        user_id,
-                        notification,
-                        parse_mode='Markdown',
-                        disable_web_page_preview=True
-                    )
+    async def _process_user_emails(self, user_id: int):
+        if not self.token_repo.exists(user_id):
+            return
 
-            if new_history_id != user_state.last_history_id:
-                user_state.save_last_history_id(new_history_id)
+        last_history_id = self._get_history_id(user_id)
+        if not last_history_id:
+            return
 
+        try:
+            # сборка Resource тоже может упасть (битый токен, ошибка обновления) — это такой же сбой аккаунта
+            service = await self.gmail_service.get_service(user_id)
+            if not service:
+                return
+            try:
+                await self._process_history(user_id, service, last_history_id)
+            except HttpError as e:
+                if e.resp.status != 404:
+                    raise
+                # historyId устарел: начинаем с текущего
+                profile = await self.gmail_service.get_profile(service)
+                self._set_history_id(user_id, profile['historyId'])
+            self.health.record_success(user_id)
         except HttpError as e:
-            if e.resp.status == 404:
-                profile = self.gmail_service.get_profile(service)
-                user_state.save_last_history_id(profile['historyId'])
+            if e.resp.status == 401:
+                self.gmail_service.invalidate(user_id)
+            logging.error(f"HttpError processing email for user {user_id}: {str(e)}")
+            self.health.record_failure(user_id, f"HTTP {e.resp.status}")
+        except RefreshError as e:
+            self.gmail_service.invalidate(user_id)
+            logging.error(f"Токен пользователя {user_id} отозван или недействителен: {e}")
+            if 'invalid_grant' in str(e):
+                self._park_user(user_id, f"invalid_grant: {e}")
             else:
-                logging.error(f"HttpError processing email for user {user_id}: {str(e)}")
+                self.health.record_failure(user_id, f"RefreshError: {e}")
         except Exception as e:
-            logging.error(f"Error processing email for user {user_id}: {str(e)}")
\ No newline at end of file
+            logging.error(f"Error processing email for user {user_id}: {str(e)}")
+            self.health.record_failure(user_id, f"{type(e).__name__}: {e}")
+        finally:
+            token_version = await self.gmail_service.sync_credentials(user_id)
+            if token_version is not None and user_id in self._pending_token_versions:
+                # токен обновили мы сами, курсор остаётся действительным
+                self._pending_token_versions[user_id] = token_version
+
+    def _on_user_timeout(self, user_id: int):
+        # зависший ящик — такой же сбой аккаунта: без этого его опрашивали бы с полной частотой
+        self.health.record_failure(user_id, "timeout")
+
+    def _park_user(self, user_id: int, reason: str):
+        """Токен отозван навсегда: опрос останавливается до /auth, пользователь получает одно сообщение."""
+        if self.health.is_parked(user_id):
+            return
+        self.health.park(user_id, reason)
+        self.notifier.submit(
+            user_id,
+            "⚠️ Доступ к Gmail больше недействителен, уведомления приостановлены.\n"
+            "Чтобы возобновить их, подключите почту заново командой /auth",
+        )
+
+    async def _process_history(self, user_id: int, service, last_history_id: str):
+        """
+        Читает историю постранично и обрабатывает письма каждой страницы сразу.
+        За цикл обрабатывается не больше message_budget писем; курсором служит id
+        последней обработанной записи истории, с него продолжится следующий цикл.
+        """
+        processed = 0
+        cursor = last_history_id
+        async with aclosing(iter_history(self.gmail_service, service, last_history_id,
+                                         self.history_page_size)) as pages:
+            async for page in pages:
+                msg_ids = []
+                budget_exhausted = False
+                for hist in page.get('history', []):
+                    added = [msg_added['message']['id'] for msg_added in hist.get('messagesAdded', [])]
+                    # запись истории не делится: курсор может указывать только на её конец
+                    if processed + len(msg_ids) + len(added) > self.message_budget and (processed or msg_ids):
+                        budget_exhausted = True
+                        break
+                    msg_ids.extend(added)
+                    cursor = hist.get('id', cursor)
+                else:
+                    if not page.get('nextPageToken'):
+                        cursor = page.get('historyId') or cursor
+
+                if msg_ids:
+                    await self.pipeline.run(user_id, service, msg_ids)
+                    processed += len(msg_ids)
+                if cursor != last_history_id:
+                    self._set_history_id(user_id, cursor)
+
+                if budget_exhausted:
+                    logging.getLogger(__name__).info(
+                        f"Пользователь {user_id}: обработано {processed} писем за цикл, "
+                        f"остаток истории после {cursor} будет дочитан в следующем цикле"
+                    )
+                    self.scheduler.record_activity(user_id, processed, backlog=True)
+                    return
+        self.scheduler.record_activity(user_id, processed)
\ No newline at end of file
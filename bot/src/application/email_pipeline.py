@@ -0,0 +1,179 @@
+import logging
+from collections import Counter
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import AbstractSet, Dict, List
+from aiogram import Bot
+from googleapiclient.discovery import Resource
+from bot.src.application.gmail_client import AsyncGmailService
+from bot.src.application.classification_batcher import ClassificationBatcher
+from bot.src.application.notification_queue import NotificationQueue
+from bot.src.domain.entities.email_message_class import EmailMessage
+from bot.src.domain.repositories.category_repository import CategoryRepository
+from bot.src.config.monitor_config import MIN_CONFIDENCE
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("subscription", "fetch", "classify", "confidence", "filter", "notify")
+
+
+@dataclass
+class PipelineItem:
+    msg_id: str
+    email: EmailMessage | None = None
+    category: str | None = None
+    confidence: float | None = None
+
+
+class EmailPipeline:
+    """
+    Обработка новых писем пользователя по стадиям:
+    проверка подписки → загрузка метаданных → классификация → порог уверенности →
+    фильтр по категориям → уведомление.
+    Каждая стадия может оборвать обработку; для каждой ведутся счётчики пропущенных и прошедших писем.
+    С очередью уведомлений стадия notify только ставит сообщения в очередь, без неё — отправляет сама.
+    """
+
+    def __init__(self, bot: Bot, gmail_service: AsyncGmailService, category_repo: CategoryRepository,
+                 batcher: ClassificationBatcher | None = None, min_confidence: float = MIN_CONFIDENCE,
+                 notifier: NotificationQueue | None = None):
+        self.bot = bot
+        self.notifier = notifier
+        self.gmail_service = gmail_service
+        self.category_repo = category_repo
+        self.batcher = batcher
+        self.min_confidence = min_confidence
+        self.stats: Counter = Counter()
+
+    async def run(self, user_id: int, service: Resource, msg_ids: List[str]):
+        items = [PipelineItem(msg_id) for msg_id in msg_ids]
+        self.stats["received"] += len(items)
+
+        selected = self.category_repo.get(user_id)
+        items = self._pass("subscription", items, [] if not selected else items)
+        if not items:
+            logger.info(f"Пользователь {user_id}: нет выбранных категорий, письма не загружаются")
+            return
+
+        items = self._pass("fetch", items, await self._fetch(service, items))
+        if not items:
+            return
+
+        items = self._pass("classify", items, await self._classify(items))
+        if not items:
+            return
+
+        items = self._pass("confidence", items, self._confident(items))
+        if not items:
+            return
+
+        items = self._pass("filter", items, self._filter(user_id, items, selected))
+        if not items:
+            return
+
+        self._pass("notify", items, await self._notify(user_id, items))
+
+    def _pass(self, stage: str, before: List[PipelineItem], after: List[PipelineItem]) -> List[PipelineItem]:
+        self.stats[f"{stage}.passed"] += len(after)
+        self.stats[f"{stage}.dropped"] += len(before) - len(after)
+        return after
+
+    def snapshot(self) -> Dict[str, int]:
+        return dict(self.stats)
+
+    def summary(self) -> str:
+        return ", ".join(
+            f"{stage}: {self.stats[f'{stage}.passed']}/-{self.stats[f'{stage}.dropped']}" for stage in STAGES
+        )
+
+    async def _fetch(self, service: Resource, items: List[PipelineItem]) -> List[PipelineItem]:
+        messages = await self.gmail_service.get_messages(service, [item.msg_id for item in items])
+        fetched = []
+        for item in items:
+            if item.msg_id in messages:
+                item.email = EmailMessage(messages[item.msg_id])
+                fetched.append(item)
+        return fetched
+
+    async def _classify(self, items: List[PipelineItem]) -> List[PipelineItem]:
+        if not self.batcher:
+            logger.info("Классификатор не загружен — пропускаем")
+            return []
+
+        results = await self.batcher.classify([self._text_for_classification(item.email) for item in items])
+        classified = []
+        for item, result in zip(items, results):
+            if result is None:
+                logger.error(f"Ошибка классификации письма {item.msg_id}")
+                continue
+            item.category = result.get('category')
+            item.confidence = result.get('confidence')
+            if not item.category:
+                logger.info(f"Письмо {item.msg_id} пропущено: категория не определена")
+                continue
+            classified.append(item)
+        return classified
+
+    def _confident(self, items: List[PipelineItem]) -> List[PipelineItem]:
+        confident = []
+        for item in items:
+            # у классификаторов без оценок уверенности confidence = None, такие письма не отсекаем
+            if item.confidence is not None and item.confidence < self.min_confidence:
+                logger.info(
+                    f"Письмо {item.msg_id} пропущено: уверенность {item.confidence:.2f} "
+                    f"для категории '{item.category}' ниже {self.min_confidence:.2f}"
+                )
+                continue
+            confident.append(item)
+        return confident
+
+    @staticmethod
+    def _filter(user_id: int, items: List[PipelineItem], selected: AbstractSet[str]) -> List[PipelineItem]:
+        matched = []
+        for item in items:
+            if item.category not in selected:
+                logger.info(
+                    f"Письмо {item.msg_id} пропущено: категория '{item.category}' не выбрана пользователем {user_id}"
+                )
+                continue
+            matched.append(item)
+        return matched
+
+    async def _notify(self, user_id: int, items: List[PipelineItem]) -> List[PipelineItem]:
+        sent = []
+        for item in items:
+            text = self._format_notification(item)
+            if self.notifier is not None:
+                self.notifier.submit(user_id, text, parse_mode='Markdown', disable_web_page_preview=True)
+            else:
+                await self.bot.send_message(user_id, text, parse_mode='Markdown', disable_web_page_preview=True)
+            sent.append(item)
+        return sent
+
+    @staticmethod
+    def _text_for_classification(email: EmailMessage) -> str:
+        for attr in ("full_text", "body", "plain_text", "snippet"):
+            value = getattr(email, attr, None)
+            if value:
+                return value
+        return (email.subject or "") + "\n" + (email.snippet or "")
+
+    @staticmethod
+    def _format_notification(item: PipelineItem) -> str:
+        email = item.email
+        date_str = email.headers.get('Date', '')
+        try:
+            formatted_date = parsedate_to_datetime(date_str).strftime("%d %b %Y, %H:%M")
+        except Exception:
+            formatted_date = date_str
+
+        category = item.category if item.confidence is None else f"{item.category} ({item.confidence:.0%})"
+        return (
+            f"📬 *НОВОЕ ПИСЬМО*\n\n"
+            f"👤 *От:* {email.from_}\n"
+            f"📅 *Дата:* {formatted_date}\n"
+            f"📌 *Тема:* {email.subject}\n"
+            f"📂 *Категория:* {category}\n\n"
+            f"📄 *Содержание:*\n{email.snippet}\n\n"
+            "━━━━━━━━━━━━━━━━━━━━"
+        )
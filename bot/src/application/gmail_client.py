@@ -1,32 +1,263 @@
+import asyncio
+import functools
+import logging
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import httplib2
+from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.discovery import build, Resource
-from typing import Dict
+from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpRequest
+from typing import AsyncIterator, Dict, List
 from bot.src.config.oauth_config import SCOPES
+from bot.src.config.monitor_config import GMAIL_IO_WORKERS, GMAIL_SERVICE_CACHE_SIZE, HISTORY_PAGE_SIZE
 from bot.src.domain.repositories.token_repositories import TokenRepository
+from bot.src.application.gmail_quota import QuotaAccountant
+
+BATCH_LIMIT = 100
+BATCH_MAX_RETRIES = 3
+BATCH_RETRY_BASE_DELAY = 0.5
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+_thread_transport = threading.local()
+
+
+def _build_request(credentials: Credentials, http, *args, **kwargs) -> HttpRequest:
+    """
+    requestBuilder для Resource: httplib2.Http не потокобезопасен, а Resource пользователя
+    вызывается из нескольких потоков пула сразу. Каждый запрос получает свой AuthorizedHttp
+    поверх httplib2.Http текущего потока, соединения переиспользуются внутри потока.
+    """
+    transport = getattr(_thread_transport, 'http', None)
+    if transport is None:
+        transport = _thread_transport.http = httplib2.Http()
+    return HttpRequest(AuthorizedHttp(credentials, http=transport), *args, **kwargs)
+
+
+@dataclass
+class _CachedService:
+    service: Resource
+    creds: Credentials
+    token: str | None
+    version: int | None
 
 
 class GmailService:
-    def __init__(self, token_repo: TokenRepository):
+    def __init__(self, token_repo: TokenRepository, cache_size: int = GMAIL_SERVICE_CACHE_SIZE,
+                 quota: QuotaAccountant | None = None):
         self.token_repo = token_repo
+        self.cache_size = cache_size
+        self.quota = quota or QuotaAccountant()
+        self._cache: OrderedDict[int, _CachedService] = OrderedDict()
+        # Resource -> user_id, чтобы списывать квоту с пользователя по переданному service
+        self._owners: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
 
     def get_service(self, user_id: int) -> Resource | None:
+        """
+        Возвращает Gmail Resource пользователя из LRU-кэша.
+        Запись пересоздаётся, если файл токена изменился (повторная авторизация).
+        """
+        version = self.token_repo.token_version(user_id)
+        with self._lock:
+            entry = self._cache.get(user_id)
+            if entry is not None and entry.version == version:
+                self._cache.move_to_end(user_id)
+                return entry.service
+            self._cache.pop(user_id, None)
+
         creds = self.token_repo.load_credentials(user_id, SCOPES)
-        if creds:
-            return build("gmail", "v1", credentials=creds)
-        return None
+        if not creds:
+            return None
+        service = build("gmail", "v1", http=AuthorizedHttp(creds, http=httplib2.Http()), cache_discovery=False,
+                        requestBuilder=functools.partial(_build_request, creds))
+
+        with self._lock:
+            self._cache[user_id] = _CachedService(service, creds, creds.token, version)
+            self._owners[service] = user_id
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return service
+
+    def sync_credentials(self, user_id: int) -> int | None:
+        """Сохраняет токен, если google-auth обновил его во время запросов; возвращает новую версию токена."""
+        with self._lock:
+            entry = self._cache.get(user_id)
+            if entry is None or entry.creds.token == entry.token:
+                return None
+            entry.token = entry.creds.token
+        self.token_repo.save_credentials(user_id, entry.creds)
+        with self._lock:
+            entry.version = self.token_repo.token_version(user_id)
+            return entry.version
+
+    def invalidate(self, user_id: int):
+        """Удаляет пользователя из кэша (токен отозван или заменён)."""
+        with self._lock:
+            self._cache.pop(user_id, None)
+
+    def owner(self, service: Resource) -> int | None:
+        """Пользователь, для которого создан service (None — service не из кэша)."""
+        try:
+            return self._owners.get(service)
+        except TypeError:
+            return None
+
+    def _charge(self, service: Resource, method: str, count: int = 1):
+        self.quota.charge(self.owner(service), method, count)
 
     def get_profile(self, service: Resource) -> Dict:
+        self._charge(service, 'getProfile')
         return service.users().getProfile(userId='me').execute()
 
-    def get_history(self, service: Resource, start_history_id: str) -> Dict:
+    def get_history(self, service: Resource, start_history_id: str, page_token: str | None = None,
+                    max_results: int = HISTORY_PAGE_SIZE) -> Dict:
+        """Одна страница истории; следующая запрашивается по nextPageToken."""
+        self._charge(service, 'history.list')
+        params = {}
+        if page_token:
+            params['pageToken'] = page_token
         return service.users().history().list(
             userId='me',
             startHistoryId=start_history_id,
-            historyTypes=['messageAdded']
+            historyTypes=['messageAdded'],
+            maxResults=max_results,
+            **params,
         ).execute()
 
     def get_message(self, service: Resource, msg_id: str) -> Dict:
+        self._charge(service, 'messages.get')
         return service.users().messages().get(
             userId='me',
             id=msg_id,
             format='metadata'
         ).execute()
+
+    def watch(self, service: Resource, topic_name: str) -> Dict:
+        self._charge(service, 'watch')
+        return service.users().watch(userId='me', body={'topicName': topic_name}).execute()
+
+    def get_messages(self, service: Resource, msg_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Загружает письма пачками через batch-запросы Gmail (до BATCH_LIMIT на запрос).
+        Подзапросы, завершившиеся 429/5xx, повторяются с экспоненциальной задержкой.
+        Возвращает dict {msg_id: message} в порядке msg_ids; письма, которые так и не удалось
+        получить (удалены или ошибка), в результат не попадают.
+        """
+        fetched: Dict[str, Dict] = {}
+        pending = list(dict.fromkeys(msg_ids))
+
+        for attempt in range(BATCH_MAX_RETRIES + 1):
+            retry: List[str] = []
+            for start in range(0, len(pending), BATCH_LIMIT):
+                retry.extend(self._execute_batch(service, pending[start:start + BATCH_LIMIT], fetched))
+            if not retry:
+                break
+            if attempt == BATCH_MAX_RETRIES:
+                logging.getLogger(__name__).error(f"Не удалось получить письма после повторов: {retry}")
+                break
+            time.sleep(BATCH_RETRY_BASE_DELAY * 2 ** attempt)
+            pending = retry
+
+        return {msg_id: fetched[msg_id] for msg_id in msg_ids if msg_id in fetched}
+
+    def _execute_batch(self, service: Resource, msg_ids: List[str], fetched: Dict[str, Dict]) -> List[str]:
+        retry: List[str] = []
+        # каждый подзапрос batch расходует квоту как отдельный messages.get
+        self._charge(service, 'messages.get', len(msg_ids))
+
+        def callback(request_id, response, exception):
+            if exception is None:
+                fetched[request_id] = response
+            elif isinstance(exception, HttpError) and exception.resp.status in RETRYABLE_STATUSES:
+                retry.append(request_id)
+            elif isinstance(exception, HttpError) and exception.resp.status == 404:
+                logging.getLogger(__name__).info(f"Письмо {request_id} не найдено, пропускаем")
+            else:
+                logging.getLogger(__name__).error(f"Ошибка получения письма {request_id}: {exception}")
+
+        batch = service.new_batch_http_request(callback=callback)
+        for msg_id in msg_ids:
+            batch.add(
+                service.users().messages().get(userId='me', id=msg_id, format='metadata'),
+                request_id=msg_id,
+            )
+        batch.execute()
+        return retry
+
+
+class AsyncGmailService:
+    """
+    Асинхронный доступ к Gmail: блокирующие вызовы googleapiclient выполняются
+    в ограниченном пуле потоков и не останавливают event loop бота.
+    Перед вызовом API ожидание квоты пользователя идёт в event loop, а не в потоке пула.
+    """
+
+    def __init__(self, gmail_service: GmailService, max_workers: int = GMAIL_IO_WORKERS,
+                 quota: QuotaAccountant | None = None):
+        self.gmail_service = gmail_service
+        if quota is None and isinstance(gmail_service, GmailService):
+            quota = gmail_service.quota
+        self.quota = quota
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gmail-io")
+
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def _call(self, func, service: Resource, *args, **kwargs):
+        """Вызов Gmail API: сначала ждём квоту владельца service, затем отдаём вызов в пул."""
+        if self.quota is not None:
+            await self.quota.wait(self.gmail_service.owner(service))
+        return await self._run(func, service, *args, **kwargs)
+
+    async def get_service(self, user_id: int) -> Resource | None:
+        return await self._run(self.gmail_service.get_service, user_id)
+
+    async def sync_credentials(self, user_id: int) -> int | None:
+        return await self._run(self.gmail_service.sync_credentials, user_id)
+
+    def invalidate(self, user_id: int):
+        self.gmail_service.invalidate(user_id)
+
+    async def get_profile(self, service: Resource) -> Dict:
+        return await self._call(self.gmail_service.get_profile, service)
+
+    async def get_history(self, service: Resource, start_history_id: str, page_token: str | None = None,
+                          max_results: int = HISTORY_PAGE_SIZE) -> Dict:
+        return await self._call(self.gmail_service.get_history, service, start_history_id,
+                                page_token=page_token, max_results=max_results)
+
+    async def get_message(self, service: Resource, msg_id: str) -> Dict:
+        return await self._call(self.gmail_service.get_message, service, msg_id)
+
+    async def get_messages(self, service: Resource, msg_ids: List[str]) -> Dict[str, Dict]:
+        return await self._call(self.gmail_service.get_messages, service, msg_ids)
+
+    async def watch(self, service: Resource, topic_name: str) -> Dict:
+        return await self._call(self.gmail_service.watch, service, topic_name)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def iter_history(gmail_service: AsyncGmailService, service: Resource, start_history_id: str,
+                       page_size: int = HISTORY_PAGE_SIZE) -> AsyncIterator[Dict]:
+    """
+    Постранично отдаёт историю начиная с start_history_id, следуя nextPageToken.
+    Следующая страница запрашивается, только когда потребитель обработал предыдущую,
+    поэтому прерванный обход не тратит лишних запросов.
+    """
+    page_token = None
+    while True:
+        page = await gmail_service.get_history(service, start_history_id, page_token=page_token,
+                                               max_results=page_size)
+        yield page
+        page_token = page.get('nextPageToken')
+        if not page_token:
+            return
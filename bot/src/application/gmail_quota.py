@@ -0,0 +1,115 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import Counter, deque
+from typing import Callable, Dict, Hashable
+from bot.src.application.rate_limit import KeyedTokenBuckets, TokenBucket
+from bot.src.config.quota_config import (
+    GMAIL_USER_QUOTA, GMAIL_PROJECT_QUOTA, GMAIL_QUOTA_SAFETY, QUOTA_PRESSURE_THRESHOLD, QUOTA_MAX_STRETCH,
+)
+
+logger = logging.getLogger(__name__)
+
+# стоимость вызовов в единицах квоты Gmail API
+METHOD_COSTS = {
+    'history.list': 2,
+    'messages.get': 5,
+    'getProfile': 1,
+    'watch': 100,
+    'stop': 50,
+}
+
+PRESSURE_WINDOW = 60.0
+
+
+class QuotaAccountant:
+    """
+    Учёт квоты Gmail: каждый вызов списывает свою стоимость из ведра пользователя
+    и общего ведра проекта, уводя их в долг, но не блокируя поток пула Gmail.
+    Ожидание выполняется в event loop до отправки следующего вызова (wait), поэтому
+    пользователь, выбравший квоту, не занимает потоки пула, нужные остальным.
+    pressure() — доля проектной квоты, израсходованная за последнюю минуту; по ней
+    планировщик растягивает интервал опроса (stretch), не доводя до ошибок 429.
+    charge вызывается из потоков пула Gmail, поэтому всё состояние под блокировкой.
+    """
+
+    def __init__(self, user_quota: float = GMAIL_USER_QUOTA, project_quota: float = GMAIL_PROJECT_QUOTA,
+                 safety: float = GMAIL_QUOTA_SAFETY, pressure_threshold: float = QUOTA_PRESSURE_THRESHOLD,
+                 max_stretch: float = QUOTA_MAX_STRETCH, clock: Callable[[], float] = time.monotonic):
+        user_rate = user_quota * safety
+        self.project_rate = project_quota * safety
+        self.pressure_threshold = pressure_threshold
+        self.max_stretch = max_stretch
+        self.clock = clock
+        self.user_buckets = KeyedTokenBuckets(user_rate, user_rate, clock=clock)
+        self.project_bucket = TokenBucket(self.project_rate, self.project_rate, clock)
+        self.units: Counter = Counter()
+        self.throttled = 0
+        self.throttled_seconds = 0.0
+        self._recent: deque = deque()
+        self._recent_units = 0
+        self._lock = threading.Lock()
+
+    def charge(self, user_id: Hashable | None, method: str, count: int = 1):
+        """Списывает стоимость count вызовов method; не ждёт, ведра могут уйти в долг."""
+        cost = METHOD_COSTS[method] * count
+        if cost <= 0:
+            return
+        with self._lock:
+            now = self.clock()
+            self.project_bucket.reserve(cost)
+            if user_id is not None:
+                self.user_buckets.get(user_id).reserve(cost)
+            self.units[method] += cost
+            self._recent.append((now, cost))
+            self._recent_units += cost
+
+    def delay(self, user_id: Hashable | None) -> float:
+        """Сколько ждать перед следующим вызовом пользователя, пока его ведро и ведро проекта в долгу."""
+        with self._lock:
+            delay = self.project_bucket.debt_delay()
+            if user_id is not None:
+                delay = max(delay, self.user_buckets.get(user_id).debt_delay())
+            return delay
+
+    async def wait(self, user_id: Hashable | None):
+        """Ждёт в event loop, пока квота не позволит следующий вызов."""
+        delay = self.delay(user_id)
+        if delay <= 0:
+            return
+        with self._lock:
+            self.throttled += 1
+            self.throttled_seconds += delay
+        logger.debug(f"Квота Gmail: вызов для {user_id} ждёт {delay:.2f} с")
+        await asyncio.sleep(delay)
+
+    def pressure(self) -> float:
+        """Доля проектной квоты, израсходованная за последние PRESSURE_WINDOW секунд."""
+        with self._lock:
+            horizon = self.clock() - PRESSURE_WINDOW
+            while self._recent and self._recent[0][0] < horizon:
+                self._recent_units -= self._recent.popleft()[1]
+            return self._recent_units / (self.project_rate * PRESSURE_WINDOW)
+
+    def stretch(self) -> float:
+        """Во сколько раз растянуть интервал опроса при текущей загрузке квоты."""
+        pressure = self.pressure()
+        if pressure <= self.pressure_threshold:
+            return 1.0
+        return min(self.max_stretch, pressure / self.pressure_threshold)
+
+    def snapshot(self) -> Dict:
+        return {
+            'units': dict(self.units),
+            'pressure': round(self.pressure(), 3),
+            'throttled': self.throttled,
+            'throttled_seconds': round(self.throttled_seconds, 2),
+        }
+
+    def summary(self) -> str:
+        total = sum(self.units.values())
+        return (
+            f"израсходовано {total} единиц ({dict(self.units)}), загрузка проекта {self.pressure():.0%}, "
+            f"ожиданий квоты {self.throttled} ({self.throttled_seconds:.1f} с)"
+        )
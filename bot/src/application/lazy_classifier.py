@@ -0,0 +1,57 @@
+import asyncio
+import logging
+from typing import Callable, Dict, List
+from bot.src.config.ml_config import ML_MODELS_DIR
+
+logger = logging.getLogger(__name__)
+
+
+def load_email_classifier(model_dir: str | None = ML_MODELS_DIR):
+    """
+    Создаёт реестр моделей и загружает активную версию; ML-зависимости импортируются только здесь.
+    Реестр сам подхватывает новые версии в фоне, перезапуск бота не нужен.
+    """
+    try:
+        from ML.classifier.model_registry import ModelRegistry
+        registry = ModelRegistry(model_dir)
+        if not registry.check() and registry.active is None:
+            logger.error("Модель не загружена, ждём появления новой версии")
+        registry.start_watching()
+        return registry
+    except Exception as e:
+        logger.error(f"Не удалось инициализировать реестр моделей: {e}")
+    return None
+
+
+class LazyClassifier:
+    """
+    Загружает классификатор в фоновом потоке при первом обращении.
+    Пока модель грузится, event loop свободен: бот отвечает на команды,
+    а классификация ждёт окончания загрузки. Сама классификация тоже идёт в потоке.
+    """
+
+    def __init__(self, factory: Callable[[], object] = load_email_classifier):
+        self.factory = factory
+        self._task: asyncio.Task | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self._task is not None and self._task.done()
+
+    def start_loading(self) -> asyncio.Task:
+        if self._task is None:
+            logger.info("Загрузка классификатора в фоне...")
+            self._task = asyncio.create_task(asyncio.to_thread(self.factory))
+        return self._task
+
+    async def get(self):
+        return await self.start_loading()
+
+    async def batch_predict(self, texts: List[str]) -> List[Dict]:
+        classifier = await self.get()
+        if classifier is None:
+            raise RuntimeError("Классификатор не загружен")
+        return await asyncio.to_thread(classifier.batch_predict, texts)
+
+    async def predict(self, text: str) -> Dict:
+        return (await self.batch_predict([text]))[0]
@@ -0,0 +1,77 @@
+import asyncio
+import logging
+from typing import Callable, Dict, List
+import aiohttp
+from bot.src.config.ml_config import ML_API_URL, ML_API_TIMEOUT, ML_API_MAX_CONNECTIONS
+
+logger = logging.getLogger(__name__)
+
+
+class MLApiClient:
+    """
+    Асинхронный клиент сервиса классификации (ML/api) с пулом соединений и таймаутами.
+    Если сервис недоступен, классифицирует локальной моделью, которая создаётся
+    через fallback_factory только при первой ошибке.
+    """
+
+    def __init__(
+            self,
+            base_url: str = ML_API_URL,
+            fallback_factory: Callable[[], object] | None = None,
+            timeout: float = ML_API_TIMEOUT,
+            max_connections: int = ML_API_MAX_CONNECTIONS,
+    ):
+        self.base_url = base_url.rstrip('/')
+        self.fallback_factory = fallback_factory
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.max_connections = max_connections
+        self.fallback_calls = 0
+        self._session: aiohttp.ClientSession | None = None
+        self._fallback = None
+        self._fallback_loaded = False
+        self._fallback_lock = asyncio.Lock()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                timeout=self.timeout,
+            )
+        return self._session
+
+    async def batch_predict(self, texts: List[str]) -> List[Dict]:
+        try:
+            async with self._get_session().post(f"{self.base_url}/predict_batch", json={'texts': texts}) as resp:
+                resp.raise_for_status()
+                return (await resp.json())['results']
+        except (aiohttp.ClientError, asyncio.TimeoutError, KeyError) as e:
+            logger.warning(f"ML API недоступен ({e!r}), используем локальную модель")
+
+        fallback = await self._get_fallback()
+        if fallback is None:
+            raise RuntimeError("ML API недоступен, локальная модель не загружена")
+        self.fallback_calls += 1
+        # TF-IDF и SVM не должны занимать event loop, пока сервис лежит
+        return await asyncio.to_thread(fallback.batch_predict, texts)
+
+    async def predict(self, text: str) -> Dict:
+        return (await self.batch_predict([text]))[0]
+
+    async def is_ready(self) -> bool:
+        try:
+            async with self._get_session().get(f"{self.base_url}/ready") as resp:
+                return resp.status == 200
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return False
+
+    async def _get_fallback(self):
+        if not self._fallback_loaded and self.fallback_factory is not None:
+            async with self._fallback_lock:
+                if not self._fallback_loaded:
+                    self._fallback = await asyncio.to_thread(self.fallback_factory)
+                    self._fallback_loaded = True
+        return self._fallback
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
@@ -0,0 +1,144 @@
+import asyncio
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Set
+from aiogram import Bot
+from aiogram.exceptions import (
+    TelegramBadRequest, TelegramForbiddenError, TelegramMigrateToChat, TelegramNotFound,
+    TelegramRetryAfter, TelegramUnauthorizedError,
+)
+from bot.src.application.rate_limit import KeyedTokenBuckets, TokenBucket
+from bot.src.config.notify_config import (
+    NOTIFY_WORKERS, NOTIFY_GLOBAL_RATE, NOTIFY_CHAT_RATE, NOTIFY_CHAT_BURST, NOTIFY_MAX_RETRIES,
+    NOTIFY_RETRY_BASE_DELAY,
+)
+
+logger = logging.getLogger(__name__)
+
+# повтор не поможет: бот заблокирован, чат не найден или сообщение некорректно
+PERMANENT_ERRORS = (
+    TelegramForbiddenError, TelegramBadRequest, TelegramNotFound, TelegramMigrateToChat, TelegramUnauthorizedError,
+)
+
+
+@dataclass
+class Notification:
+    chat_id: int
+    text: str
+    kwargs: Dict = field(default_factory=dict)
+    attempts: int = 0
+    # токен чата уже зарезервирован при откладывании, повторно не списывается
+    reserved: bool = False
+
+
+class NotificationQueue:
+    """
+    Исходящие сообщения Telegram: конвейер писем только ставит их в очередь,
+    отправляют несколько воркеров с общим и поканальным (на чат) token bucket.
+    Сообщение, которому чат ещё не разрешает отправку, откладывается, не занимая воркер;
+    на RetryAfter чат блокируется на указанное время, сетевые ошибки повторяются с backoff.
+    """
+
+    def __init__(self, bot: Bot, workers: int = NOTIFY_WORKERS, global_rate: float = NOTIFY_GLOBAL_RATE,
+                 chat_rate: float = NOTIFY_CHAT_RATE, chat_burst: float = NOTIFY_CHAT_BURST,
+                 max_retries: int = NOTIFY_MAX_RETRIES, retry_base_delay: float = NOTIFY_RETRY_BASE_DELAY):
+        self.bot = bot
+        self.workers = workers
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.global_bucket = TokenBucket(global_rate, max(global_rate, 1))
+        self.chat_buckets = KeyedTokenBuckets(chat_rate, chat_burst)
+        self.stats: Counter = Counter()
+        self._queue: asyncio.Queue[Notification] = asyncio.Queue()
+        self._deferred: Set[asyncio.TimerHandle] = set()
+
+    def submit(self, chat_id: int, text: str, **kwargs):
+        """Ставит сообщение в очередь; вызывается из event loop."""
+        self.stats["submitted"] += 1
+        self._queue.put_nowait(Notification(chat_id, text, kwargs))
+
+    @property
+    def depth(self) -> int:
+        """Сообщения, ожидающие отправки: в очереди и отложенные лимитом или повтором."""
+        return self._queue.qsize() + len(self._deferred)
+
+    def snapshot(self) -> Dict[str, int]:
+        return {**self.stats, "queued": self._queue.qsize(), "deferred": len(self._deferred)}
+
+    def summary(self) -> str:
+        return (
+            f"в очереди {self._queue.qsize()}, отложено {len(self._deferred)}, отправлено {self.stats['sent']}, "
+            f"повторов {self.stats['retried']}, RetryAfter {self.stats['flood_waits']}, "
+            f"не доставлено {self.stats['failed']}"
+        )
+
+    async def run(self):
+        await asyncio.gather(*(self._worker() for _ in range(self.workers)))
+
+    async def join(self):
+        """Ждёт, пока не опустеют очередь и отложенные сообщения (для тестов и остановки)."""
+        while self.depth:
+            await self._queue.join()
+            if self._deferred:
+                await asyncio.sleep(0.01)
+
+    def _defer(self, notification: Notification, delay: float):
+        loop = asyncio.get_running_loop()
+
+        def put():
+            self._deferred.discard(handle)
+            self._queue.put_nowait(notification)
+
+        handle = loop.call_later(delay, put)
+        self._deferred.add(handle)
+
+    async def _worker(self):
+        while True:
+            notification = await self._queue.get()
+            try:
+                await self._handle(notification)
+            except Exception as e:
+                logger.error(f"Ошибка отправки сообщения в чат {notification.chat_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _handle(self, notification: Notification):
+        chat_bucket = self.chat_buckets.get(notification.chat_id)
+        if notification.reserved:
+            notification.reserved = False
+        else:
+            delay = chat_bucket.reserve()
+            if delay > 0:
+                notification.reserved = True
+                self._defer(notification, delay)
+                return
+
+        await self.global_bucket.acquire()
+        try:
+            await self.bot.send_message(notification.chat_id, notification.text, **notification.kwargs)
+        except TelegramRetryAfter as e:
+            self.stats["flood_waits"] += 1
+            chat_bucket.block(e.retry_after)
+            logger.warning(f"Telegram просит подождать {e.retry_after} с перед отправкой в чат {notification.chat_id}")
+            self._defer(notification, e.retry_after)
+        except PERMANENT_ERRORS as e:
+            self.stats["failed"] += 1
+            logger.error(f"Сообщение в чат {notification.chat_id} не доставлено: {e}")
+        except Exception as e:
+            self._retry(notification, e)
+        else:
+            self.stats["sent"] += 1
+
+    def _retry(self, notification: Notification, error: Exception):
+        notification.attempts += 1
+        if notification.attempts > self.max_retries:
+            self.stats["failed"] += 1
+            logger.error(
+                f"Сообщение в чат {notification.chat_id} не доставлено после {self.max_retries} повторов: {error}"
+            )
+            return
+        self.stats["retried"] += 1
+        delay = self.retry_base_delay * 2 ** (notification.attempts - 1)
+        logger.warning(f"Ошибка отправки в чат {notification.chat_id}, повтор через {delay:.1f} с: {error}")
+        self._defer(notification, delay)
@@ -0,0 +1,277 @@
+import asyncio
+import heapq
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Iterable, List, Set, Tuple
+from bot.src.config.monitor_config import (
+    POLL_INTERVAL, MAX_CONCURRENT_USERS, USER_PROCESS_TIMEOUT,
+    MIN_POLL_INTERVAL, MAX_POLL_INTERVAL, MAX_POLL_STRETCH, POLL_TARGET_MESSAGES, ACTIVITY_EWMA_ALPHA,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class UserPollResult:
+    user_id: int
+    lag: float
+    duration: float
+    status: str
+
+
+@dataclass
+class CycleStats:
+    started_at: float
+    duration: float = 0.0
+    results: List[UserPollResult] = field(default_factory=list)
+
+    @property
+    def max_lag(self) -> float:
+        return max((r.lag for r in self.results), default=0.0)
+
+    def count(self, status: str) -> int:
+        return sum(1 for r in self.results if r.status == status)
+
+
+class PollScheduler:
+    """
+    Планировщик опроса почты: равномерно распределяет пользователей по интервалу,
+    обрабатывает их параллельно (не более max_concurrency одновременно)
+    и ограничивает время обработки одного пользователя; о прерванной по таймауту обработке
+    сообщает on_timeout. interval_scale (например, QuotaAccountant.stretch) растягивает интервал
+    при нехватке квоты.
+    """
+
+    def __init__(
+            self,
+            process_user: Callable[[int], Awaitable[None]],
+            interval: float = POLL_INTERVAL,
+            max_concurrency: int = MAX_CONCURRENT_USERS,
+            user_timeout: float = USER_PROCESS_TIMEOUT,
+            on_cycle: Callable[[CycleStats], None] | None = None,
+            interval_scale: Callable[[], float] | None = None,
+            on_timeout: Callable[[int], None] | None = None,
+    ):
+        self.process_user = process_user
+        self.on_timeout = on_timeout
+        self.interval = interval
+        self.interval_scale = interval_scale
+        self.user_timeout = user_timeout
+        self.on_cycle = on_cycle
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.last_cycle: CycleStats | None = None
+
+    async def run_forever(self, get_users: Callable[[], Iterable[int]]):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            try:
+                await self.run_cycle(list(get_users()))
+            except Exception as e:
+                logger.error(f"Ошибка цикла опроса: {e}")
+            await asyncio.sleep(max(0.0, self.current_interval() - (loop.time() - started)))
+
+    def current_interval(self) -> float:
+        if self.interval_scale is None:
+            return self.interval
+        scale = self.interval_scale()
+        if scale > 1:
+            logger.info(f"Квота Gmail на исходе: интервал опроса увеличен в {scale:.1f} раза")
+        return self.interval * max(1.0, scale)
+
+    async def run_cycle(self, user_ids: List[int]) -> CycleStats:
+        loop = asyncio.get_running_loop()
+        stats = CycleStats(started_at=loop.time())
+        if user_ids:
+            slot = self.current_interval() / len(user_ids)
+            stats.results = await asyncio.gather(*(
+                self._run_user(user_id, stats.started_at + i * slot)
+                for i, user_id in enumerate(user_ids)
+            ))
+        stats.duration = loop.time() - stats.started_at
+        self.last_cycle = stats
+        self._report(stats)
+        if self.on_cycle:
+            self.on_cycle(stats)
+        return stats
+
+    def record_activity(self, user_id: int, messages: int, backlog: bool = False):
+        """Фиксированный интервал от активности пользователя не зависит."""
+
+    async def run_now(self, user_id: int) -> UserPollResult:
+        """Внеочередная обработка пользователя (например, по push-уведомлению)."""
+        return await self._run_user(user_id, asyncio.get_running_loop().time())
+
+    async def _run_user(self, user_id: int, due: float) -> UserPollResult:
+        loop = asyncio.get_running_loop()
+        delay = due - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        async with self._semaphore:
+            started = loop.time()
+            lag = max(0.0, started - due)
+            try:
+                await asyncio.wait_for(self.process_user(user_id), timeout=self.user_timeout)
+                status = "ok"
+            except asyncio.TimeoutError:
+                logger.warning(f"Обработка пользователя {user_id} превысила {self.user_timeout} с")
+                status = "timeout"
+                if self.on_timeout is not None:
+                    self.on_timeout(user_id)
+            except Exception as e:
+                logger.error(f"Error processing email for user {user_id}: {str(e)}")
+                status = "error"
+            return UserPollResult(user_id, lag, loop.time() - started, status)
+
+    def _report(self, stats: CycleStats):
+        for r in stats.results:
+            logger.debug(
+                f"Пользователь {r.user_id}: лаг {r.lag:.2f} с, обработка {r.duration:.2f} с, статус {r.status}"
+            )
+        logger.info(
+            f"Цикл опроса: {len(stats.results)} пользователей за {stats.duration:.2f} с, "
+            f"макс. лаг {stats.max_lag:.2f} с, таймаутов {stats.count('timeout')}, ошибок {stats.count('error')}"
+        )
+
+
+@dataclass
+class UserActivity:
+    rate: float | None = None
+    observed_at: float | None = None
+    backlog: bool = False
+
+
+class AdaptivePollScheduler(PollScheduler):
+    """
+    Опрос с индивидуальным интервалом: пользователи лежат в куче по времени следующего опроса.
+    Частота новых писем оценивается экспоненциальным средним (EWMA) по результатам history;
+    начальная оценка соответствует базовому interval, поэтому один пустой опрос лишь немного
+    растягивает интервал. Интервал выбирается так, чтобы между опросами приходило около
+    target_messages писем, и ограничивается [min_interval, min(max_interval, interval * max_stretch)].
+    Пользователь с недочитанной историей опрашивается с минимальным интервалом. Раз в interval список пользователей обновляется
+    и вызывается on_cycle со статистикой за прошедший период.
+    """
+
+    def __init__(
+            self,
+            process_user: Callable[[int], Awaitable[None]],
+            interval: float = POLL_INTERVAL,
+            max_concurrency: int = MAX_CONCURRENT_USERS,
+            user_timeout: float = USER_PROCESS_TIMEOUT,
+            on_cycle: Callable[[CycleStats], None] | None = None,
+            interval_scale: Callable[[], float] | None = None,
+            on_timeout: Callable[[int], None] | None = None,
+            min_interval: float = MIN_POLL_INTERVAL,
+            max_interval: float = MAX_POLL_INTERVAL,
+            max_stretch: float = MAX_POLL_STRETCH,
+            target_messages: float = POLL_TARGET_MESSAGES,
+            alpha: float = ACTIVITY_EWMA_ALPHA,
+            clock: Callable[[], float] = time.monotonic,
+    ):
+        super().__init__(process_user, interval, max_concurrency, user_timeout, on_cycle, interval_scale, on_timeout)
+        self.min_interval = min_interval
+        self.max_interval = min(max_interval, interval * max_stretch)
+        self.target_messages = target_messages
+        self.alpha = alpha
+        self.clock = clock
+        self._activity: Dict[int, UserActivity] = {}
+        self._heap: List[Tuple[float, int]] = []
+        self._scheduled: Set[int] = set()
+        self._users: Set[int] = set()
+        self._period_results: List[UserPollResult] = []
+        self._wakeup: asyncio.Event | None = None
+
+    def record_activity(self, user_id: int, messages: int, backlog: bool = False):
+        now = self.clock()
+        activity = self._activity.setdefault(user_id, UserActivity())
+        activity.backlog = backlog
+        if activity.observed_at is not None and now > activity.observed_at:
+            observed = messages / (now - activity.observed_at)
+            # априорная частота даёт базовый интервал, пока наблюдений мало
+            previous = self.target_messages / self.interval if activity.rate is None else activity.rate
+            activity.rate = self.alpha * observed + (1 - self.alpha) * previous
+        activity.observed_at = now
+
+    def user_interval(self, user_id: int) -> float:
+        activity = self._activity.get(user_id)
+        if activity is not None and activity.backlog:
+            interval = self.min_interval
+        elif activity is None or activity.rate is None:
+            interval = self.interval
+        elif activity.rate <= 0:
+            interval = self.max_interval
+        else:
+            interval = self.target_messages / activity.rate
+        interval = min(self.max_interval, max(self.min_interval, interval))
+        scale = self.interval_scale() if self.interval_scale else 1.0
+        return interval * max(1.0, scale)
+
+    def _refresh_users(self, user_ids: List[int], now: float):
+        self._users = set(user_ids)
+        for user_id in list(self._activity):
+            if user_id not in self._users:
+                del self._activity[user_id]
+        new_users = [user_id for user_id in user_ids if user_id not in self._scheduled]
+        if not new_users:
+            return
+        # новых пользователей (и всех при старте) распределяем по интервалу, как в обычном цикле
+        slot = self.interval / len(new_users)
+        for i, user_id in enumerate(new_users):
+            self._scheduled.add(user_id)
+            heapq.heappush(self._heap, (now + i * slot, user_id))
+
+    async def run_forever(self, get_users: Callable[[], Iterable[int]]):
+        loop = asyncio.get_running_loop()
+        tasks: Set[asyncio.Task] = set()
+        self._wakeup = asyncio.Event()
+        stats = CycleStats(started_at=loop.time())
+        next_refresh = stats.started_at
+        while True:
+            now = loop.time()
+            if now >= next_refresh:
+                if next_refresh != stats.started_at:
+                    stats = self._finish_period(stats, now)
+                try:
+                    self._refresh_users(list(get_users()), now)
+                except Exception as e:
+                    logger.error(f"Ошибка получения списка пользователей: {e}")
+                next_refresh = now + self.interval
+
+            while self._heap and self._heap[0][0] <= now:
+                due, user_id = heapq.heappop(self._heap)
+                if user_id not in self._users:
+                    self._scheduled.discard(user_id)
+                    continue
+                task = asyncio.create_task(self._poll(user_id, due))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+            # спим до ближайшего срока; завершившийся опрос может поставить пользователя раньше
+            wake = min(self._heap[0][0], next_refresh) if self._heap else next_refresh
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(0.0, wake - loop.time()))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _poll(self, user_id: int, due: float):
+        result = await self._run_user(user_id, due)
+        self._period_results.append(result)
+        loop = asyncio.get_running_loop()
+        heapq.heappush(self._heap, (loop.time() + self.user_interval(user_id), user_id))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _finish_period(self, stats: CycleStats, now: float) -> CycleStats:
+        stats.results, self._period_results = self._period_results, []
+        stats.duration = now - stats.started_at
+        self.last_cycle = stats
+        self._report(stats)
+        if self.on_cycle:
+            try:
+                self.on_cycle(stats)
+            except Exception as e:
+                logger.error(f"Ошибка обработки итогов периода: {e}")
+        return CycleStats(started_at=now)
@@ -0,0 +1,126 @@
+import asyncio
+import functools
+import logging
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List
+from bot.src.application.lazy_classifier import load_email_classifier
+from bot.src.config.ml_config import ML_MODELS_DIR, ML_POOL_WORKERS, ML_POOL_MAX_PENDING, ML_POOL_CHUNK_SIZE
+
+logger = logging.getLogger(__name__)
+
+# классификатор процесса-воркера: загружается один раз в initializer
+_classifier = None
+
+
+def _init_worker(loader: Callable[[], object]):
+    global _classifier
+    _classifier = loader()
+
+
+def _classify_batch(texts: List[str]) -> List[Dict]:
+    if _classifier is None:
+        raise RuntimeError("Классификатор в процессе-воркере не загружен")
+    return _classifier.batch_predict(texts)
+
+
+def _worker_ready() -> bool:
+    return _classifier is not None
+
+
+class ProcessPoolClassifier:
+    """
+    Классификация в пуле процессов: очистка текста, TF-IDF и SVM не занимают GIL и event loop бота.
+    Каждый процесс загружает модель один раз (initializer). Пакет делится на куски не меньше
+    chunk_size текстов — по одному на воркер, чтобы сократить накладные расходы на передачу данных.
+    В работе не больше max_pending кусков; остальные вызовы ждут, притормаживая конвейер (backpressure).
+    """
+
+    def __init__(self, workers: int = ML_POOL_WORKERS, max_pending: int = ML_POOL_MAX_PENDING,
+                 chunk_size: int = ML_POOL_CHUNK_SIZE, loader: Callable[[], object] | None = None,
+                 mp_context: str = "spawn"):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.chunk_size = chunk_size
+        # functools.partial от функции модуля сериализуется и передаётся в процессы
+        self.loader = loader or functools.partial(load_email_classifier, ML_MODELS_DIR)
+        self.mp_context = mp_context
+        self.batches = 0
+        self.texts = 0
+        self._pending = 0
+        self._executor: ProcessPoolExecutor | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._warmup: asyncio.Future | None = None
+
+    @property
+    def depth(self) -> int:
+        """Куски, ожидающие места в пуле или уже классифицируемые."""
+        return self._pending
+
+    @property
+    def ready(self) -> bool:
+        return self._warmup is not None and self._warmup.done()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context(self.mp_context),
+                initializer=_init_worker,
+                initargs=(self.loader,),
+            )
+        return self._executor
+
+    def start_loading(self) -> asyncio.Future:
+        """Запускает процессы пула, чтобы модели загрузились до первых писем."""
+        if self._warmup is None:
+            logger.info(f"Запуск пула классификации: {self.workers} процессов")
+            loop = asyncio.get_running_loop()
+            executor = self._get_executor()
+            self._warmup = asyncio.gather(
+                *(loop.run_in_executor(executor, _worker_ready) for _ in range(self.workers)),
+                return_exceptions=True,
+            )
+        return self._warmup
+
+    def _chunks(self, texts: List[str]) -> List[List[str]]:
+        size = max(self.chunk_size, math.ceil(len(texts) / self.workers))
+        return [texts[start:start + size] for start in range(0, len(texts), size)]
+
+    async def batch_predict(self, texts: List[str]) -> List[Dict]:
+        if not texts:
+            return []
+        results = await asyncio.gather(*(self._submit(chunk) for chunk in self._chunks(list(texts))))
+        self.batches += 1
+        self.texts += len(texts)
+        return [result for chunk in results for result in chunk]
+
+    async def predict(self, text: str) -> Dict:
+        return (await self.batch_predict([text]))[0]
+
+    async def _submit(self, chunk: List[str]) -> List[Dict]:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_pending)
+        self._pending += 1
+        try:
+            async with self._semaphore:
+                loop = asyncio.get_running_loop()
+                executor = self._get_executor()
+                try:
+                    return await loop.run_in_executor(executor, _classify_batch, chunk)
+                except BrokenProcessPool:
+                    # процесс упал (например, OOM): следующий вызов создаст пул заново
+                    if self._executor is executor:
+                        logger.error("Пул классификации сломан, пересоздаём")
+                        self._executor = None
+                        executor.shutdown(wait=False, cancel_futures=True)
+                    raise
+        finally:
+            self._pending -= 1
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,125 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Iterable, Set
+from bot.src.application.gmail_client import AsyncGmailService
+from bot.src.config.push_config import PUBSUB_TOPIC, WATCH_CHECK_INTERVAL, WATCH_RENEW_MARGIN
+
+logger = logging.getLogger(__name__)
+
+
+class WatchManager:
+    """
+    Подписывает почтовые ящики на push-уведомления (users.watch) и продлевает
+    подписки заранее, до истечения срока. Хранит соответствие email -> user_id.
+    """
+
+    def __init__(
+            self,
+            gmail_service: AsyncGmailService,
+            topic_name: str = PUBSUB_TOPIC,
+            renew_margin: float = WATCH_RENEW_MARGIN,
+    ):
+        self.gmail_service = gmail_service
+        self.topic_name = topic_name
+        self.renew_margin = renew_margin
+        self.expirations: Dict[int, float] = {}
+        self.email_to_user: Dict[str, int] = {}
+
+    def resolve_user(self, email_address: str) -> int | None:
+        return self.email_to_user.get(email_address.lower())
+
+    def needs_renewal(self, user_id: int) -> bool:
+        expiration = self.expirations.get(user_id)
+        return expiration is None or expiration - time.time() < self.renew_margin
+
+    async def ensure_watch(self, user_id: int) -> bool:
+        if not self.needs_renewal(user_id):
+            return True
+
+        service = await self.gmail_service.get_service(user_id)
+        if not service:
+            return False
+
+        try:
+            profile = await self.gmail_service.get_profile(service)
+            response = await self.gmail_service.watch(service, self.topic_name)
+        except Exception as e:
+            logger.error(f"Не удалось подписать пользователя {user_id} на push-уведомления: {e}")
+            return False
+
+        self.email_to_user[profile['emailAddress'].lower()] = user_id
+        self.expirations[user_id] = int(response['expiration']) / 1000
+        logger.info(f"Push-подписка пользователя {user_id} активна до {response['expiration']}")
+        return True
+
+    def forget(self, user_id: int):
+        """
+        Забывает отключившегося пользователя: уведомления на его адрес больше не сопоставляются.
+        users.stop не вызывается — токена уже нет, подписка истечёт сама (не позже чем через 7 дней).
+        """
+        self.expirations.pop(user_id, None)
+        for email_address in [email for email, owner in self.email_to_user.items() if owner == user_id]:
+            del self.email_to_user[email_address]
+        logger.info(f"Пользователь {user_id} отключился, push-уведомления для него игнорируются")
+
+    async def run(self, get_users: Callable[[], Iterable[int]], check_interval: float = WATCH_CHECK_INTERVAL,
+                  can_renew: Callable[[int], bool] | None = None):
+        """
+        Периодически подписывает подключённых пользователей и отписывает ушедших.
+        Пользователей, для которых can_renew возвращает False (аккаунт на паузе или запаркован),
+        не продлевают: users.watch стоит 100 единиц квоты и для них всё равно не сработает.
+        """
+        while True:
+            users = list(get_users())
+            # уведомления отключившихся пользователей до истечения подписки отбрасываются
+            for user_id in set(self.expirations) - set(users):
+                self.forget(user_id)
+            for user_id in users:
+                if can_renew is None or can_renew(user_id):
+                    await self.ensure_watch(user_id)
+            await asyncio.sleep(check_interval)
+
+
+class PushNotificationQueue:
+    """
+    Очередь push-уведомлений между HTTP-приёмником (поток Flask) и event loop монитора.
+    Повторные уведомления для пользователя, уже стоящего в очереди, схлопываются.
+    """
+
+    def __init__(self, watch_manager: WatchManager):
+        self.watch_manager = watch_manager
+        self._queue: asyncio.Queue[int] = asyncio.Queue()
+        self._pending: Set[int] = set()
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def submit(self, email_address: str, history_id: str | None = None):
+        """Потокобезопасно принимает уведомление от приёмника."""
+        if self._loop is None:
+            logger.warning(f"Push-уведомление для {email_address} получено до запуска монитора, пропускаем")
+            return
+        self._loop.call_soon_threadsafe(self._enqueue, email_address)
+
+    def _enqueue(self, email_address: str):
+        user_id = self.watch_manager.resolve_user(email_address)
+        if user_id is None:
+            logger.info(f"Push-уведомление для неизвестного адреса {email_address}, пропускаем")
+            return
+        if user_id in self._pending:
+            return
+        self._pending.add(user_id)
+        self._queue.put_nowait(user_id)
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    async def consume(self, process_user: Callable[[int], Awaitable[object]]):
+        self._loop = asyncio.get_running_loop()
+        tasks: Set[asyncio.Task] = set()
+        while True:
+            user_id = await self._queue.get()
+            self._pending.discard(user_id)
+            task = asyncio.create_task(process_user(user_id))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
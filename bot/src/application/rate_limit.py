@@ -0,0 +1,84 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+
+class TokenBucket:
+    """
+    Token bucket: rate токенов в секунду, не больше capacity подряд.
+    reserve() списывает токен сразу и возвращает, сколько ждать до права отправки,
+    поэтому очередные резервы выстраиваются по порядку без гонок между ожидающими.
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, tokens: float = 1) -> float:
+        """Забирает tokens (допуская долг) и возвращает задержку в секундах."""
+        now = self.clock()
+        self._refill(now)
+        self._tokens -= tokens
+        return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def debt_delay(self) -> float:
+        """Сколько ждать, пока ведро не выйдет из долга; токены не списывает."""
+        self._refill(self.clock())
+        return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    async def acquire(self):
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def block(self, seconds: float):
+        """Запрещает отправку на seconds секунд (ответ RetryAfter от Telegram)."""
+        now = self.clock()
+        self._refill(now)
+        self._tokens = min(self._tokens, -seconds * self.rate)
+
+    @property
+    def idle(self) -> bool:
+        """Ведро полное — его состояние можно забыть без потери ограничения."""
+        self._refill(self.clock())
+        return self._tokens >= self.capacity
+
+
+class KeyedTokenBuckets:
+    """Отдельное ведро на ключ (например, chat_id); полные вёдра вытесняются сверх max_keys."""
+
+    def __init__(self, rate: float, capacity: float, max_keys: int = 10000,
+                 clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets: OrderedDict[Hashable, TokenBucket] = OrderedDict()
+
+    def get(self, key: Hashable) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(self.rate, self.capacity, self.clock)
+            self._prune()
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    def _prune(self):
+        if len(self._buckets) <= self.max_keys:
+            return
+        for key in [key for key, bucket in self._buckets.items() if bucket.idle]:
+            del self._buckets[key]
+            if len(self._buckets) <= self.max_keys:
+                break
+
+    def __len__(self) -> int:
+        return len(self._buckets)
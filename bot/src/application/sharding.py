@@ -0,0 +1,101 @@
+import asyncio
+import bisect
+import hashlib
+import logging
+import time
+from typing import Callable, Iterable, List, Tuple
+from bot.src.domain.repositories.user_store import UserStore
+from bot.src.config.shard_config import WORKER_ID, WORKER_HEARTBEAT_INTERVAL, WORKER_HEARTBEAT_TTL, HASH_RING_VNODES
+
+logger = logging.getLogger(__name__)
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'big')
+
+
+class HashRing:
+    """
+    Консистентное хеширование: у каждого узла vnodes точек на кольце, ключ принадлежит
+    первой точке по часовой стрелке. При добавлении или уходе узла переезжает ~1/N ключей.
+    """
+
+    def __init__(self, nodes: Iterable[str], vnodes: int = HASH_RING_VNODES):
+        self.nodes = sorted(set(nodes))
+        self._points: List[Tuple[int, str]] = sorted(
+            (_hash(f"{node}#{i}"), node) for node in self.nodes for i in range(vnodes)
+        )
+        self._hashes = [point for point, _ in self._points]
+
+    def node_for(self, key) -> str | None:
+        if not self._points:
+            return None
+        index = bisect.bisect(self._hashes, _hash(str(key))) % len(self._points)
+        return self._points[index][1]
+
+
+class ShardCoordinator:
+    """
+    Делит подключённых пользователей между воркерами монитора без отдельного ведущего процесса:
+    каждый воркер пишет heartbeat в общее хранилище, строит кольцо из живых воркеров
+    и опрашивает только своих пользователей. Воркер, не отмечавшийся heartbeat_ttl секунд,
+    выпадает из кольца, и его пользователи расходятся по остальным.
+    """
+
+    def __init__(self, store: UserStore, worker_id: str = WORKER_ID,
+                 heartbeat_interval: float = WORKER_HEARTBEAT_INTERVAL,
+                 heartbeat_ttl: float = WORKER_HEARTBEAT_TTL, vnodes: int = HASH_RING_VNODES,
+                 clock: Callable[[], float] = time.time):
+        self.store = store
+        self.worker_id = worker_id
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_ttl = heartbeat_ttl
+        self.vnodes = vnodes
+        self.clock = clock
+        self.rebalances = 0
+        self._ring = HashRing([worker_id], vnodes)
+
+    def refresh(self) -> bool:
+        """Отмечается в хранилище и перестраивает кольцо. True — если состав воркеров изменился."""
+        now = self.clock()
+        self.store.heartbeat(self.worker_id, now)
+        workers = self.store.live_workers(now - self.heartbeat_ttl)
+        if self.worker_id not in workers:
+            workers.append(self.worker_id)
+        if sorted(workers) == self._ring.nodes:
+            return False
+        previous = self._ring.nodes
+        self._ring = HashRing(workers, self.vnodes)
+        self.rebalances += 1
+        logger.warning(f"Воркеры монитора: {previous} -> {self._ring.nodes}, перераспределяем пользователей")
+        return True
+
+    @property
+    def workers(self) -> List[str]:
+        return list(self._ring.nodes)
+
+    def owns(self, user_id: int) -> bool:
+        return self._ring.node_for(user_id) == self.worker_id
+
+    def filter(self, user_ids: Iterable[int]) -> List[int]:
+        return [user_id for user_id in user_ids if self.owns(user_id)]
+
+    async def run(self, on_rebalance: Callable[[], None] | None = None):
+        """
+        Периодический heartbeat; ошибки хранилища не останавливают воркер.
+        on_rebalance вызывается в event loop сразу после смены состава воркеров.
+        """
+        while True:
+            try:
+                if await asyncio.to_thread(self.refresh) and on_rebalance is not None:
+                    on_rebalance()
+            except Exception as e:
+                logger.error(f"Ошибка heartbeat воркера {self.worker_id}: {e}")
+            await asyncio.sleep(self.heartbeat_interval)
+
+    def leave(self):
+        """Снимает воркер с кольца при остановке, чтобы остальные забрали его пользователей сразу."""
+        try:
+            self.store.remove_worker(self.worker_id)
+        except Exception as e:
+            logger.error(f"Не удалось снять воркер {self.worker_id} с учёта: {e}")
@@ -0,0 +1,113 @@
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List
+from bot.src.config.monitor_config import USER_BACKOFF_BASE, USER_BACKOFF_MAX, USER_FAILURE_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+PARKED = "parked"
+
+
+@dataclass
+class UserHealth:
+    state: str = CLOSED
+    failures: int = 0
+    retry_at: float = 0.0
+    last_error: str = ""
+    # версия токена, с которой пользователь «запаркован»; новый токен снимает парковку
+    parked_token_version: int | None = None
+
+
+class UserHealthTracker:
+    """
+    Circuit breaker на пользователя. После failure_threshold ошибок подряд цепь размыкается (open)
+    и опрос пропускается с экспоненциально растущей паузой; по её истечении делается одна пробная
+    попытка (half_open): успех замыкает цепь, ошибка снова размыкает с удвоенной паузой.
+    Пользователи с окончательно недействительным токеном паркуются до повторной авторизации.
+    """
+
+    def __init__(self, token_version: Callable[[int], int | None] | None = None,
+                 base_delay: float = USER_BACKOFF_BASE, max_delay: float = USER_BACKOFF_MAX,
+                 failure_threshold: int = USER_FAILURE_THRESHOLD, clock: Callable[[], float] = time.monotonic):
+        self.token_version = token_version
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self.clock = clock
+        self._users: Dict[int, UserHealth] = {}
+
+    def state(self, user_id: int) -> str:
+        health = self._users.get(user_id)
+        return health.state if health else CLOSED
+
+    def allow(self, user_id: int) -> bool:
+        """Можно ли сейчас обрабатывать пользователя."""
+        health = self._users.get(user_id)
+        if health is None or health.state == CLOSED:
+            return True
+        if health.state == PARKED:
+            if self.token_version is None or self.token_version(user_id) == health.parked_token_version:
+                return False
+            logger.info(f"Пользователь {user_id} авторизовался заново, снимаем парковку")
+            del self._users[user_id]
+            return True
+
+        now = self.clock()
+        if now < health.retry_at:
+            return False
+        # пробная попытка; пока она идёт, остальные запросы ждут следующего окна
+        health.state = HALF_OPEN
+        health.retry_at = now + self._delay(health.failures)
+        return True
+
+    def record_success(self, user_id: int):
+        health = self._users.pop(user_id, None)
+        if health is not None and health.state != CLOSED:
+            logger.info(f"Пользователь {user_id} снова обрабатывается без ошибок")
+
+    def record_failure(self, user_id: int, error: str):
+        health = self._users.setdefault(user_id, UserHealth())
+        if health.state == PARKED:
+            return
+        health.failures += 1
+        health.last_error = error
+        if health.state == HALF_OPEN or health.failures >= self.failure_threshold:
+            delay = self._delay(health.failures)
+            health.state = OPEN
+            health.retry_at = self.clock() + delay
+            logger.warning(f"Пользователь {user_id}: {health.failures} ошибок подряд, пауза {delay:.0f} с ({error})")
+
+    def park(self, user_id: int, reason: str):
+        health = self._users.setdefault(user_id, UserHealth())
+        health.state = PARKED
+        health.last_error = reason
+        health.parked_token_version = self.token_version(user_id) if self.token_version else None
+        logger.warning(f"Пользователь {user_id} запаркован до повторной авторизации: {reason}")
+
+    def is_parked(self, user_id: int) -> bool:
+        return self.state(user_id) == PARKED
+
+    def is_healthy(self, user_id: int) -> bool:
+        """Без ошибок и не запаркован; в отличие от allow() не расходует пробную попытку."""
+        return self.state(user_id) == CLOSED
+
+    def _delay(self, failures: int) -> float:
+        return min(self.max_delay, self.base_delay * 2 ** max(0, failures - self.failure_threshold))
+
+    def parked(self) -> Dict[int, str]:
+        return {user_id: h.last_error for user_id, h in self._users.items() if h.state == PARKED}
+
+    def backing_off(self) -> List[int]:
+        return [user_id for user_id, h in self._users.items() if h.state in (OPEN, HALF_OPEN)]
+
+    def summary(self, limit: int = 20) -> str:
+        parked = sorted(self.parked().items())
+        lines = [f"на паузе {len(self.backing_off())}, запаркованы {len(parked)}"]
+        lines.extend(f"  {user_id}: {reason}" for user_id, reason in parked[:limit])
+        if len(parked) > limit:
+            lines.append(f"  ... и ещё {len(parked) - limit}")
+        return "\n".join(lines)
@@ -1,3 +1,44 @@
 from bot.src.config.oauth_config import SCOPES, CLIENT_SECRET_FILE, REDIRECT_URI, TOKENS_DIR
+from bot.src.config.monitor_config import (
+    POLL_INTERVAL, MAX_CONCURRENT_USERS, USER_PROCESS_TIMEOUT, GMAIL_IO_WORKERS, GMAIL_SERVICE_CACHE_SIZE,
+    USER_CATEGORIES_FILE, CATEGORIES_RELOAD_INTERVAL, CATEGORIES_SAVE_DELAY, CLASSIFY_BATCH_SIZE, CLASSIFY_BATCH_DELAY, MIN_CONFIDENCE,
+    HISTORY_PAGE_SIZE, HISTORY_MESSAGE_BUDGET, USER_BACKOFF_BASE, USER_BACKOFF_MAX, USER_FAILURE_THRESHOLD,
+    ADAPTIVE_POLLING, MIN_POLL_INTERVAL, MAX_POLL_INTERVAL, MAX_POLL_STRETCH, POLL_TARGET_MESSAGES, ACTIVITY_EWMA_ALPHA,
+)
+from bot.src.config.push_config import (
+    PUSH_MODE, PUBSUB_TOPIC, PUSH_ENDPOINT_PATH, PUSH_VERIFICATION_TOKEN,
+    WATCH_CHECK_INTERVAL, WATCH_RENEW_MARGIN, FALLBACK_POLL_INTERVAL,
+)
+from bot.src.config.notify_config import (
+    NOTIFY_WORKERS, NOTIFY_GLOBAL_RATE, NOTIFY_CHAT_RATE, NOTIFY_CHAT_BURST, NOTIFY_MAX_RETRIES,
+    NOTIFY_RETRY_BASE_DELAY,
+)
+from bot.src.config.quota_config import (
+    GMAIL_USER_QUOTA, GMAIL_PROJECT_QUOTA, GMAIL_QUOTA_SAFETY, QUOTA_PRESSURE_THRESHOLD, QUOTA_MAX_STRETCH,
+)
+from bot.src.config.shard_config import (
+    BOT_ROLE, WORKER_ID, WORKER_HEARTBEAT_INTERVAL, WORKER_HEARTBEAT_TTL, HASH_RING_VNODES,
+)
+from bot.src.config.storage_config import STORAGE_BACKEND, STATE_DB_PATH
+from bot.src.config.ml_config import (
+    ML_API_URL, ML_API_TIMEOUT, ML_API_MAX_CONNECTIONS, ML_MODELS_DIR,
+    ML_POOL_WORKERS, ML_POOL_MAX_PENDING, ML_POOL_CHUNK_SIZE,
+)
 
-__all__ = ['SCOPES', 'CLIENT_SECRET_FILE', 'REDIRECT_URI', 'TOKENS_DIR']
+__all__ = [
+    'SCOPES', 'CLIENT_SECRET_FILE', 'REDIRECT_URI', 'TOKENS_DIR',
+    'POLL_INTERVAL', 'MAX_CONCURRENT_USERS', 'USER_PROCESS_TIMEOUT', 'GMAIL_IO_WORKERS',
+    'GMAIL_SERVICE_CACHE_SIZE', 'USER_CATEGORIES_FILE', 'CATEGORIES_RELOAD_INTERVAL',
+    'CATEGORIES_SAVE_DELAY', 'CLASSIFY_BATCH_SIZE', 'CLASSIFY_BATCH_DELAY', 'MIN_CONFIDENCE',
+    'HISTORY_PAGE_SIZE', 'HISTORY_MESSAGE_BUDGET', 'USER_BACKOFF_BASE', 'USER_BACKOFF_MAX', 'USER_FAILURE_THRESHOLD',
+    'ADAPTIVE_POLLING', 'MIN_POLL_INTERVAL', 'MAX_POLL_INTERVAL', 'MAX_POLL_STRETCH', 'POLL_TARGET_MESSAGES', 'ACTIVITY_EWMA_ALPHA',
+    'PUSH_MODE', 'PUBSUB_TOPIC', 'PUSH_ENDPOINT_PATH', 'PUSH_VERIFICATION_TOKEN',
+    'WATCH_CHECK_INTERVAL', 'WATCH_RENEW_MARGIN', 'FALLBACK_POLL_INTERVAL',
+    'NOTIFY_WORKERS', 'NOTIFY_GLOBAL_RATE', 'NOTIFY_CHAT_RATE', 'NOTIFY_CHAT_BURST', 'NOTIFY_MAX_RETRIES',
+    'NOTIFY_RETRY_BASE_DELAY',
+    'GMAIL_USER_QUOTA', 'GMAIL_PROJECT_QUOTA', 'GMAIL_QUOTA_SAFETY', 'QUOTA_PRESSURE_THRESHOLD', 'QUOTA_MAX_STRETCH',
+    'BOT_ROLE', 'WORKER_ID', 'WORKER_HEARTBEAT_INTERVAL', 'WORKER_HEARTBEAT_TTL', 'HASH_RING_VNODES',
+    'STORAGE_BACKEND', 'STATE_DB_PATH',
+    'ML_API_URL', 'ML_API_TIMEOUT', 'ML_API_MAX_CONNECTIONS', 'ML_MODELS_DIR',
+    'ML_POOL_WORKERS', 'ML_POOL_MAX_PENDING', 'ML_POOL_CHUNK_SIZE',
+]
@@ -0,0 +1,10 @@
+import os
+
+ML_API_URL = os.getenv("ML_API_URL", "")
+ML_API_TIMEOUT = float(os.getenv("ML_API_TIMEOUT", "5"))
+ML_API_MAX_CONNECTIONS = int(os.getenv("ML_API_MAX_CONNECTIONS", "10"))
+ML_MODELS_DIR = os.getenv("ML_MODELS_DIR") or None
+# 0 — классификация в потоке основного процесса
+ML_POOL_WORKERS = int(os.getenv("ML_POOL_WORKERS", "2"))
+ML_POOL_MAX_PENDING = int(os.getenv("ML_POOL_MAX_PENDING", "8"))
+ML_POOL_CHUNK_SIZE = int(os.getenv("ML_POOL_CHUNK_SIZE", "32"))
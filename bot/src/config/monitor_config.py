@@ -0,0 +1,26 @@
+import os
+
+POLL_INTERVAL = float(os.getenv("POLL_INTERVAL", "60"))
+MAX_CONCURRENT_USERS = int(os.getenv("MAX_CONCURRENT_USERS", "20"))
+USER_PROCESS_TIMEOUT = float(os.getenv("USER_PROCESS_TIMEOUT", "30"))
+GMAIL_IO_WORKERS = int(os.getenv("GMAIL_IO_WORKERS", "16"))
+GMAIL_SERVICE_CACHE_SIZE = int(os.getenv("GMAIL_SERVICE_CACHE_SIZE", "1000"))
+USER_CATEGORIES_FILE = os.getenv("USER_CATEGORIES_FILE", "user_categories.json")
+CATEGORIES_RELOAD_INTERVAL = float(os.getenv("CATEGORIES_RELOAD_INTERVAL", "5"))
+CATEGORIES_SAVE_DELAY = float(os.getenv("CATEGORIES_SAVE_DELAY", "1"))
+CLASSIFY_BATCH_SIZE = int(os.getenv("CLASSIFY_BATCH_SIZE", "256"))
+CLASSIFY_BATCH_DELAY = float(os.getenv("CLASSIFY_BATCH_DELAY", "0.05"))
+MIN_CONFIDENCE = float(os.getenv("MIN_CONFIDENCE", "0"))
+HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", "100"))
+HISTORY_MESSAGE_BUDGET = int(os.getenv("HISTORY_MESSAGE_BUDGET", "500"))
+USER_BACKOFF_BASE = float(os.getenv("USER_BACKOFF_BASE", "60"))
+USER_BACKOFF_MAX = float(os.getenv("USER_BACKOFF_MAX", "3600"))
+USER_FAILURE_THRESHOLD = int(os.getenv("USER_FAILURE_THRESHOLD", "3"))
+ADAPTIVE_POLLING = os.getenv("ADAPTIVE_POLLING", "true").lower() in ("1", "true", "yes")
+MIN_POLL_INTERVAL = float(os.getenv("MIN_POLL_INTERVAL", "15"))
+MAX_POLL_INTERVAL = float(os.getenv("MAX_POLL_INTERVAL", "900"))
+# тихий пользователь опрашивается не реже чем раз в POLL_INTERVAL * MAX_POLL_STRETCH
+MAX_POLL_STRETCH = float(os.getenv("MAX_POLL_STRETCH", "4"))
+# сколько новых писем в среднем должно накопиться между опросами активного пользователя
+POLL_TARGET_MESSAGES = float(os.getenv("POLL_TARGET_MESSAGES", "1"))
+ACTIVITY_EWMA_ALPHA = float(os.getenv("ACTIVITY_EWMA_ALPHA", "0.3"))
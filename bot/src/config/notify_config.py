@@ -0,0 +1,9 @@
+import os
+
+NOTIFY_WORKERS = int(os.getenv("NOTIFY_WORKERS", "4"))
+# лимиты Telegram: ~30 сообщений/с на бота и ~1 сообщение/с в один чат
+NOTIFY_GLOBAL_RATE = float(os.getenv("NOTIFY_GLOBAL_RATE", "25"))
+NOTIFY_CHAT_RATE = float(os.getenv("NOTIFY_CHAT_RATE", "1"))
+NOTIFY_CHAT_BURST = float(os.getenv("NOTIFY_CHAT_BURST", "3"))
+NOTIFY_MAX_RETRIES = int(os.getenv("NOTIFY_MAX_RETRIES", "5"))
+NOTIFY_RETRY_BASE_DELAY = float(os.getenv("NOTIFY_RETRY_BASE_DELAY", "1"))
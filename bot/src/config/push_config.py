@@ -0,0 +1,9 @@
+import os
+
+PUSH_MODE = os.getenv("PUSH_MODE", "false").lower() in ("1", "true", "yes")
+PUBSUB_TOPIC = os.getenv("PUBSUB_TOPIC", "")
+PUSH_ENDPOINT_PATH = "/gmail/push"
+PUSH_VERIFICATION_TOKEN = os.getenv("PUSH_VERIFICATION_TOKEN", "")
+WATCH_CHECK_INTERVAL = float(os.getenv("WATCH_CHECK_INTERVAL", "600"))
+WATCH_RENEW_MARGIN = float(os.getenv("WATCH_RENEW_MARGIN", "86400"))
+FALLBACK_POLL_INTERVAL = float(os.getenv("FALLBACK_POLL_INTERVAL", "900"))
@@ -0,0 +1,10 @@
+import os
+
+# квоты Gmail API: 250 единиц/с на пользователя и 1 200 000 единиц/мин на проект
+GMAIL_USER_QUOTA = float(os.getenv("GMAIL_USER_QUOTA", "250"))
+GMAIL_PROJECT_QUOTA = float(os.getenv("GMAIL_PROJECT_QUOTA", "20000"))
+# доля квоты, которую бот позволяет себе расходовать
+GMAIL_QUOTA_SAFETY = float(os.getenv("GMAIL_QUOTA_SAFETY", "0.8"))
+# с какой загрузки проектной квоты начинать реже опрашивать и во сколько раз максимум
+QUOTA_PRESSURE_THRESHOLD = float(os.getenv("QUOTA_PRESSURE_THRESHOLD", "0.7"))
+QUOTA_MAX_STRETCH = float(os.getenv("QUOTA_MAX_STRETCH", "4"))
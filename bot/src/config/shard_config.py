@@ -0,0 +1,9 @@
+import os
+import socket
+
+# all — всё в одном процессе; frontend — только Telegram и OAuth; worker — только монитор своей доли пользователей
+BOT_ROLE = os.getenv("BOT_ROLE", "all")
+WORKER_ID = os.getenv("WORKER_ID") or f"{socket.gethostname()}-{os.getpid()}"
+WORKER_HEARTBEAT_INTERVAL = float(os.getenv("WORKER_HEARTBEAT_INTERVAL", "10"))
+WORKER_HEARTBEAT_TTL = float(os.getenv("WORKER_HEARTBEAT_TTL", "30"))
+HASH_RING_VNODES = int(os.getenv("HASH_RING_VNODES", "64"))
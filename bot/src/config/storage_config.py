@@ -0,0 +1,4 @@
+import os
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "sqlite")
+STATE_DB_PATH = os.getenv("STATE_DB_PATH", "bot_state.db")
@@ -1,4 +1,13 @@
 from bot.src.domain.repositories.token_repositories import TokenRepository
 from bot.src.domain.repositories.state_repository import StateRepository
+from bot.src.domain.repositories.category_repository import CategoryRepository
+from bot.src.domain.repositories.atomic_file import atomic_write, DebouncedWriter
+from bot.src.domain.repositories.user_store import (
+    UserStore, SqliteUserStore, FileUserStore, create_user_store, migrate_user_store,
+)
 
-__all__ = ['TokenRepository', 'StateRepository']
+__all__ = [
+    'TokenRepository', 'StateRepository', 'CategoryRepository',
+    'UserStore', 'SqliteUserStore', 'FileUserStore', 'create_user_store', 'migrate_user_store',
+    'atomic_write', 'DebouncedWriter',
+]
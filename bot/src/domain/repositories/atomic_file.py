@@ -0,0 +1,97 @@
+import atexit
+import logging
+import os
+import tempfile
+import threading
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+def atomic_write(path: str, data: str, encoding: str = 'utf-8'):
+    """
+    Записывает файл целиком или не трогает его: данные пишутся во временный файл
+    в том же каталоге, сбрасываются на диск (fsync) и подменяют исходный через os.replace.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding=encoding) as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    _fsync_directory(directory)
+
+
+def _fsync_directory(directory: str):
+    # rename попадает на диск только после fsync каталога (не везде поддерживается)
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class DebouncedWriter:
+    """
+    Объединяет частые изменения в одну запись: schedule() помечает данные изменёнными,
+    а write вызывается не позже чем через delay секунд после первого изменения.
+    При завершении процесса несохранённые изменения записываются (flush).
+    """
+
+    def __init__(self, write: Callable[[], None], delay: float):
+        self.write = write
+        self.delay = delay
+        self.writes = 0
+        self._dirty = False
+        self._timer: threading.Timer | None = None
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        atexit.register(self.flush)
+
+    @property
+    def pending(self) -> bool:
+        return self._dirty
+
+    def schedule(self):
+        with self._lock:
+            self._dirty = True
+            if self.delay <= 0:
+                immediate = True
+            else:
+                immediate = False
+                if self._timer is None:
+                    self._timer = threading.Timer(self.delay, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+        if immediate:
+            self.flush()
+
+    def flush(self):
+        with self._write_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty:
+                    return
+                self._dirty = False
+            try:
+                self.write()
+                self.writes += 1
+            except Exception as e:
+                logger.error(f"Отложенная запись не удалась: {e}")
+                with self._lock:
+                    self._dirty = True
@@ -0,0 +1,116 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+from typing import Dict, Set, AbstractSet
+from bot.src.config.monitor_config import USER_CATEGORIES_FILE, CATEGORIES_RELOAD_INTERVAL, CATEGORIES_SAVE_DELAY
+from bot.src.domain.repositories.atomic_file import DebouncedWriter, atomic_write
+
+logger = logging.getLogger(__name__)
+
+
+class CategoryRepository:
+    """
+    Подписки пользователей на категории писем.
+    Данные живут в памяти (поиск за O(1) без обращения к диску), JSON-файл служит хранилищем;
+    внешние правки файла подхватываются по изменению mtime.
+    Файл перезаписывается атомарно; частые изменения (schedule_save) объединяются
+    в одну запись не чаще раза в save_delay секунд.
+    """
+
+    def __init__(self, path: str = USER_CATEGORIES_FILE, save_delay: float = CATEGORIES_SAVE_DELAY):
+        self.path = path
+        self._subscriptions: Dict[int, Set[str]] = {}
+        self._mtime: int | None = None
+        # toggle/reset идут из цикла событий, отложенная запись — из потока таймера
+        self._lock = threading.Lock()
+        self._writer = DebouncedWriter(self._write, save_delay)
+        self.reload()
+
+    def get(self, user_id: int | None) -> AbstractSet[str]:
+        return self._subscriptions.get(user_id, frozenset())
+
+    def toggle(self, user_id: int, category_id: str) -> bool:
+        """Включает/выключает категорию, возвращает новое состояние."""
+        with self._lock:
+            selected = self._subscriptions.setdefault(user_id, set())
+            if category_id in selected:
+                selected.remove(category_id)
+                return False
+            selected.add(category_id)
+            return True
+
+    def reset(self, user_id: int) -> int:
+        """Сбрасывает все категории пользователя, возвращает их количество."""
+        with self._lock:
+            selected = self._subscriptions.pop(user_id, set())
+        return len(selected)
+
+    def reload(self):
+        mtime = self._current_mtime()
+        if mtime is None:
+            self._subscriptions = {}
+            self._mtime = None
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+        except Exception as e:
+            logger.error(f"Ошибка при чтении {self.path}: {e}")
+            return
+
+        subscriptions = {}
+        for user_id_str, categories in raw.items():
+            try:
+                subscriptions[int(user_id_str)] = set(categories)
+            except Exception:
+                continue
+        self._subscriptions = subscriptions
+        self._mtime = mtime
+
+    def reload_if_changed(self) -> bool:
+        if self._current_mtime() == self._mtime:
+            return False
+        if self._writer.pending:
+            # несохранённые изменения важнее: файл будет перезаписан отложенной записью
+            return False
+        logger.info(f"{self.path} изменён извне, перечитываем подписки")
+        self.reload()
+        return True
+
+    def save(self):
+        """Сразу записывает подписки в файл."""
+        try:
+            self._write()
+        except Exception as e:
+            logger.error(f"Ошибка при сохранении категорий: {e}")
+
+    def _write(self):
+        with self._lock:
+            data_to_save = {
+                str(user_id): sorted(categories)
+                for user_id, categories in self._subscriptions.items()
+            }
+        atomic_write(self.path, json.dumps(data_to_save, ensure_ascii=False, separators=(',', ':')))
+        self._mtime = self._current_mtime()
+
+    def schedule_save(self):
+        """Откладывает запись, объединяя её с последующими изменениями."""
+        self._writer.schedule()
+
+    def flush(self):
+        """Записывает отложенные изменения, если они есть."""
+        self._writer.flush()
+
+    async def watch(self, interval: float = CATEGORIES_RELOAD_INTERVAL):
+        """Фоновая проверка файла на внешние изменения."""
+        while True:
+            await asyncio.sleep(interval)
+            self.reload_if_changed()
+
+    def _current_mtime(self) -> int | None:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
@@ -1,13 +1,23 @@
-import os
-from bot.src.config.oauth_config import TOKENS_DIR
+from typing import Dict
+from bot.src.domain.entities.user_state import UserState
+from bot.src.domain.repositories.user_store import UserStore, create_user_store
 
 
 class StateRepository:
-    def __init__(self, tokens_dir: str = TOKENS_DIR):
-        self.tokens_dir = tokens_dir
-
-    def get_state_path(self, user_id: int) -> str:
-        return os.path.join(self.tokens_dir, f"{user_id}_state.json")
+    def __init__(self, store: UserStore | None = None):
+        self.store = store or create_user_store()
 
     def exists(self, user_id: int) -> bool:
-        return os.path.exists(self.get_state_path(user_id))
+        return self.store.has_state(user_id)
+
+    def get(self, user_id: int) -> UserState | None:
+        if not self.store.has_state(user_id):
+            return None
+        return UserState(user_id, self.store.get_history_id(user_id))
+
+    def save_last_history_id(self, user_id: int, history_id: str):
+        self.store.save_history_id(user_id, history_id)
+
+    def save_last_history_ids(self, history_ids: Dict[int, str]):
+        """Пакетное сохранение в конце цикла опроса."""
+        self.store.save_history_ids(history_ids)
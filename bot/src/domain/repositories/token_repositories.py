@@ -1,25 +1,28 @@
-import os
-from bot.src.config.oauth_config import TOKENS_DIR
+import json
+from typing import List
 from google.oauth2.credentials import Credentials
+from bot.src.domain.repositories.user_store import UserStore, create_user_store
 
 
 class TokenRepository:
-    def __init__(self, tokens_dir: str = TOKENS_DIR):
-        self.tokens_dir = tokens_dir
-        os.makedirs(self.tokens_dir, exist_ok=True)
-
-    def get_token_path(self, user_id: int) -> str:
-        return os.path.join(self.tokens_dir, f"{user_id}.json")
+    def __init__(self, store: UserStore | None = None):
+        self.store = store or create_user_store()
 
     def exists(self, user_id: int) -> bool:
-        return os.path.exists(self.get_token_path(user_id))
+        return self.store.has_token(user_id)
+
+    def connected_users(self) -> List[int]:
+        return self.store.connected_users()
+
+    def token_version(self, user_id: int) -> int | None:
+        """Версия сохранённого токена или None, если токена нет."""
+        return self.store.token_version(user_id)
 
     def save_credentials(self, user_id: int, creds: Credentials):
-        with open(self.get_token_path(user_id), 'w') as f:
-            f.write(creds.to_json())
+        self.store.save_token(user_id, creds.to_json())
 
     def load_credentials(self, user_id: int, scopes: list[str]) -> Credentials | None:
-        token_path = self.get_token_path(user_id)
-        if os.path.exists(token_path):
-            return Credentials.from_authorized_user_file(token_path, scopes)
-        return None
+        token = self.store.get_token(user_id)
+        if token is None:
+            return None
+        return Credentials.from_authorized_user_info(json.loads(token), scopes)
@@ -0,0 +1,282 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List
+from bot.src.config.oauth_config import TOKENS_DIR
+from bot.src.config.storage_config import STORAGE_BACKEND, STATE_DB_PATH
+from bot.src.domain.repositories.atomic_file import atomic_write
+
+logger = logging.getLogger(__name__)
+
+
+class UserStore(ABC):
+    """Хранилище токенов и состояния пользователей (last_history_id)."""
+
+    @abstractmethod
+    def connected_users(self) -> List[int]:
+        """Пользователи, у которых сохранён токен."""
+
+    @abstractmethod
+    def get_token(self, user_id: int) -> str | None:
+        """JSON токена (Credentials.to_json) или None."""
+
+    @abstractmethod
+    def save_token(self, user_id: int, token_json: str):
+        pass
+
+    @abstractmethod
+    def token_version(self, user_id: int) -> int | None:
+        """Меняется при каждой записи токена; None — токена нет."""
+
+    @abstractmethod
+    def has_state(self, user_id: int) -> bool:
+        pass
+
+    @abstractmethod
+    def get_history_id(self, user_id: int) -> str | None:
+        pass
+
+    @abstractmethod
+    def save_history_ids(self, history_ids: Dict[int, str]):
+        """Сохраняет last_history_id нескольких пользователей за одну запись."""
+
+    @abstractmethod
+    def heartbeat(self, worker_id: str, at: float):
+        """Отмечает, что воркер монитора жив (время — time.time())."""
+
+    @abstractmethod
+    def live_workers(self, since: float) -> List[str]:
+        """Воркеры, отметившиеся не раньше since, по возрастанию id."""
+
+    @abstractmethod
+    def remove_worker(self, worker_id: str):
+        pass
+
+    def has_token(self, user_id: int) -> bool:
+        return self.token_version(user_id) is not None
+
+    def save_history_id(self, user_id: int, history_id: str):
+        self.save_history_ids({user_id: history_id})
+
+    def close(self):
+        pass
+
+
+class SqliteUserStore(UserStore):
+    """
+    SQLite в режиме WAL: поиск по первичному ключу, пакетное обновление истории
+    в одной транзакции. Соединение общее для потоков бота, Flask и пула Gmail,
+    доступ сериализуется блокировкой.
+    """
+
+    def __init__(self, path: str = STATE_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS tokens (
+                user_id INTEGER PRIMARY KEY,
+                token TEXT NOT NULL,
+                version INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS user_state (
+                user_id INTEGER PRIMARY KEY,
+                last_history_id TEXT
+            );
+            CREATE TABLE IF NOT EXISTS workers (
+                worker_id TEXT PRIMARY KEY,
+                heartbeat_at REAL NOT NULL
+            );
+        """)
+
+    def _fetchone(self, query: str, params=()):
+        with self._lock:
+            return self._conn.execute(query, params).fetchone()
+
+    def connected_users(self) -> List[int]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT user_id FROM tokens ORDER BY user_id")]
+
+    def get_token(self, user_id: int) -> str | None:
+        row = self._fetchone("SELECT token FROM tokens WHERE user_id = ?", (user_id,))
+        return row[0] if row else None
+
+    def save_token(self, user_id: int, token_json: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO tokens (user_id, token, version) VALUES (?, ?, 1) "
+                "ON CONFLICT(user_id) DO UPDATE SET token = excluded.token, version = tokens.version + 1",
+                (user_id, token_json),
+            )
+
+    def token_version(self, user_id: int) -> int | None:
+        row = self._fetchone("SELECT version FROM tokens WHERE user_id = ?", (user_id,))
+        return row[0] if row else None
+
+    def has_state(self, user_id: int) -> bool:
+        return self._fetchone("SELECT 1 FROM user_state WHERE user_id = ?", (user_id,)) is not None
+
+    def get_history_id(self, user_id: int) -> str | None:
+        row = self._fetchone("SELECT last_history_id FROM user_state WHERE user_id = ?", (user_id,))
+        return row[0] if row else None
+
+    def save_history_ids(self, history_ids: Dict[int, str]):
+        if not history_ids:
+            return
+        with self._lock:
+            with self._conn:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(
+                    "INSERT INTO user_state (user_id, last_history_id) VALUES (?, ?) "
+                    "ON CONFLICT(user_id) DO UPDATE SET last_history_id = excluded.last_history_id",
+                    [(user_id, str(history_id)) for user_id, history_id in history_ids.items()],
+                )
+
+    def heartbeat(self, worker_id: str, at: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO workers (worker_id, heartbeat_at) VALUES (?, ?) "
+                "ON CONFLICT(worker_id) DO UPDATE SET heartbeat_at = excluded.heartbeat_at",
+                (worker_id, at),
+            )
+
+    def live_workers(self, since: float) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute(
+                "SELECT worker_id FROM workers WHERE heartbeat_at >= ? ORDER BY worker_id", (since,)
+            )]
+
+    def remove_worker(self, worker_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM workers WHERE worker_id = ?", (worker_id,))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class FileUserStore(UserStore):
+    """
+    Прежняя раскладка: {user_id}.json с токеном и {user_id}_state.json с историей.
+    Файлы перезаписываются атомарно, после сбоя остаётся старая или новая версия целиком.
+    """
+
+    def __init__(self, tokens_dir: str = TOKENS_DIR):
+        self.tokens_dir = tokens_dir
+        os.makedirs(self.tokens_dir, exist_ok=True)
+
+    def token_path(self, user_id: int) -> str:
+        return os.path.join(self.tokens_dir, f"{user_id}.json")
+
+    def state_path(self, user_id: int) -> str:
+        return os.path.join(self.tokens_dir, f"{user_id}_state.json")
+
+    @property
+    def workers_dir(self) -> str:
+        return os.path.join(self.tokens_dir, "workers")
+
+    def connected_users(self) -> List[int]:
+        users = []
+        for file in os.listdir(self.tokens_dir):
+            if file.endswith('.json') and not file.endswith('_state.json'):
+                try:
+                    users.append(int(file[:-5]))
+                except ValueError:
+                    continue
+        return sorted(users)
+
+    def get_token(self, user_id: int) -> str | None:
+        try:
+            with open(self.token_path(user_id), 'r') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def save_token(self, user_id: int, token_json: str):
+        atomic_write(self.token_path(user_id), token_json)
+
+    def token_version(self, user_id: int) -> int | None:
+        try:
+            return os.stat(self.token_path(user_id)).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def has_state(self, user_id: int) -> bool:
+        return os.path.exists(self.state_path(user_id))
+
+    def get_history_id(self, user_id: int) -> str | None:
+        try:
+            with open(self.state_path(user_id), 'r') as f:
+                return json.load(f).get('last_history_id')
+        except FileNotFoundError:
+            return None
+
+    def save_history_ids(self, history_ids: Dict[int, str]):
+        for user_id, history_id in history_ids.items():
+            atomic_write(self.state_path(user_id), json.dumps({'last_history_id': history_id}))
+
+    def heartbeat(self, worker_id: str, at: float):
+        os.makedirs(self.workers_dir, exist_ok=True)
+        atomic_write(os.path.join(self.workers_dir, worker_id), json.dumps({'heartbeat_at': at}))
+
+    def live_workers(self, since: float) -> List[str]:
+        if not os.path.isdir(self.workers_dir):
+            return []
+        workers = []
+        for worker_id in os.listdir(self.workers_dir):
+            if worker_id.startswith('.'):
+                continue
+            try:
+                with open(os.path.join(self.workers_dir, worker_id), 'r') as f:
+                    heartbeat_at = json.load(f)['heartbeat_at']
+            except (OSError, ValueError, KeyError):
+                continue
+            if heartbeat_at >= since:
+                workers.append(worker_id)
+        return sorted(workers)
+
+    def remove_worker(self, worker_id: str):
+        try:
+            os.remove(os.path.join(self.workers_dir, worker_id))
+        except FileNotFoundError:
+            pass
+
+
+def migrate_user_store(source: UserStore, target: UserStore) -> tuple[int, int]:
+    """Копирует токены и историю всех пользователей; возвращает (токенов, состояний)."""
+    tokens = 0
+    history_ids = {}
+    for user_id in source.connected_users():
+        token = source.get_token(user_id)
+        if token is not None:
+            target.save_token(user_id, token)
+            tokens += 1
+        history_id = source.get_history_id(user_id)
+        if history_id is not None:
+            history_ids[user_id] = history_id
+    target.save_history_ids(history_ids)
+    return tokens, len(history_ids)
+
+
+def create_user_store(backend: str = STORAGE_BACKEND, db_path: str = STATE_DB_PATH,
+                      tokens_dir: str = TOKENS_DIR) -> UserStore:
+    """
+    Хранилище по настройке STORAGE_BACKEND ("sqlite" или "files").
+    Пустая база SQLite при первом запуске заполняется из каталога токенов.
+    """
+    if backend == "files":
+        return FileUserStore(tokens_dir)
+    if backend != "sqlite":
+        raise ValueError(f"Неизвестный STORAGE_BACKEND: {backend}")
+
+    store = SqliteUserStore(db_path)
+    if not store.connected_users() and os.path.isdir(tokens_dir):
+        tokens, states = migrate_user_store(FileUserStore(tokens_dir), store)
+        if tokens:
+            logger.info(f"Перенесено из {tokens_dir} в {db_path}: токенов {tokens}, состояний {states}")
+    return store
@@ -5,18 +5,15 @@ from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, CallbackQu
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from aiogram.exceptions import TelegramBadRequest
 from bot.src.application.email_oauth import OAuthService
-import json
-import os
+from bot.src.domain.repositories.category_repository import CategoryRepository
 
 
 class TelegramHandlers:
-    def __init__(self, dp: Dispatcher, oauth_service: OAuthService):
+    def __init__(self, dp: Dispatcher, oauth_service: OAuthService, category_repo: CategoryRepository | None = None):
         self.dp = dp
         self.oauth_service = oauth_service
         self.router = Router()
-        self.data_file = "user_categories.json"
-
-        self.user_categories = self._load_user_categories()
+        self.category_repo = category_repo or CategoryRepository()
 
         self.categories = {
             "forum": {
@@ -49,29 +46,8 @@ class TelegramHandlers:
         self._register_handlers()
         self.dp.include_router(self.router)
 
-    def _load_user_categories(self):
-        if os.path.exists(self.data_file):
-            try:
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    result = {}
-                    for user_id_str, categories in data.items():
-                        result[int(user_id_str)] = set(categories)
-                    return result
-            except Exception:
-                return {}
-        return {}
-
     def _save_user_categories(self):
-        try:
-            data_to_save = {}
-            for user_id, categories_set in self.user_categories.items():
-                data_to_save[str(user_id)] = list(categories_set)
-
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(data_to_save, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"Ошибка при сохранении категорий: {e}")
+        self.category_repo.schedule_save()
 
     def _register_handlers(self):
         self.router.message.register(self.command_start_handler, CommandStart())
@@ -86,9 +62,7 @@ class TelegramHandlers:
         keyboard_builder = InlineKeyboardBuilder()
 
         for category_id, category_info in self.categories.items():
-            is_selected = False
-            if user_id and user_id in self.user_categories:
-                is_selected = category_id in self.user_categories[user_id]
+            is_selected = category_id in self.category_repo.get(user_id)
 
             status_emoji = "✅ " if is_selected else ""
             button_text = f"{status_emoji}{category_info['emoji']} {category_info['name']}"
@@ -182,11 +156,7 @@ class TelegramHandlers:
 
     async def command_filter_handler(self, message: Message):
         user_id = message.from_user.id
-
-        if user_id not in self.user_categories:
-            self.user_categories[user_id] = set()
-
-        selected_count = len(self.user_categories.get(user_id, set()))
+        selected_count = len(self.category_repo.get(user_id))
 
         await message.answer(
             f"<b>🎯 Настройка фильтров по категориям</b>\n\n"
@@ -198,15 +168,16 @@ class TelegramHandlers:
 
     async def command_my_filters_handler(self, message: Message):
         user_id = message.from_user.id
+        selected = self.category_repo.get(user_id)
 
-        if user_id not in self.user_categories or not self.user_categories[user_id]:
+        if not selected:
             await message.answer(
                 "📭 <b>У вас пока нет выбранных категорий</b>\n\n"
                 "Используйте команду /filters, чтобы выбрать категории писем для уведомлений."
             )
         else:
             selected_categories = []
-            for category_id in self.user_categories[user_id]:
+            for category_id in selected:
                 category = self.categories.get(category_id, {})
                 selected_categories.append(
                     f"{category.get('emoji', '📧')} {category.get('name', 'Неизвестная категория')}"
@@ -257,11 +228,7 @@ class TelegramHandlers:
             return
 
         user_id = callback_query.from_user.id
-
-        if user_id not in self.user_categories:
-            self.user_categories[user_id] = set()
-
-        is_selected = category_id in self.user_categories[user_id]
+        is_selected = category_id in self.category_repo.get(user_id)
 
         status = "✅ <b>Включена</b>" if is_selected else "❌ <b>Выключена</b>"
 
@@ -281,23 +248,14 @@ class TelegramHandlers:
             return
 
         user_id = callback_query.from_user.id
-
-        if user_id not in self.user_categories:
-            self.user_categories[user_id] = set()
-
-        if category_id in self.user_categories[user_id]:
-            self.user_categories[user_id].remove(category_id)
-            action = "отключена"
-        else:
-            self.user_categories[user_id].add(category_id)
-            action = "включена"
+        is_selected = self.category_repo.toggle(user_id, category_id)
+        action = "включена" if is_selected else "отключена"
 
         category = self.categories[category_id]
         await callback_query.answer(f"Категория «{category['name']}» {action}")
 
         self._save_user_categories()
 
-        is_selected = category_id in self.user_categories[user_id]
         status = "✅ <b>Включена</b>" if is_selected else "❌ <b>Выключена</b>"
 
         await callback_query.message.edit_text(
@@ -310,8 +268,9 @@ class TelegramHandlers:
 
     async def _show_my_filters(self, callback_query: CallbackQuery):
         user_id = callback_query.from_user.id
+        selected = self.category_repo.get(user_id)
 
-        if user_id not in self.user_categories or not self.user_categories[user_id]:
+        if not selected:
             await callback_query.message.edit_text(
                 "📭 <b>У вас пока нет выбранных категорий</b>\n\n"
                 "Выберите категории, нажав кнопки ниже:",
@@ -319,7 +278,7 @@ class TelegramHandlers:
             )
         else:
             selected_categories = []
-            for category_id in self.user_categories[user_id]:
+            for category_id in selected:
                 category = self.categories.get(category_id, {})
                 selected_categories.append(
                     f"{category.get('emoji', '📧')} {category.get('name', 'Неизвестная категория')}"
@@ -334,11 +293,7 @@ class TelegramHandlers:
 
     async def _show_categories_list(self, callback_query: CallbackQuery):
         user_id = callback_query.from_user.id
-
-        if user_id not in self.user_categories:
-            self.user_categories[user_id] = set()
-
-        selected_count = len(self.user_categories.get(user_id, set()))
+        selected_count = len(self.category_repo.get(user_id))
 
         await callback_query.message.edit_text(
             f"<b>🎯 Настройка фильтров по категориям</b>\n\n"
@@ -351,9 +306,8 @@ class TelegramHandlers:
     async def _reset_all_categories(self, callback_query: CallbackQuery):
         user_id = callback_query.from_user.id
 
-        if user_id in self.user_categories:
-            count = len(self.user_categories[user_id])
-            self.user_categories[user_id] = set()
+        count = self.category_repo.reset(user_id)
+        if count:
             await callback_query.answer(f"Сброшено {count} категорий")
         else:
             await callback_query.answer("Нет выбранных категорий для сброса")
@@ -364,7 +318,7 @@ class TelegramHandlers:
 
     async def _save_categories(self, callback_query: CallbackQuery):
         user_id = callback_query.from_user.id
-        selected_count = len(self.user_categories.get(user_id, set()))
+        selected_count = len(self.category_repo.get(user_id))
 
         self._save_user_categories()
 
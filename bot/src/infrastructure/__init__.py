@@ -1,3 +1,5 @@
 from bot.src.infrastructure.oauth_callback_app import OAuthCallbackApp
+from bot.src.infrastructure.push_receiver import PushReceiver
+from bot.src.infrastructure.local_push_publisher import LocalPushPublisher
 
-__all__ = ['OAuthCallbackApp']
+__all__ = ['OAuthCallbackApp', 'PushReceiver', 'LocalPushPublisher']
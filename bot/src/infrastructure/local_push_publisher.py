@@ -0,0 +1,57 @@
+import argparse
+import base64
+import json
+import time
+import urllib.request
+import uuid
+from bot.src.config.push_config import PUSH_ENDPOINT_PATH, PUSH_VERIFICATION_TOKEN
+
+
+class LocalPushPublisher:
+    """
+    Локальная замена Pub/Sub для тестов и отладки: отправляет на приёмник
+    push-уведомления в том же формате, что и Google Cloud Pub/Sub.
+    """
+
+    def __init__(
+            self,
+            endpoint: str = f"http://127.0.0.1:8083{PUSH_ENDPOINT_PATH}",
+            verification_token: str = PUSH_VERIFICATION_TOKEN,
+            subscription: str = "projects/local/subscriptions/gmail-push",
+    ):
+        self.endpoint = endpoint
+        self.verification_token = verification_token
+        self.subscription = subscription
+
+    def build_envelope(self, email_address: str, history_id: str) -> dict:
+        data = json.dumps({'emailAddress': email_address, 'historyId': int(history_id)})
+        return {
+            'message': {
+                'data': base64.b64encode(data.encode('utf-8')).decode('ascii'),
+                'messageId': uuid.uuid4().hex,
+                'publishTime': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            },
+            'subscription': self.subscription,
+        }
+
+    def publish(self, email_address: str, history_id: str) -> int:
+        url = self.endpoint
+        if self.verification_token:
+            url += f"?token={self.verification_token}"
+        req = urllib.request.Request(
+            url,
+            data=json.dumps(self.build_envelope(email_address, history_id)).encode('utf-8'),
+            headers={'Content-Type': 'application/json'},
+            method='POST',
+        )
+        with urllib.request.urlopen(req, timeout=10) as response:
+            return response.status
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Отправить тестовое Gmail push-уведомление")
+    parser.add_argument("email")
+    parser.add_argument("history_id")
+    parser.add_argument("--endpoint", default=f"http://127.0.0.1:8083{PUSH_ENDPOINT_PATH}")
+    args = parser.parse_args()
+    print(LocalPushPublisher(endpoint=args.endpoint).publish(args.email, args.history_id))
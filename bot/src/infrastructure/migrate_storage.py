@@ -0,0 +1,18 @@
+import argparse
+from bot.src.config.oauth_config import TOKENS_DIR
+from bot.src.config.storage_config import STATE_DB_PATH
+from bot.src.domain.repositories.user_store import FileUserStore, SqliteUserStore, migrate_user_store
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Перенести токены и historyId из каталога tokens в SQLite")
+    parser.add_argument("--tokens-dir", default=TOKENS_DIR)
+    parser.add_argument("--db", default=STATE_DB_PATH)
+    parser.add_argument("--reverse", action="store_true", help="выгрузить базу обратно в файлы")
+    args = parser.parse_args()
+
+    files, database = FileUserStore(args.tokens_dir), SqliteUserStore(args.db)
+    source, target = (database, files) if args.reverse else (files, database)
+    tokens, states = migrate_user_store(source, target)
+    database.close()
+    print(f"Перенесено токенов: {tokens}, состояний: {states}")
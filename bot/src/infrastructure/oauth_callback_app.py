@@ -1,7 +1,6 @@
 from flask import Flask, request
 from bot.src.application.email_oauth import OAuthService
 from bot.src.application.gmail_client import GmailService
-from bot.src.domain.entities.user_state import UserState
 from bot.src.domain.repositories.state_repository import StateRepository
 import logging
 import traceback
@@ -56,6 +55,7 @@ class OAuthCallbackApp:
                 logger.info("Токен успешно получен и сохранен")
 
                 logger.debug("Создание Gmail сервиса...")
+                self.gmail_service.invalidate(user_id)
                 service = self.gmail_service.get_service(user_id)
 
                 if not service:
@@ -70,8 +70,7 @@ class OAuthCallbackApp:
                     return "❌ Не удалось получить профиль Gmail", 500
 
                 logger.debug(f"Сохранение historyId: {profile['historyId']}")
-                user_state = UserState(user_id, self.state_repo.tokens_dir)
-                user_state.save_last_history_id(profile['historyId'])
+                self.state_repo.save_last_history_id(user_id, profile['historyId'])
 
                 logger.info(f"Успешная аутентификация для user_id: {user_id}")
 
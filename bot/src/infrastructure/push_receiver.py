@@ -0,0 +1,54 @@
+import base64
+import hmac
+import json
+import logging
+from typing import Callable
+from flask import Flask, request
+from bot.src.config.push_config import PUSH_ENDPOINT_PATH, PUSH_VERIFICATION_TOKEN
+
+logger = logging.getLogger(__name__)
+
+
+def decode_push_message(envelope: dict) -> dict:
+    """Извлекает {'emailAddress', 'historyId'} из конверта Pub/Sub push."""
+    data = envelope['message']['data']
+    return json.loads(base64.b64decode(data).decode('utf-8'))
+
+
+class PushReceiver:
+    """
+    HTTP-приёмник Gmail push-уведомлений в формате Pub/Sub push.
+    Регистрирует маршрут на Flask-приложении OAuthCallbackApp.
+    Без токена проверки не создаётся: иначе любой мог бы запускать опрос Gmail за любого пользователя.
+    """
+
+    def __init__(
+            self,
+            on_notification: Callable[[str, str | None], None],
+            verification_token: str = PUSH_VERIFICATION_TOKEN,
+            path: str = PUSH_ENDPOINT_PATH,
+    ):
+        if not verification_token:
+            raise ValueError("Push-режим требует непустой PUSH_VERIFICATION_TOKEN")
+        self.on_notification = on_notification
+        self.verification_token = verification_token
+        self.path = path
+
+    def register(self, app: Flask):
+        app.add_url_rule(self.path, "gmail_push", self._handle, methods=["POST"])
+
+    def _handle(self):
+        if not hmac.compare_digest(request.args.get("token", ""), self.verification_token):
+            logger.warning("Push-уведомление с неверным токеном проверки")
+            return "", 403
+
+        try:
+            payload = decode_push_message(request.get_json(force=True))
+            email_address = payload['emailAddress']
+        except Exception as e:
+            logger.error(f"Некорректное push-уведомление: {e}")
+            return "", 400
+
+        logger.debug(f"Push-уведомление для {email_address}, historyId {payload.get('historyId')}")
+        self.on_notification(email_address, payload.get('historyId'))
+        return "", 204
@@ -8,34 +8,87 @@ from aiogram.enums import ParseMode
 from bot.src.config.bot_token import TOKEN
 from bot.src.domain.repositories.token_repositories import TokenRepository
 from bot.src.domain.repositories.state_repository import StateRepository
+from bot.src.domain.repositories.category_repository import CategoryRepository
+from bot.src.domain.repositories.user_store import create_user_store
 from bot.src.application.email_oauth import OAuthService
-from bot.src.application.gmail_client import GmailService
+from bot.src.application.gmail_client import GmailService, AsyncGmailService
+from bot.src.application.gmail_quota import QuotaAccountant
 from bot.src.application.email_monitor_service import EmailMonitorService
 from bot.src.handlers.telegram_handlers import TelegramHandlers
+from bot.src.application.push_notifications import WatchManager, PushNotificationQueue
+from bot.src.application.sharding import ShardCoordinator
+from bot.src.config.push_config import PUSH_MODE, PUBSUB_TOPIC
+from bot.src.config.shard_config import BOT_ROLE
 from bot.src.infrastructure.oauth_callback_app import OAuthCallbackApp
+from bot.src.infrastructure.push_receiver import PushReceiver
 
 
 class BotApplication:
-    def __init__(self):
-        self.token_repo = TokenRepository()
-        self.state_repo = StateRepository()
+    """
+    Роли процесса (BOT_ROLE): all — бот, OAuth и монитор вместе; frontend — только команды Telegram
+    и OAuth-колбэк; worker — только монитор своей доли пользователей (ShardCoordinator).
+    """
+
+    def __init__(self, role: str = BOT_ROLE):
+        if role not in ("all", "frontend", "worker"):
+            raise ValueError(f"Неизвестная BOT_ROLE: {role}")
+        self.role = role
+        self.user_store = create_user_store()
+        self.token_repo = TokenRepository(self.user_store)
+        self.state_repo = StateRepository(self.user_store)
+        self.category_repo = CategoryRepository()
         self.oauth_service = OAuthService(self.token_repo)
-        self.gmail_service = GmailService(self.token_repo)
+        self.quota = QuotaAccountant()
+        self.gmail_service = GmailService(self.token_repo, quota=self.quota)
+        self.async_gmail_service = AsyncGmailService(self.gmail_service)
         self.dp = Dispatcher()
         self.bot = Bot(token=TOKEN, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
-        self.handlers = TelegramHandlers(self.dp, self.oauth_service)
-        self.monitor_service = EmailMonitorService(self.bot, self.token_repo, self.state_repo, self.gmail_service)
-        self.callback_app = OAuthCallbackApp(self.oauth_service, self.gmail_service, self.state_repo)
+        self.watch_manager = None
+        self.push_queue = None
+        # push-уведомления принимает Flask одного процесса, поэтому с воркерами работает только опрос
+        if PUSH_MODE and PUBSUB_TOPIC and role == "all":
+            self.watch_manager = WatchManager(self.async_gmail_service)
+            self.push_queue = PushNotificationQueue(self.watch_manager)
+        self.shard = ShardCoordinator(self.user_store) if role == "worker" else None
+
+        self.handlers = None
+        self.callback_app = None
+        if role != "worker":
+            self.handlers = TelegramHandlers(self.dp, self.oauth_service, self.category_repo)
+            self.callback_app = OAuthCallbackApp(self.oauth_service, self.gmail_service, self.state_repo)
+            if self.push_queue:
+                PushReceiver(self.push_queue.submit).register(self.callback_app.app)
+
+        self.monitor_service = None
+        if role != "frontend":
+            self.monitor_service = EmailMonitorService(
+                self.bot, self.token_repo, self.state_repo, self.async_gmail_service,
+                watch_manager=self.watch_manager, push_queue=self.push_queue, category_repo=self.category_repo,
+                quota=self.quota, shard=self.shard,
+            )
         self.monitor_task = None
 
     async def start(self):
-        flask_thread = threading.Thread(target=self.callback_app.run, kwargs={'debug': False})
-        flask_thread.daemon = True
-        flask_thread.start()
+        try:
+            if self.role == "worker":
+                await self.monitor_service.monitor_all_users()
+                return
+
+            flask_thread = threading.Thread(target=self.callback_app.run, kwargs={'debug': False})
+            flask_thread.daemon = True
+            flask_thread.start()
 
-        self.monitor_task = asyncio.create_task(self.monitor_service.monitor_all_users())
+            if self.monitor_service is not None:
+                self.monitor_task = asyncio.create_task(self.monitor_service.monitor_all_users())
 
-        await self.dp.start_polling(self.bot)
+            await self.dp.start_polling(self.bot)
+        finally:
+            if self.monitor_service is not None:
+                self.monitor_service.shutdown()
+            if self.shard is not None:
+                self.shard.leave()
+            self.category_repo.flush()
+            self.user_store.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,12 @@
+FROM python:3.12-slim
+
+WORKDIR /app
+
+COPY requirements.txt .
+RUN pip install --no-cache-dir -r requirements.txt
+
+COPY ML ./ML
+
+EXPOSE 8000
+
+CMD ["python", "-m", "ML.api.inference_app"]
@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import LabelEncoder
+from ML.classifier.artifacts import export_artifacts, load_artifacts, read_manifest
+
+VOCABULARY = {'sale': 0, 'code': 1, 'forum': 2, 'verify code': 3}
+IDF = np.array([1.0, 2.0, 1.5, 3.0])
+COEF = np.array([[2.0, -1.0, 0.0, 0.0], [-1.0, 1.0, 0.0, 2.0], [0.0, -1.0, 2.0, 0.0]])
+INTERCEPT = np.array([-0.1, -0.2, -0.3])
+
+
+class TestModelArtifacts:
+    """Тесты экспорта модели в .npy и загрузки через mmap"""
+
+    @pytest.fixture
+    def trained(self):
+        # обученное состояние задаётся вручную: fit в тестах недоступен (pandas замокан в conftest)
+        vectorizer = TfidfVectorizer(ngram_range=(1, 2), stop_words='english')
+        vectorizer.vocabulary_ = VOCABULARY
+        vectorizer.idf_ = IDF
+        model = SimpleNamespace(coef_=COEF, intercept_=INTERCEPT, classes_=np.array([0, 1, 2]))
+        label_encoder = LabelEncoder()
+        label_encoder.classes_ = np.array(['promotions', 'verify_code', 'forum'], dtype=object)
+        return vectorizer, model, label_encoder
+
+    def test_roundtrip_matches_tfidf(self, trained, tmp_path):
+        """Загруженные артефакты воспроизводят TF-IDF (idf, l2-нормировка, биграммы) и линейную модель"""
+        export_artifacts(*trained, str(tmp_path), {'created_at': 'v1'})
+
+        manifest = read_manifest(str(tmp_path))
+        vectorizer, model, label_encoder = load_artifacts(str(tmp_path), manifest)
+
+        features = vectorizer.transform(['Sale sale! Please verify code', 'nothing known', 'forum'])
+        counts = np.array([[2, 1, 0, 1], [0, 0, 0, 0], [0, 0, 1, 0]], dtype=float) * IDF
+        norms = np.linalg.norm(counts, axis=1, keepdims=True)
+        expected = np.divide(counts, norms, out=np.zeros_like(counts), where=norms > 0)
+        assert np.allclose(features.toarray(), expected)
+        assert np.allclose(model.decision_function(features), expected @ COEF.T + INTERCEPT)
+
+        categories = label_encoder.classes_[model.predict(features)]
+        assert list(categories) == ['verify_code', 'promotions', 'forum']
+        assert manifest['created_at'] == 'v1'
+
+    def test_arrays_are_memory_mapped(self, trained, tmp_path):
+        """Веса не копируются в память процесса, а отображаются из файла"""
+        export_artifacts(*trained, str(tmp_path))
+
+        _, loaded_model, _ = load_artifacts(str(tmp_path), read_manifest(str(tmp_path)))
+
+        assert isinstance(loaded_model.coef_, np.memmap)
+
+    def test_missing_manifest(self, tmp_path):
+        """Без manifest.json папка считается обычной папкой с pickle"""
+        assert read_manifest(str(tmp_path)) is None
@@ -0,0 +1,69 @@
+import os
+import pytest
+from unittest.mock import patch
+from bot.src.domain.repositories.atomic_file import DebouncedWriter, atomic_write
+
+
+class TestAtomicWrite:
+    """Тесты атомарной записи файлов"""
+
+    def test_replaces_content(self, tmp_path):
+        """Файл перезаписывается целиком, временные файлы не остаются"""
+        path = tmp_path / 'state.json'
+        path.write_text('old')
+
+        atomic_write(str(path), 'new')
+
+        assert path.read_text() == 'new'
+        assert os.listdir(tmp_path) == ['state.json']
+
+    def test_failed_write_keeps_old_file(self, tmp_path):
+        """Сбой до переименования оставляет прежнее содержимое"""
+        path = tmp_path / 'state.json'
+        path.write_text('old')
+
+        with patch('bot.src.domain.repositories.atomic_file.os.replace', side_effect=OSError('disk full')):
+            with pytest.raises(OSError):
+                atomic_write(str(path), 'new')
+
+        assert path.read_text() == 'old'
+        assert os.listdir(tmp_path) == ['state.json']
+
+
+class TestDebouncedWriter:
+    """Тесты объединения отложенных записей"""
+
+    def test_changes_are_coalesced(self):
+        """Несколько изменений до flush дают одну запись"""
+        calls = []
+        writer = DebouncedWriter(lambda: calls.append(1), delay=60)
+
+        for _ in range(5):
+            writer.schedule()
+        assert writer.pending and calls == []
+
+        writer.flush()
+        writer.flush()
+
+        assert calls == [1]
+        assert not writer.pending
+
+    def test_zero_delay_writes_immediately(self):
+        """Без задержки запись выполняется сразу"""
+        calls = []
+        writer = DebouncedWriter(lambda: calls.append(1), delay=0)
+
+        writer.schedule()
+
+        assert calls == [1]
+
+    def test_failed_write_stays_pending(self):
+        """Неудачная запись не теряет изменения"""
+        writer = DebouncedWriter(lambda: 1 / 0, delay=60)
+        writer.schedule()
+
+        writer.flush()
+
+        assert writer.pending
+        writer.write = lambda: None
+        writer.flush()
@@ -0,0 +1,90 @@
+import os
+import json
+import pytest
+from bot.src.domain.repositories.category_repository import CategoryRepository
+
+
+class TestCategoryRepository:
+    """Тесты для CategoryRepository"""
+
+    @pytest.fixture
+    def path(self, temp_dir):
+        return os.path.join(temp_dir, 'user_categories.json')
+
+    def test_load_existing_file(self, path):
+        """Подписки читаются из JSON при создании"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'1': ['forum', 'updates'], 'bad': ['spam']}, f)
+
+        repo = CategoryRepository(path)
+
+        assert repo.get(1) == {'forum', 'updates'}
+        assert repo.get(2) == set()
+
+    def test_toggle_and_save(self, path):
+        """Переключение меняет данные в памяти, save сохраняет их в файл"""
+        repo = CategoryRepository(path)
+
+        assert repo.toggle(1, 'forum') is True
+        assert repo.toggle(1, 'updates') is True
+        assert repo.toggle(1, 'forum') is False
+        repo.save()
+
+        assert CategoryRepository(path).get(1) == {'updates'}
+
+    def test_reset(self, path):
+        """Сброс возвращает число удалённых категорий"""
+        repo = CategoryRepository(path)
+        repo.toggle(1, 'forum')
+
+        assert repo.reset(1) == 1
+        assert repo.reset(1) == 0
+        assert repo.get(1) == set()
+
+    def test_lookup_does_not_touch_disk(self, path):
+        """Чтение подписок не обращается к файлу"""
+        repo = CategoryRepository(path)
+        repo.toggle(1, 'forum')
+        repo.save()
+        os.remove(path)
+
+        assert repo.get(1) == {'forum'}
+
+    def test_external_edit_detected(self, path):
+        """Внешнее изменение файла подхватывается по mtime, собственное сохранение — нет"""
+        repo = CategoryRepository(path)
+        repo.toggle(1, 'forum')
+        repo.save()
+        assert repo.reload_if_changed() is False
+
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'1': ['spam']}, f)
+        os.utime(path, ns=(0, 1))
+
+        assert repo.reload_if_changed() is True
+        assert repo.get(1) == {'spam'}
+
+    def test_schedule_save_is_debounced(self, path):
+        """Частые переключения сохраняются одной записью при flush"""
+        repo = CategoryRepository(path, save_delay=60)
+        for category in ('forum', 'updates', 'spam'):
+            repo.toggle(1, category)
+            repo.schedule_save()
+
+        assert not os.path.exists(path)
+        repo.flush()
+
+        assert CategoryRepository(path).get(1) == {'forum', 'updates', 'spam'}
+        assert repo._writer.writes == 1
+
+    def test_pending_changes_survive_reload_check(self, path):
+        """Внешняя правка не затирает ещё не записанные изменения"""
+        repo = CategoryRepository(path, save_delay=60)
+        repo.toggle(1, 'forum')
+        repo.schedule_save()
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'1': ['spam']}, f)
+
+        assert repo.reload_if_changed() is False
+        assert repo.get(1) == {'forum'}
+        repo.flush()
@@ -0,0 +1,66 @@
+import asyncio
+import pytest
+from unittest.mock import Mock
+from bot.src.application.classification_batcher import ClassificationBatcher
+
+
+def _classifier():
+    classifier = Mock()
+    classifier.batch_predict.side_effect = lambda texts: [{'category': text.upper()} for text in texts]
+    classifier.predict.side_effect = lambda text: {'category': text.upper()}
+    return classifier
+
+
+class TestClassificationBatcher:
+    """Тесты для ClassificationBatcher"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_batch(self):
+        """Письма разных пользователей классифицируются одним вызовом"""
+        classifier = _classifier()
+        batcher = ClassificationBatcher(classifier, max_batch=100, max_delay=0.01)
+
+        first, second = await asyncio.gather(batcher.classify(['a', 'b']), batcher.classify(['c']))
+
+        assert [r['category'] for r in first] == ['A', 'B']
+        assert [r['category'] for r in second] == ['C']
+        classifier.batch_predict.assert_called_once_with(['a', 'b', 'c'])
+        assert batcher.batches == 1
+
+    @pytest.mark.asyncio
+    async def test_full_batch_flushes_immediately(self):
+        """Набранный пакет отправляется без ожидания таймера"""
+        classifier = _classifier()
+        batcher = ClassificationBatcher(classifier, max_batch=2, max_delay=10)
+
+        result = await asyncio.wait_for(batcher.classify(['a', 'b']), timeout=1)
+
+        assert len(result) == 2
+
+    @pytest.mark.asyncio
+    async def test_batch_failure_falls_back_to_single_predictions(self):
+        """Ошибка пакета не теряет остальные письма"""
+        classifier = _classifier()
+        classifier.batch_predict.side_effect = RuntimeError("bad batch")
+
+        def predict(text):
+            if text == 'bad':
+                raise ValueError(text)
+            return {'category': text}
+
+        classifier.predict.side_effect = predict
+        batcher = ClassificationBatcher(classifier, max_batch=100, max_delay=0.0)
+
+        result = await batcher.classify(['ok', 'bad'])
+
+        assert result == [{'category': 'ok'}, None]
+
+    @pytest.mark.asyncio
+    async def test_async_classifier(self):
+        """Асинхронный классификатор (клиент ML API) поддерживается"""
+        from unittest.mock import AsyncMock
+        classifier = Mock()
+        classifier.batch_predict = AsyncMock(side_effect=lambda texts: [{'category': t} for t in texts])
+        batcher = ClassificationBatcher(classifier, max_batch=100, max_delay=0.0)
+
+        assert await batcher.classify(['x']) == [{'category': 'x'}]
@@ -0,0 +1,24 @@
+import numpy as np
+from ML.classifier.confidence import as_class_scores, fit_temperature, softmax
+
+
+class TestConfidence:
+    """Тесты уверенности по decision_function"""
+
+    def test_binary_scores_become_two_columns(self):
+        """Оценка бинарной модели превращается в пару (-s, s)"""
+        probabilities = softmax(as_class_scores(np.array([0.0, 2.0])))
+
+        assert np.allclose(probabilities.sum(axis=1), 1.0)
+        assert np.allclose(probabilities[0], [0.5, 0.5])
+        assert probabilities[1, 1] > 0.9
+
+    def test_fit_temperature_sharpens_confident_correct_scores(self):
+        """Если модель всегда права, температура уменьшается и уверенность растёт"""
+        scores = np.array([[1.0, -1.0, -1.0], [-1.0, 1.0, -1.0], [-1.0, -1.0, 1.0]] * 10)
+        labels = np.array([0, 1, 2] * 10)
+
+        temperature = fit_temperature(scores, labels)
+
+        assert temperature < 1.0
+        assert softmax(scores, temperature)[0, 0] > softmax(scores, 1.0)[0, 0]
@@ -0,0 +1,241 @@
+import pytest
+from unittest.mock import Mock, AsyncMock
+from bot.src.application.email_monitor_service import EmailMonitorService
+from bot.src.application.poll_scheduler import CycleStats
+
+
+@pytest.fixture
+def state_repo():
+    repo = Mock()
+    repo.get.return_value = Mock(last_history_id='100')
+    return repo
+
+
+@pytest.fixture
+def monitor(request, state_repo):
+    """Монитор с замоканным Gmail; параметры конструктора передаются indirect-параметризацией"""
+    token_repo = Mock()
+    token_repo.exists.return_value = True
+    token_repo.token_version.return_value = 1
+    gmail_service = Mock()
+    gmail_service.get_service = AsyncMock(return_value=Mock())
+    gmail_service.get_history = AsyncMock(return_value={'history': [], 'historyId': '200'})
+    gmail_service.sync_credentials = AsyncMock(return_value=None)
+    monitor = EmailMonitorService(Mock(), token_repo, state_repo, gmail_service, category_repo=Mock(),
+                                  **getattr(request, 'param', {}))
+    monitor.pipeline.run = AsyncMock()
+    return monitor
+
+
+class TestEmailMonitorService:
+    """Тесты для EmailMonitorService"""
+
+    @pytest.mark.asyncio
+    async def test_history_ids_saved_in_one_batch_per_cycle(self, monitor, state_repo):
+        """historyId копятся за цикл и сохраняются одним вызовом в конце"""
+        await monitor._process_user_emails(1)
+        await monitor._process_user_emails(2)
+
+        state_repo.save_last_history_ids.assert_not_called()
+        monitor.gmail_service.get_history.reset_mock()
+        await monitor._process_user_emails(1)
+        assert monitor.gmail_service.get_history.await_args.args[1] == '200'
+
+        monitor._report_cycle(CycleStats(started_at=0.0))
+
+        state_repo.save_last_history_ids.assert_called_once_with({1: '200', 2: '200'})
+
+    @pytest.mark.asyncio
+    async def test_reauth_discards_buffered_cursor(self, monitor, state_repo):
+        """После повторной /auth накопленный курсор не читается и не записывается поверх нового historyId"""
+        await monitor._process_user_emails(1)
+        await monitor._process_user_emails(2)
+
+        # свой refresh токена курсор не сбрасывает
+        monitor.gmail_service.sync_credentials = AsyncMock(return_value=2)
+        monitor.token_repo.token_version.return_value = 2
+        await monitor._process_user_emails(2)
+
+        # пользователь 1 авторизовался заново, колбэк записал historyId 500
+        monitor.token_repo.token_version.side_effect = lambda user_id: 3 if user_id == 1 else 2
+        state_repo.get.return_value = Mock(last_history_id='500')
+        assert monitor._get_history_id(1) == '500'
+        assert monitor._get_history_id(2) == '200'
+
+        monitor._set_history_id(1, '600')
+        monitor.token_repo.token_version.side_effect = lambda user_id: 4 if user_id == 1 else 2
+        monitor._report_cycle(CycleStats(started_at=0.0))
+
+        state_repo.save_last_history_ids.assert_called_once_with({2: '200'})
+
+
+def _history_pages(pages):
+    """get_history по page_token отдаёт страницы из словаря {page_token: page}"""
+    async def get_history(service, start_history_id, page_token=None, max_results=None):
+        return pages[(start_history_id, page_token)]
+    return get_history
+
+
+def _record(history_id, *msg_ids):
+    return {'id': history_id, 'messagesAdded': [{'message': {'id': msg_id}} for msg_id in msg_ids]}
+
+
+@pytest.mark.parametrize('monitor', [{'message_budget': 3}], indirect=True)
+class TestHistoryPaging:
+    """Тесты постраничного чтения истории с бюджетом на цикл"""
+
+    @pytest.mark.asyncio
+    async def test_all_pages_are_read(self, monitor):
+        """Письма со всех страниц обрабатываются, курсор переходит на historyId ответа"""
+        monitor.gmail_service.get_history = _history_pages({
+            ('100', None): {'history': [_record('101', 'a')], 'nextPageToken': 'p2', 'historyId': '150'},
+            ('100', 'p2'): {'history': [_record('102', 'b')], 'historyId': '150'},
+        })
+
+        await monitor._process_user_emails(1)
+
+        assert [c.args[2] for c in monitor.pipeline.run.await_args_list] == [['a'], ['b']]
+        assert monitor._get_history_id(1) == '150'
+
+    @pytest.mark.asyncio
+    async def test_budget_stops_cycle_and_resumes(self, monitor):
+        """Сверх бюджета письма не читаются, следующий цикл продолжает с последней записи"""
+        monitor.gmail_service.get_history = _history_pages({
+            ('100', None): {'history': [_record('101', 'a', 'b'), _record('102', 'c')],
+                            'nextPageToken': 'p2', 'historyId': '150'},
+            ('100', 'p2'): {'history': [_record('103', 'd')], 'historyId': '150'},
+            ('102', None): {'history': [_record('103', 'd')], 'historyId': '150'},
+        })
+
+        await monitor._process_user_emails(1)
+        assert monitor.pipeline.run.await_args.args[2] == ['a', 'b', 'c']
+        assert monitor._get_history_id(1) == '102'
+
+        await monitor._process_user_emails(1)
+        assert monitor.pipeline.run.await_args.args[2] == ['d']
+        assert monitor._get_history_id(1) == '150'
+
+
+class TestFailingAccounts:
+    """Тесты реакции монитора на неработающие аккаунты"""
+
+    @pytest.mark.asyncio
+    async def test_invalid_grant_parks_user(self, monitor):
+        """Отозванный токен паркует пользователя и отправляет одно сообщение"""
+        from google.auth.exceptions import RefreshError
+        monitor.gmail_service.get_history = AsyncMock(side_effect=RefreshError('invalid_grant: Token has been revoked'))
+        monitor.notifier.submit = Mock()
+
+        await monitor._process_user(1)
+        await monitor._process_user(1)
+
+        assert monitor.gmail_service.get_history.await_count == 1
+        assert list(monitor.health.parked()) == [1]
+        monitor.notifier.submit.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_errors_open_circuit(self, monitor):
+        """После серии ошибок пользователь пропускается до конца паузы"""
+        monitor.gmail_service.get_history = AsyncMock(side_effect=RuntimeError('boom'))
+
+        for _ in range(5):
+            await monitor._process_user(1)
+
+        assert monitor.gmail_service.get_history.await_count == monitor.health.failure_threshold
+        assert monitor.health.backing_off() == [1]
+
+    @pytest.mark.asyncio
+    async def test_timeouts_open_circuit(self, monitor):
+        """Зависающий ящик после серии таймаутов выводится из опроса до конца паузы"""
+        import asyncio
+
+        async def hang(user_id):
+            await asyncio.sleep(3600)
+
+        monitor.gmail_service.get_service = AsyncMock(side_effect=hang)
+        monitor.scheduler.user_timeout = 0.01
+
+        threshold = monitor.health.failure_threshold
+        results = [await monitor.scheduler.run_now(1) for _ in range(5)]
+
+        assert [r.status for r in results[:threshold]] == ['timeout'] * threshold
+        assert monitor.gmail_service.get_service.await_count == threshold
+        assert monitor.health.backing_off() == [1]
+        assert not monitor.health.allow(1)
+
+    @pytest.mark.asyncio
+    async def test_get_service_errors_are_tracked(self, monitor):
+        """Ошибка сборки сервиса (битый токен) учитывается circuit breaker, а invalid_grant паркует"""
+        from google.auth.exceptions import RefreshError
+        monitor.gmail_service.get_service = AsyncMock(side_effect=ValueError('corrupt token'))
+
+        for _ in range(5):
+            await monitor._process_user(1)
+
+        assert monitor.gmail_service.get_service.await_count == monitor.health.failure_threshold
+        assert monitor.health.backing_off() == [1]
+
+        monitor.gmail_service.get_service = AsyncMock(side_effect=RefreshError('invalid_grant'))
+        monitor.notifier.submit = Mock()
+        await monitor._process_user(2)
+
+        assert list(monitor.health.parked()) == [2]
+        monitor.notifier.submit.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_profile_error_after_404_is_tracked(self, monitor):
+        """Ошибки get_profile после 404 истории проходят ту же обработку, что и остальные"""
+        from google.auth.exceptions import RefreshError
+        from googleapiclient.errors import HttpError
+        monitor.gmail_service.get_history = AsyncMock(side_effect=HttpError(Mock(status=404), b'not found'))
+        monitor.gmail_service.get_profile = AsyncMock(side_effect=HttpError(Mock(status=500), b'backend'))
+
+        for _ in range(5):
+            await monitor._process_user(1)
+
+        assert monitor.gmail_service.get_profile.await_count == monitor.health.failure_threshold
+        assert monitor.health.backing_off() == [1]
+
+        monitor.gmail_service.get_profile = AsyncMock(side_effect=RefreshError('invalid_grant'))
+        monitor.notifier.submit = Mock()
+        await monitor._process_user(2)
+
+        assert list(monitor.health.parked()) == [2]
+
+
+class TestShardHandoff:
+    """Тесты передачи курсоров historyId при перебалансировке воркеров"""
+
+    @pytest.mark.asyncio
+    async def test_pending_cursors_written_on_rebalance(self, tmp_path):
+        """При смене состава курсоры пишутся сразу, а поздние курсоры чужих пользователей отбрасываются"""
+        import asyncio
+        import functools
+        from bot.src.application.sharding import ShardCoordinator
+        from bot.src.domain.repositories.user_store import SqliteUserStore
+        store = SqliteUserStore(str(tmp_path / 'state.db'))
+        shard = ShardCoordinator(store, 'w0', heartbeat_interval=3600)
+        other = ShardCoordinator(store, 'w1')
+        state_repo = Mock()
+        monitor = EmailMonitorService(Mock(), Mock(), state_repo, Mock(), category_repo=Mock(), shard=shard)
+        users = list(range(50))
+        shard.refresh()
+        for user_id in users:
+            monitor._set_history_id(user_id, '200')
+
+        other.refresh()
+        task = asyncio.create_task(shard.run(on_rebalance=functools.partial(monitor._flush_history_ids, handoff=True)))
+        await asyncio.sleep(0.1)
+        task.cancel()
+
+        state_repo.save_last_history_ids.assert_called_once_with({user_id: '200' for user_id in users})
+
+        # обработка, начатая до перебалансировки, завершилась уже после неё
+        for user_id in users:
+            monitor._set_history_id(user_id, '300')
+        monitor._flush_history_ids()
+
+        owned = shard.filter(users)
+        assert 0 < len(owned) < len(users)
+        state_repo.save_last_history_ids.assert_called_with({user_id: '300' for user_id in owned})
+        store.close()
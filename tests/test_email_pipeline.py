@@ -0,0 +1,105 @@
+import pytest
+from unittest.mock import Mock, AsyncMock
+from bot.src.application.email_pipeline import EmailPipeline
+from bot.src.application.classification_batcher import ClassificationBatcher
+
+
+def _message(msg_id, subject):
+    return {
+        'id': msg_id,
+        'payload': {'headers': [
+            {'name': 'From', 'value': 'shop@example.com'},
+            {'name': 'Subject', 'value': subject},
+            {'name': 'Date', 'value': 'Mon, 1 Jan 2024 12:00:00 +0000'},
+        ]},
+        'snippet': subject,
+    }
+
+
+class TestEmailPipeline:
+    """Тесты для EmailPipeline"""
+
+    @pytest.fixture
+    def gmail_service(self):
+        service = Mock()
+        service.get_messages = AsyncMock(side_effect=lambda svc, ids: {
+            msg_id: _message(msg_id, f'subject {msg_id}') for msg_id in ids if msg_id != 'gone'
+        })
+        return service
+
+    @pytest.fixture
+    def classifier(self):
+        classifier = Mock()
+        classifier.batch_predict.side_effect = lambda texts: [
+            {'category': 'promotions' if text.endswith('1') else 'forum'} for text in texts
+        ]
+        return classifier
+
+    @pytest.fixture
+    def bot(self):
+        bot = Mock()
+        bot.send_message = AsyncMock()
+        return bot
+
+    @pytest.mark.asyncio
+    async def test_no_subscription_skips_fetch_and_classification(self, bot, gmail_service, classifier):
+        """Без выбранных категорий письма не загружаются и не классифицируются"""
+        categories = Mock()
+        categories.get.return_value = frozenset()
+        pipeline = EmailPipeline(bot, gmail_service, categories, ClassificationBatcher(classifier))
+
+        await pipeline.run(1, Mock(), ['1', '2'])
+
+        gmail_service.get_messages.assert_not_called()
+        classifier.batch_predict.assert_not_called()
+        assert pipeline.stats['subscription.dropped'] == 2
+
+    @pytest.mark.asyncio
+    async def test_stages_count_dropped_messages(self, bot, gmail_service, classifier):
+        """Каждая стадия учитывает прошедшие и отброшенные письма"""
+        categories = Mock()
+        categories.get.return_value = {'promotions'}
+        pipeline = EmailPipeline(bot, gmail_service, categories, ClassificationBatcher(classifier))
+
+        await pipeline.run(1, Mock(), ['1', '2', 'gone'])
+
+        assert pipeline.snapshot() == {
+            'received': 3,
+            'subscription.passed': 3, 'subscription.dropped': 0,
+            'fetch.passed': 2, 'fetch.dropped': 1,
+            'classify.passed': 2, 'classify.dropped': 0,
+            'confidence.passed': 2, 'confidence.dropped': 0,
+            'filter.passed': 1, 'filter.dropped': 1,
+            'notify.passed': 1, 'notify.dropped': 0,
+        }
+        bot.send_message.assert_awaited_once()
+        assert 'promotions' in bot.send_message.await_args.args[1]
+
+    @pytest.mark.asyncio
+    async def test_low_confidence_is_not_notified(self, bot, gmail_service):
+        """Письма с уверенностью ниже порога отбрасываются до фильтра категорий"""
+        classifier = Mock()
+        classifier.batch_predict.side_effect = lambda texts: [
+            {'category': 'promotions', 'confidence': 0.4 if text.endswith('1') else 0.95} for text in texts
+        ]
+        categories = Mock()
+        categories.get.return_value = {'promotions'}
+        pipeline = EmailPipeline(bot, gmail_service, categories, ClassificationBatcher(classifier), min_confidence=0.6)
+
+        await pipeline.run(1, Mock(), ['1', '2'])
+
+        assert pipeline.stats['confidence.dropped'] == 1
+        bot.send_message.assert_awaited_once()
+        assert 'promotions (95%)' in bot.send_message.await_args.args[1]
+
+    @pytest.mark.asyncio
+    async def test_missing_classifier_stops_pipeline(self, bot, gmail_service):
+        """Без классификатора уведомления не отправляются"""
+        categories = Mock()
+        categories.get.return_value = {'forum'}
+        pipeline = EmailPipeline(bot, gmail_service, categories, batcher=None)
+
+        await pipeline.run(1, Mock(), ['2'])
+
+        bot.send_message.assert_not_called()
+        assert pipeline.stats['classify.dropped'] == 1
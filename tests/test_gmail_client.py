@@ -17,3 +17,240 @@ class TestGmailService:
         """Фикстура для создания экземпляра GmailService"""
         return GmailService(token_repository=mock_token_repository)
 
+
+class FakeBatch:
+    """Имитация BatchHttpRequest: отвечает по заранее заданным результатам"""
+
+    def __init__(self, callback, outcomes, log):
+        self.callback = callback
+        self.outcomes = outcomes
+        self.log = log
+        self.ids = []
+
+    def add(self, request, request_id):
+        self.ids.append(request_id)
+
+    def execute(self):
+        self.log.append(list(self.ids))
+        for msg_id in self.ids:
+            outcome = self.outcomes[msg_id].pop(0)
+            if isinstance(outcome, Exception):
+                self.callback(msg_id, None, outcome)
+            else:
+                self.callback(msg_id, outcome, None)
+
+
+def _http_error(status):
+    from googleapiclient.errors import HttpError
+    return HttpError(Mock(status=status, reason=''), b'')
+
+
+class TestGmailServiceBatch:
+    """Тесты пакетной загрузки писем"""
+
+    def _service(self, outcomes, log):
+        service = MagicMock()
+        service.new_batch_http_request.side_effect = lambda callback: FakeBatch(callback, outcomes, log)
+        return service
+
+    def test_messages_split_into_batches_of_limit(self, monkeypatch):
+        """Письма загружаются пачками не больше BATCH_LIMIT"""
+        import bot.src.application.gmail_client as gmail_client
+        monkeypatch.setattr(gmail_client, 'BATCH_LIMIT', 2)
+        outcomes = {str(i): [{'id': str(i)}] for i in range(5)}
+        log = []
+
+        result = GmailService(Mock()).get_messages(self._service(outcomes, log), [str(i) for i in range(5)])
+
+        assert [len(b) for b in log] == [2, 2, 1]
+        assert list(result) == ['0', '1', '2', '3', '4']
+
+    def test_retryable_subrequests_are_retried(self, monkeypatch):
+        """Подзапросы с 429/5xx повторяются, 404 пропускаются"""
+        import bot.src.application.gmail_client as gmail_client
+        monkeypatch.setattr(gmail_client, 'BATCH_RETRY_BASE_DELAY', 0)
+        outcomes = {
+            'a': [{'id': 'a'}],
+            'b': [_http_error(429), _http_error(503), {'id': 'b'}],
+            'c': [_http_error(404)],
+        }
+        log = []
+
+        result = GmailService(Mock()).get_messages(self._service(outcomes, log), ['a', 'b', 'c'])
+
+        assert log == [['a', 'b', 'c'], ['b'], ['b']]
+        assert result == {'a': {'id': 'a'}, 'b': {'id': 'b'}}
+
+    def test_gives_up_after_max_retries(self, monkeypatch):
+        """После исчерпания повторов письмо не возвращается, остальные — да"""
+        import bot.src.application.gmail_client as gmail_client
+        monkeypatch.setattr(gmail_client, 'BATCH_RETRY_BASE_DELAY', 0)
+        monkeypatch.setattr(gmail_client, 'BATCH_MAX_RETRIES', 1)
+        outcomes = {'a': [{'id': 'a'}], 'b': [_http_error(500), _http_error(500)]}
+        log = []
+
+        result = GmailService(Mock()).get_messages(self._service(outcomes, log), ['a', 'b'])
+
+        assert result == {'a': {'id': 'a'}}
+        assert len(log) == 2
+
+
+
+class TestAsyncGmailService:
+    """Тесты для AsyncGmailService"""
+
+    @pytest.mark.asyncio
+    async def test_calls_run_outside_event_loop_thread(self):
+        """Блокирующие вызовы выполняются в пуле потоков"""
+        import threading
+        from bot.src.application.gmail_client import AsyncGmailService
+
+        gmail_service = Mock()
+        caller_threads = []
+        gmail_service.get_history.side_effect = lambda service, history_id, **kwargs: (
+            caller_threads.append(threading.current_thread()) or {'historyId': history_id}
+        )
+        async_service = AsyncGmailService(gmail_service, max_workers=2)
+
+        result = await async_service.get_history(Mock(), '100')
+
+        assert result == {'historyId': '100'}
+        assert caller_threads[0] is not threading.current_thread()
+        async_service.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_event_loop_not_blocked(self):
+        """Пока идёт запрос к Gmail, другие корутины продолжают работать"""
+        import asyncio
+        import time
+        from bot.src.application.gmail_client import AsyncGmailService
+
+        gmail_service = Mock()
+        gmail_service.get_profile.side_effect = lambda service: time.sleep(0.2) or {'historyId': '1'}
+        async_service = AsyncGmailService(gmail_service, max_workers=1)
+        finished = []
+
+        async def fetch_profile():
+            await async_service.get_profile(Mock())
+            finished.append('gmail')
+
+        async def ticker():
+            for _ in range(5):
+                await asyncio.sleep(0.01)
+            finished.append('ticker')
+
+        await asyncio.gather(fetch_profile(), ticker())
+
+        assert finished == ['ticker', 'gmail']
+        async_service.shutdown()
+
+
+class TestGmailTransport:
+    """Тесты HTTP-транспорта Gmail Resource"""
+
+    def test_threads_do_not_share_http(self):
+        """Запросы одного Resource из разных потоков идут через разные httplib2.Http"""
+        import threading
+        from google.oauth2.credentials import Credentials
+        token_repo = Mock()
+        token_repo.token_version.return_value = 1
+        token_repo.load_credentials.return_value = Credentials(token='token')
+        service = GmailService(token_repo).get_service(1)
+        transports = []
+
+        def make_request():
+            transports.append(service.users().getProfile(userId='me').http)
+
+        threads = [threading.Thread(target=make_request) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        make_request()
+        make_request()
+
+        assert transports[0] is not transports[1]
+        assert transports[0].http is not transports[1].http
+        # в одном потоке соединения переиспользуются
+        assert transports[2].http is transports[3].http
+
+
+class TestGmailServiceCache:
+    """Тесты кэша Gmail Resource"""
+
+    @pytest.fixture
+    def token_repo(self):
+        repo = Mock()
+        repo.token_version.return_value = 1
+        repo.load_credentials.side_effect = lambda user_id, scopes: Mock(token=f'token-{user_id}')
+        return repo
+
+    @patch('bot.src.application.gmail_client.build')
+    def test_service_is_reused(self, mock_build, token_repo):
+        """Повторный вызов не перечитывает токен и не вызывает build"""
+        service = GmailService(token_repo)
+
+        first = service.get_service(1)
+        second = service.get_service(1)
+
+        assert first is second
+        assert mock_build.call_count == 1
+        assert token_repo.load_credentials.call_count == 1
+
+    @patch('bot.src.application.gmail_client.build')
+    def test_lru_eviction(self, mock_build, token_repo):
+        """При переполнении вытесняется давно не использованный пользователь"""
+        service = GmailService(token_repo, cache_size=2)
+
+        service.get_service(1)
+        service.get_service(2)
+        service.get_service(1)
+        service.get_service(3)
+
+        assert list(service._cache) == [1, 3]
+
+    @patch('bot.src.application.gmail_client.build')
+    def test_rebuild_when_token_file_changes(self, mock_build, token_repo):
+        """Новая авторизация (изменился токен) сбрасывает запись кэша"""
+        service = GmailService(token_repo)
+        service.get_service(1)
+
+        token_repo.token_version.return_value = 2
+        service.get_service(1)
+
+        assert mock_build.call_count == 2
+
+    @patch('bot.src.application.gmail_client.build')
+    def test_missing_token_returns_none(self, mock_build, token_repo):
+        """Без токена сервис не создаётся"""
+        token_repo.token_version.return_value = None
+        token_repo.load_credentials.side_effect = None
+        token_repo.load_credentials.return_value = None
+
+        assert GmailService(token_repo).get_service(1) is None
+
+    @patch('bot.src.application.gmail_client.build')
+    def test_refreshed_token_written_back(self, mock_build, token_repo):
+        """Обновлённый google-auth токен сохраняется в репозиторий"""
+        service = GmailService(token_repo)
+        service.get_service(1)
+        assert service.sync_credentials(1) is None
+        token_repo.save_credentials.assert_not_called()
+
+        service._cache[1].creds.token = 'refreshed'
+        version = service.sync_credentials(1)
+
+        token_repo.save_credentials.assert_called_once_with(1, service._cache[1].creds)
+        assert version == token_repo.token_version.return_value
+        assert service._cache[1].token == 'refreshed'
+
+    @patch('bot.src.application.gmail_client.build')
+    def test_invalidate(self, mock_build, token_repo):
+        """Отозванный токен удаляется из кэша"""
+        service = GmailService(token_repo)
+        service.get_service(1)
+
+        service.invalidate(1)
+        service.get_service(1)
+
+        assert mock_build.call_count == 2
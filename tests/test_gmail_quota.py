@@ -0,0 +1,106 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import Mock, MagicMock
+from bot.src.application.gmail_client import GmailService, AsyncGmailService
+from bot.src.application.gmail_quota import QuotaAccountant
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _accountant(clock=time.monotonic, **kwargs):
+    params = dict(user_quota=10, project_quota=100, safety=1.0, pressure_threshold=0.5, max_stretch=3)
+    params.update(kwargs)
+    return QuotaAccountant(clock=clock, **params)
+
+
+class TestQuotaAccountant:
+    """Тесты учёта квоты Gmail"""
+
+    def test_user_bucket_throttles_single_user(self):
+        """Пользователь, выбравший свою квоту, ждёт; другие пользователи — нет"""
+        clock = FakeClock()
+        quota = _accountant(clock)
+
+        quota.charge(1, 'messages.get', 2)
+        assert quota.delay(1) == 0
+        quota.charge(1, 'history.list')
+        assert quota.delay(1) == pytest.approx(0.2)
+        quota.charge(2, 'history.list')
+
+        assert quota.delay(2) == 0
+        assert quota.snapshot()['units'] == {'messages.get': 10, 'history.list': 4}
+
+        clock.now = 0.2
+        assert quota.delay(1) == 0
+
+    def test_project_bucket_is_shared(self):
+        """Общая квота проекта ограничивает сумму по всем пользователям"""
+        quota = _accountant(FakeClock(), user_quota=1000)
+
+        for user_id in range(20):
+            quota.charge(user_id, 'messages.get')
+        assert quota.delay(99) == 0
+        quota.charge(20, 'messages.get')
+
+        assert quota.delay(99) == pytest.approx(0.05)
+
+    def test_stretch_grows_with_pressure(self):
+        """Интервал опроса растягивается, когда за минуту израсходовано больше порога"""
+        clock = FakeClock()
+        quota = _accountant(clock)
+        assert quota.stretch() == 1.0
+
+        quota.charge(None, 'watch', 45)
+        assert quota.pressure() == 0.75
+        assert quota.stretch() == 1.5
+
+        clock.now = 61
+        assert quota.stretch() == 1.0
+
+
+class TestGmailServiceQuota:
+    """Тесты списания квоты вызовами GmailService"""
+
+    def test_calls_charged_to_service_owner(self):
+        """Вызовы списываются с владельца service, batch — по числу писем"""
+        quota = Mock()
+        gmail_service = GmailService(Mock(), quota=quota)
+        service = MagicMock()
+        service.new_batch_http_request.return_value = MagicMock()
+        gmail_service._owners[service] = 7
+
+        gmail_service.get_history(service, '100')
+        gmail_service._execute_batch(service, ['a', 'b', 'c'], {})
+
+        quota.charge.assert_any_call(7, 'history.list', 1)
+        quota.charge.assert_any_call(7, 'messages.get', 3)
+
+    @pytest.mark.asyncio
+    async def test_throttled_user_does_not_hold_pool_threads(self):
+        """Ожидание квоты идёт в event loop: поток пула остаётся свободным для других пользователей"""
+        quota = _accountant(user_quota=10)
+        gmail_service = Mock()
+        gmail_service.owner.side_effect = lambda service: service
+        gmail_service.get_history.side_effect = lambda service, history_id, **kwargs: quota.charge(
+            service, 'messages.get', 3
+        ) or service
+        async_service = AsyncGmailService(gmail_service, max_workers=1, quota=quota)
+        finished = []
+
+        async def poll(user_id):
+            finished.append(await async_service.get_history(user_id, '1'))
+
+        await poll(1)
+        # пользователь 1 в долгу на 0.5 с, пользователь 2 не ждёт его в единственном потоке пула
+        await asyncio.gather(poll(1), poll(2))
+
+        assert finished == [1, 2, 1]
+        assert quota.throttled == 1
+        async_service.shutdown()
@@ -0,0 +1,42 @@
+import numpy as np
+from types import SimpleNamespace
+from sklearn.preprocessing import LabelEncoder
+from ML.classifier.artifacts import export_artifacts, load_artifacts, read_manifest
+from ML.classifier.hashing_vectorizer import HashingTfidfVectorizer
+
+TEXTS = ['sale offer today', 'sale coupon offer', 'verify your code', 'forum reply posted']
+
+
+class TestHashingTfidfVectorizer:
+    """Тесты TF-IDF на хешированных признаках"""
+
+    def test_idf_and_normalization(self):
+        """idf считается по сглаженной формуле TfidfVectorizer, строки нормируются по l2"""
+        vectorizer = HashingTfidfVectorizer(n_features=2 ** 10, ngram_range=(1, 1)).fit(TEXTS)
+
+        features = vectorizer.transform(['sale sale forum'])
+        sale = vectorizer._hasher.transform(['sale']).indices[0]
+        assert np.isclose(vectorizer.idf_[sale], np.log(5 / 3) + 1)
+        assert np.isclose(np.linalg.norm(features.toarray()), 1.0)
+
+    def test_min_df_prunes_rare_buckets(self):
+        """Корзины реже min_df получают нулевой idf и не попадают в признаки"""
+        vectorizer = HashingTfidfVectorizer(n_features=2 ** 10, ngram_range=(1, 1), min_df=2).fit(TEXTS)
+
+        assert vectorizer.transform(['verify coupon']).nnz == 0
+        assert vectorizer.transform(['sale offer']).nnz == 2
+
+    def test_export_roundtrip(self, tmp_path):
+        """Формат hashing-npy сохраняет только idf и веса, без словаря"""
+        vectorizer = HashingTfidfVectorizer(n_features=2 ** 10).fit(TEXTS)
+        model = SimpleNamespace(coef_=np.ones((3, 2 ** 10)), intercept_=np.zeros(3), classes_=np.arange(3))
+        label_encoder = LabelEncoder()
+        label_encoder.classes_ = np.array(['forum', 'promotions', 'verify_code'], dtype=object)
+
+        export_artifacts(vectorizer, model, label_encoder, str(tmp_path))
+        manifest = read_manifest(str(tmp_path))
+        loaded, _, _ = load_artifacts(str(tmp_path), manifest)
+
+        assert manifest['format'] == 'hashing-npy'
+        assert not (tmp_path / 'vocabulary.json').exists()
+        assert np.allclose(loaded.transform(TEXTS).toarray(), vectorizer.transform(TEXTS).toarray())
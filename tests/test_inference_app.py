@@ -0,0 +1,98 @@
+import threading
+import pytest
+from unittest.mock import Mock
+from ML.api.batcher import MicroBatcher
+from ML.api.inference_app import InferenceApp
+from ML.classifier.model_registry import ModelRegistry
+
+
+def _fake_classifier():
+    classifier = Mock()
+    classifier.batch_predict.side_effect = lambda texts: [{'category': 'forum', 'text': t} for t in texts]
+    classifier.label_encoder.classes_ = ['forum', 'spam']
+    classifier.model_version = 'v1'
+    return classifier
+
+
+class TestInferenceApp:
+    """Тесты HTTP-сервиса классификации"""
+
+    @pytest.fixture
+    def inference_app(self):
+        classifier = _fake_classifier()
+        registry = ModelRegistry(loader=lambda **kwargs: classifier, warmup_texts=[])
+        app = InferenceApp(max_wait=0.0, registry=registry)
+        app.load_model()
+        return app
+
+    def test_not_ready_until_model_loaded(self):
+        """Пока модель не загружена, /ready и /predict возвращают 503, /health — 200"""
+        client = InferenceApp(registry=ModelRegistry(warmup_texts=[])).app.test_client()
+
+        assert client.get('/health').status_code == 200
+        assert client.get('/ready').status_code == 503
+        assert client.post('/predict', json={'text': 'x'}).status_code == 503
+
+    def test_predict(self, inference_app):
+        """/predict возвращает результат для одного письма"""
+        response = inference_app.app.test_client().post('/predict', json={'text': 'hello'})
+
+        assert response.status_code == 200
+        assert response.get_json() == {'category': 'forum', 'text': 'hello'}
+
+    def test_predict_batch(self, inference_app):
+        """/predict_batch сохраняет порядок писем"""
+        response = inference_app.app.test_client().post('/predict_batch', json={'texts': ['a', 'b']})
+
+        assert [r['text'] for r in response.get_json()['results']] == ['a', 'b']
+
+    def test_validation(self, inference_app):
+        """Некорректный запрос возвращает 400"""
+        client = inference_app.app.test_client()
+
+        assert client.post('/predict', json={}).status_code == 400
+        assert client.post('/predict_batch', json={'texts': 'abc'}).status_code == 400
+
+    def test_ready(self, inference_app):
+        """После загрузки модели /ready сообщает категории"""
+        response = inference_app.app.test_client().get('/ready')
+
+        assert response.status_code == 200
+        assert response.get_json()['categories'] == ['forum', 'spam']
+
+
+class TestMicroBatcher:
+    """Тесты MicroBatcher"""
+
+    def test_concurrent_requests_batched(self):
+        """Одновременные запросы объединяются в один вызов модели"""
+        calls = []
+        release = threading.Event()
+
+        def predict_batch(texts):
+            calls.append(list(texts))
+            release.wait(1)
+            return [t.upper() for t in texts]
+
+        batcher = MicroBatcher(predict_batch, max_batch=100, max_wait=0.2)
+        results = {}
+
+        def submit(text):
+            results[text] = batcher.submit([text], timeout=2)
+
+        threads = [threading.Thread(target=submit, args=(t,)) for t in 'abc']
+        for thread in threads:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert results == {'a': ['A'], 'b': ['B'], 'c': ['C']}
+        assert len(calls) == 1 and sorted(calls[0]) == ['a', 'b', 'c']
+
+    def test_errors_propagate_to_callers(self):
+        """Ошибка модели возвращается всем запросам пакета"""
+        batcher = MicroBatcher(Mock(side_effect=RuntimeError("boom")), max_wait=0.0)
+
+        with pytest.raises(RuntimeError):
+            batcher.submit(['a'], timeout=1)
@@ -0,0 +1,50 @@
+import asyncio
+import threading
+import pytest
+from unittest.mock import Mock
+from bot.src.application.lazy_classifier import LazyClassifier
+
+
+class TestLazyClassifier:
+    """Тесты фоновой загрузки классификатора"""
+
+    @pytest.mark.asyncio
+    async def test_loading_does_not_block_loop(self):
+        """Пока модель грузится, event loop продолжает обрабатывать задачи"""
+        release = threading.Event()
+        model = Mock()
+        model.batch_predict.side_effect = lambda texts: [{'category': 'forum'} for _ in texts]
+
+        def factory():
+            release.wait(timeout=5)
+            return model
+
+        lazy = LazyClassifier(factory)
+        lazy.start_loading()
+        await asyncio.sleep(0.01)
+        assert not lazy.ready
+
+        release.set()
+        assert await lazy.predict('text') == {'category': 'forum'}
+        assert lazy.ready
+
+    @pytest.mark.asyncio
+    async def test_factory_called_once(self):
+        """Повторные и одновременные обращения не загружают модель заново"""
+        model = Mock()
+        model.batch_predict.return_value = [{'category': 'spam'}]
+        factory = Mock(return_value=model)
+        lazy = LazyClassifier(factory)
+
+        lazy.start_loading()
+        await asyncio.gather(lazy.batch_predict(['a']), lazy.batch_predict(['b']))
+
+        factory.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_failed_load_raises(self):
+        """Если модель не загрузилась, классификация сообщает об ошибке"""
+        lazy = LazyClassifier(Mock(return_value=None))
+
+        with pytest.raises(RuntimeError):
+            await lazy.batch_predict(['text'])
@@ -0,0 +1,60 @@
+import threading
+import pytest
+from unittest.mock import Mock
+from aioresponses import aioresponses
+from bot.src.application.ml_api_client import MLApiClient
+
+BASE_URL = 'http://ml-api:8000'
+
+
+class TestMLApiClient:
+    """Тесты клиента сервиса классификации"""
+
+    @pytest.mark.asyncio
+    async def test_batch_predict_uses_api(self):
+        """Результаты берутся из ответа сервиса, локальная модель не создаётся"""
+        factory = Mock()
+        client = MLApiClient(BASE_URL, fallback_factory=factory)
+
+        with aioresponses() as mocked:
+            mocked.post(f'{BASE_URL}/predict_batch', payload={'results': [{'category': 'forum'}]})
+            result = await client.batch_predict(['text'])
+
+        assert result == [{'category': 'forum'}]
+        factory.assert_not_called()
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_fallback_to_local_model(self):
+        """При ошибке сервиса используется локальная модель, созданная один раз; загрузка и классификация идут вне event loop"""
+        threads = []
+        local = Mock()
+        local.batch_predict.side_effect = lambda texts: threads.append(threading.get_ident()) or [
+            {'category': 'spam'} for _ in texts
+        ]
+        factory = Mock(side_effect=lambda: threads.append(threading.get_ident()) or local)
+        client = MLApiClient(BASE_URL, fallback_factory=factory)
+
+        with aioresponses() as mocked:
+            mocked.post(f'{BASE_URL}/predict_batch', status=503)
+            mocked.post(f'{BASE_URL}/predict_batch', status=503)
+            first = await client.batch_predict(['a'])
+            second = await client.predict('b')
+
+        assert first == [{'category': 'spam'}]
+        assert second == {'category': 'spam'}
+        factory.assert_called_once()
+        assert client.fallback_calls == 2
+        assert len(threads) == 3 and threading.get_ident() not in threads
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_no_fallback_raises(self):
+        """Без локальной модели ошибка сервиса пробрасывается"""
+        client = MLApiClient(BASE_URL)
+
+        with aioresponses() as mocked:
+            mocked.post(f'{BASE_URL}/predict_batch', status=500)
+            with pytest.raises(RuntimeError):
+                await client.batch_predict(['a'])
+        await client.close()
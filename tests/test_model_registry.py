@@ -0,0 +1,78 @@
+import os
+import pytest
+from ML.classifier.model_registry import ModelRegistry
+
+
+class FakeClassifier:
+    def __init__(self, model_dir, cache=None, model_version=None):
+        if os.path.exists(os.path.join(model_dir, 'broken')):
+            raise ValueError('broken model')
+        self.model_version = model_version or 'base'
+
+    def batch_predict(self, texts):
+        return [{'category': 'forum', 'model_version': self.model_version} for _ in texts]
+
+
+def _add_version(models_dir, version, ready=True, broken=False):
+    path = models_dir / 'versions' / version
+    path.mkdir(parents=True)
+    if broken:
+        (path / 'broken').touch()
+    if ready:
+        (path / 'metadata.json').write_text('{}')
+
+
+class TestModelRegistry:
+    """Тесты реестра версий модели"""
+
+    @pytest.fixture
+    def registry(self, tmp_path):
+        return ModelRegistry(str(tmp_path), loader=FakeClassifier, pinned_version=None)
+
+    def test_without_versions_uses_models_dir(self, registry):
+        """Без каталога versions загружается модель из самой models_dir"""
+        assert registry.check() is True
+        assert registry.active_version == 'base'
+        assert registry.check() is False
+
+    def test_new_version_is_swapped_in(self, registry, tmp_path):
+        """Новая готовая версия подхватывается, незавершённая — игнорируется"""
+        registry.check()
+        _add_version(tmp_path, '20260101_000000')
+        _add_version(tmp_path, '20260102_000000', ready=False)
+
+        assert registry.check() is True
+        assert registry.active_version == '20260101_000000'
+        assert registry.predict('text')['model_version'] == '20260101_000000'
+
+    def test_broken_version_keeps_active_model(self, registry, tmp_path):
+        """Версия, которая не загрузилась, не подменяет активную и больше не пробуется"""
+        _add_version(tmp_path, '20260101_000000')
+        registry.check()
+        _add_version(tmp_path, '20260102_000000', broken=True)
+
+        assert registry.check() is False
+        assert registry.active_version == '20260101_000000'
+        assert registry.status()['rejected'] == ['20260102_000000']
+        assert registry.check() is False
+
+    def test_rollback(self, registry, tmp_path):
+        """Откат возвращает предыдущую версию, и она не заменяется обратно при проверке"""
+        _add_version(tmp_path, '20260101_000000')
+        registry.check()
+        _add_version(tmp_path, '20260102_000000')
+        registry.check()
+
+        assert registry.rollback() == '20260101_000000'
+        assert registry.check() is False
+        assert registry.active_version == '20260101_000000'
+
+        assert registry.activate('20260102_000000') is True
+        assert registry.active_version == '20260102_000000'
+
+    def test_rollback_without_previous(self, registry):
+        """Без предыдущей версии откат невозможен"""
+        registry.check()
+
+        with pytest.raises(ValueError):
+            registry.rollback()
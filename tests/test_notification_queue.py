@@ -0,0 +1,124 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock
+from aiogram.exceptions import TelegramForbiddenError, TelegramNetworkError, TelegramRetryAfter
+from bot.src.application.notification_queue import NotificationQueue
+from bot.src.application.rate_limit import KeyedTokenBuckets, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucket:
+    """Тесты token bucket"""
+
+    def test_burst_then_rate(self):
+        """Сначала пропускается capacity сообщений, дальше задержки растут с шагом 1/rate"""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, capacity=2, clock=clock)
+
+        assert [bucket.reserve() for _ in range(4)] == [0, 0, 0.5, 1.0]
+        clock.now = 10
+        assert bucket.reserve() == 0
+
+    def test_block(self):
+        """После block отправка разрешается не раньше указанного времени"""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1, capacity=3, clock=clock)
+
+        bucket.block(5)
+
+        assert bucket.reserve() == 6
+        assert not bucket.idle
+
+    def test_idle_buckets_are_pruned(self):
+        """Полные вёдра вытесняются, когда ключей больше max_keys"""
+        clock = FakeClock()
+        buckets = KeyedTokenBuckets(rate=1, capacity=1, max_keys=2, clock=clock)
+        buckets.get(1).reserve()
+        buckets.get(2)
+        buckets.get(3)
+
+        assert len(buckets) == 2
+        assert buckets.get(1).reserve() > 0
+
+
+def _queue(send_message, **kwargs):
+    bot = Mock()
+    bot.send_message = send_message
+    params = dict(workers=2, global_rate=1000, chat_rate=1000, chat_burst=10, retry_base_delay=0.01)
+    params.update(kwargs)
+    return NotificationQueue(bot, **params)
+
+
+async def _drain(queue):
+    workers = asyncio.create_task(queue.run())
+    await asyncio.wait_for(queue.join(), timeout=2)
+    workers.cancel()
+
+
+class TestNotificationQueue:
+    """Тесты очереди уведомлений"""
+
+    @pytest.mark.asyncio
+    async def test_messages_are_sent(self):
+        """Сообщения уходят с переданными параметрами, глубина очереди видна до отправки"""
+        send_message = AsyncMock()
+        queue = _queue(send_message)
+        queue.submit(1, 'a', parse_mode='Markdown')
+        queue.submit(2, 'b')
+        assert queue.depth == 2
+
+        await _drain(queue)
+
+        send_message.assert_any_await(1, 'a', parse_mode='Markdown')
+        assert queue.snapshot()['sent'] == 2
+        assert queue.depth == 0
+
+    @pytest.mark.asyncio
+    async def test_chat_limit_defers_without_reordering(self):
+        """Лимит чата откладывает сообщения, порядок внутри чата сохраняется"""
+        sent = []
+        queue = _queue(AsyncMock(side_effect=lambda chat_id, text: sent.append(text)), chat_rate=50, chat_burst=1)
+        for text in 'abc':
+            queue.submit(1, text)
+
+        await _drain(queue)
+
+        assert sent == ['a', 'b', 'c']
+
+    @pytest.mark.asyncio
+    async def test_retry_after_is_honoured(self):
+        """RetryAfter блокирует чат на указанное время, затем сообщение отправляется"""
+        send_message = AsyncMock(side_effect=[TelegramRetryAfter(Mock(), 'flood', 0.05), None])
+        queue = _queue(send_message)
+        queue.submit(1, 'a')
+
+        await _drain(queue)
+
+        assert send_message.await_count == 2
+        assert queue.snapshot()['flood_waits'] == 1
+        assert queue.snapshot()['sent'] == 1
+
+    @pytest.mark.asyncio
+    async def test_network_errors_retried_up_to_limit(self):
+        """Временные ошибки повторяются с backoff, постоянные — нет"""
+        send_message = AsyncMock(side_effect=TelegramNetworkError(Mock(), 'timeout'))
+        queue = _queue(send_message, max_retries=2)
+        queue.submit(1, 'a')
+        await _drain(queue)
+
+        assert send_message.await_count == 3
+        assert queue.snapshot()['failed'] == 1
+
+        forbidden = AsyncMock(side_effect=TelegramForbiddenError(Mock(), 'blocked'))
+        queue = _queue(forbidden)
+        queue.submit(1, 'a')
+        await _drain(queue)
+
+        assert forbidden.await_count == 1
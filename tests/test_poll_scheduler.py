@@ -0,0 +1,161 @@
+import asyncio
+import pytest
+from bot.src.application.poll_scheduler import PollScheduler, AdaptivePollScheduler
+
+
+class TestPollScheduler:
+    """Тесты для PollScheduler"""
+
+    @pytest.mark.asyncio
+    async def test_users_processed_concurrently(self):
+        """Медленный пользователь не задерживает остальных"""
+        finished = []
+
+        async def process(user_id):
+            await asyncio.sleep(0.2 if user_id == 1 else 0.01)
+            finished.append(user_id)
+
+        scheduler = PollScheduler(process, interval=0.0, max_concurrency=10, user_timeout=1)
+        stats = await scheduler.run_cycle([1, 2, 3])
+
+        assert finished == [2, 3, 1]
+        assert stats.count("ok") == 3
+        assert stats.duration < 0.5
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit(self):
+        """Одновременно обрабатывается не больше max_concurrency пользователей"""
+        active = 0
+        peak = 0
+
+        async def process(user_id):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+        scheduler = PollScheduler(process, interval=0.0, max_concurrency=2, user_timeout=1)
+        await scheduler.run_cycle(list(range(6)))
+
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_user_timeout(self):
+        """Зависший пользователь прерывается по таймауту"""
+        async def process(user_id):
+            await asyncio.sleep(10)
+
+        scheduler = PollScheduler(process, interval=0.0, max_concurrency=1, user_timeout=0.05)
+        stats = await scheduler.run_cycle([42])
+
+        assert stats.results[0].status == "timeout"
+        assert scheduler.last_cycle is stats
+
+    @pytest.mark.asyncio
+    async def test_users_spread_across_interval(self):
+        """Пользователи стартуют равномерно по интервалу, а не одной пачкой"""
+        loop = asyncio.get_running_loop()
+        starts = {}
+
+        async def process(user_id):
+            starts[user_id] = loop.time()
+
+        scheduler = PollScheduler(process, interval=0.3, max_concurrency=10, user_timeout=1)
+        stats = await scheduler.run_cycle([1, 2, 3])
+
+        assert starts[2] - starts[1] == pytest.approx(0.1, abs=0.05)
+        assert starts[3] - starts[1] == pytest.approx(0.2, abs=0.05)
+        assert stats.max_lag < 0.05
+
+    @pytest.mark.asyncio
+    async def test_errors_are_isolated(self):
+        """Ошибка одного пользователя не прерывает цикл"""
+        async def process(user_id):
+            if user_id == 1:
+                raise RuntimeError("boom")
+
+        scheduler = PollScheduler(process, interval=0.0, max_concurrency=2, user_timeout=1)
+        stats = await scheduler.run_cycle([1, 2])
+
+        assert [r.status for r in stats.results] == ["error", "ok"]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestAdaptivePollScheduler:
+    """Тесты адаптивного интервала опроса"""
+
+    def _scheduler(self, process=None, **kwargs):
+        async def noop(user_id):
+            pass
+        params = dict(interval=60, min_interval=15, max_interval=900, target_messages=1, alpha=0.5)
+        params.update(kwargs)
+        return AdaptivePollScheduler(process or noop, **params)
+
+    def test_interval_follows_arrival_rate(self):
+        """Активный пользователь опрашивается чаще, молчащий — реже, в заданных границах"""
+        clock = FakeClock()
+        scheduler = self._scheduler(clock=clock)
+        assert scheduler.user_interval(1) == 60
+
+        scheduler.record_activity(1, 0)
+        scheduler.record_activity(2, 0)
+        clock.now = 60
+        scheduler.record_activity(1, 2)
+        scheduler.record_activity(2, 0)
+
+        # EWMA с априорной частотой 1/60: 0.5 * 2/60 + 0.5 * 1/60 и 0.5 * 0 + 0.5 * 1/60
+        assert scheduler.user_interval(1) == pytest.approx(40)
+        assert scheduler.user_interval(2) == pytest.approx(120)
+
+        clock.now = 120
+        scheduler.record_activity(1, 60)
+        assert scheduler.user_interval(1) == 15
+
+    def test_quiet_user_stretched_gradually_and_capped(self):
+        """Один пустой опрос не уводит пользователя на максимальный интервал; растяжение ограничено max_stretch"""
+        clock = FakeClock()
+        scheduler = self._scheduler(clock=clock, alpha=0.3, max_stretch=4)
+        scheduler.record_activity(1, 0)
+        intervals = []
+        for _ in range(20):
+            clock.now += scheduler.user_interval(1)
+            scheduler.record_activity(1, 0)
+            intervals.append(scheduler.user_interval(1))
+
+        assert intervals[0] < 2 * 60
+        assert intervals == sorted(intervals)
+        assert intervals[-1] == 240
+
+    def test_backlog_and_quota_stretch(self):
+        """Недочитанная история — минимальный интервал; нехватка квоты его растягивает"""
+        scheduler = self._scheduler(interval_scale=lambda: 2.0)
+        scheduler.record_activity(1, 500, backlog=True)
+
+        assert scheduler.user_interval(1) == 30
+
+    @pytest.mark.asyncio
+    async def test_busy_user_polled_more_often(self):
+        """В run_forever активный пользователь опрашивается чаще молчащего"""
+        polls = {1: 0, 2: 0}
+        cycles = []
+
+        async def process(user_id):
+            polls[user_id] += 1
+            scheduler.record_activity(user_id, 5 if user_id == 1 else 0)
+
+        scheduler = AdaptivePollScheduler(process, interval=0.2, min_interval=0.02, max_interval=0.2,
+                                          target_messages=1, alpha=1, on_cycle=cycles.append)
+        task = asyncio.create_task(scheduler.run_forever(lambda: [1, 2]))
+        await asyncio.sleep(0.5)
+        task.cancel()
+
+        assert polls[1] > 3 * polls[2]
+        assert cycles and cycles[0].count("ok") >= 2
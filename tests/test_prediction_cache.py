@@ -0,0 +1,91 @@
+from ML.classifier.prediction_cache import PredictionCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestPredictionCache:
+    """Тесты кэша результатов классификации"""
+
+    def test_lru_eviction(self):
+        """При переполнении вытесняется давно не использованная запись"""
+        cache = PredictionCache(max_size=2, path=None)
+        cache.put('a', {'category': 'spam'})
+        cache.put('b', {'category': 'forum'})
+        cache.get('a')
+        cache.put('c', {'category': 'updates'})
+
+        assert cache.get('b') is None
+        assert cache.get('a') == {'category': 'spam'}
+        assert cache.stats()['evictions'] == 1
+
+    def test_ttl_expiry(self):
+        """Устаревшая запись считается промахом"""
+        clock = FakeClock()
+        cache = PredictionCache(ttl=60, path=None, clock=clock)
+        cache.put('a', {'category': 'spam'})
+
+        clock.now += 61
+
+        assert cache.get('a') is None
+        assert cache.stats() == {'size': 0, 'hits': 0, 'misses': 1, 'evictions': 0, 'hit_rate': 0.0}
+
+    def test_key_depends_on_model_version(self):
+        """Одинаковый текст у разных версий модели даёт разные ключи"""
+        assert PredictionCache.key('text', 'v1') != PredictionCache.key('text', 'v2')
+        assert PredictionCache.key('text', 'v1') == PredictionCache.key('text', 'v1')
+
+    def test_new_model_version_clears_cache(self):
+        """Загрузка новой модели сбрасывает кэш"""
+        cache = PredictionCache(path=None)
+        cache.set_model_version('v1')
+        cache.put('a', {'category': 'spam'})
+
+        cache.set_model_version('v1')
+        assert cache.stats()['size'] == 1
+        cache.set_model_version('v2')
+        assert cache.stats()['size'] == 0
+
+    def test_persistence(self, tmp_path):
+        """Кэш сохраняется на диск и восстанавливается после перезапуска"""
+        path = str(tmp_path / 'cache.json')
+        cache = PredictionCache(path=path)
+        cache.set_model_version('v1')
+        cache.put('a', {'category': 'spam'})
+        cache.save()
+
+        restored = PredictionCache(path=path)
+        restored.set_model_version('v1')
+
+        assert restored.get('a') == {'category': 'spam'}
+
+    def test_concurrent_saves_to_one_path(self, tmp_path):
+        """Несколько экземпляров пишут в один файл через свои временные файлы, файл остаётся целым"""
+        from concurrent.futures import ThreadPoolExecutor
+        path = str(tmp_path / 'cache.json')
+        caches = [PredictionCache(path=path) for _ in range(4)]
+        for i, cache in enumerate(caches):
+            cache.put(f'key-{i}', {'category': 'spam'})
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(lambda cache: [cache.save() for _ in range(20)], caches))
+
+        assert PredictionCache(path=path).stats()['size'] == 1
+        assert [p.name for p in tmp_path.iterdir()] == ['cache.json']
+
+    def test_child_process_does_not_save_on_exit(self, tmp_path, monkeypatch):
+        """Процесс пула классификации не регистрирует сохранение при выходе"""
+        import atexit
+        import multiprocessing
+        registered = []
+        monkeypatch.setattr(atexit, 'register', registered.append)
+        PredictionCache(path=str(tmp_path / 'cache.json'))
+        monkeypatch.setattr(multiprocessing, 'parent_process', lambda: object())
+        PredictionCache(path=str(tmp_path / 'cache.json'))
+
+        assert len(registered) == 1
@@ -0,0 +1,121 @@
+import numpy as np
+import pytest
+from unittest.mock import Mock
+from ML.classifier.predictor import EmailClassifier
+from ML.classifier.prediction_cache import PredictionCache
+
+
+class FakeLabelEncoder:
+    classes_ = np.array(['forum', 'promotions'])
+
+    def inverse_transform(self, labels):
+        return self.classes_[np.asarray(labels)]
+
+
+class TestEmailClassifier:
+    """Тесты для EmailClassifier"""
+
+    @pytest.fixture
+    def classifier(self):
+        classifier = EmailClassifier.__new__(EmailClassifier)
+        classifier.vectorizer = Mock()
+        classifier.vectorizer.transform.side_effect = lambda texts: np.arange(len(texts)).reshape(-1, 1)
+        classifier.model = Mock()
+        classifier.model.classes_ = np.array([0, 1])
+        # чётные тексты -> forum, нечётные -> promotions
+        classifier.model.decision_function.side_effect = lambda features: np.where(features[:, 0] % 2, 1.0, -1.0)
+        classifier.label_encoder = FakeLabelEncoder()
+        classifier.model_version = 'v1'
+        classifier.confidence_temperature = 1.0
+        classifier.cache = None
+        return classifier
+
+    def test_batch_predict_single_vectorizer_and_model_call(self, classifier):
+        """Весь список обрабатывается одним вызовом transform/predict"""
+        results = classifier.batch_predict(['short', 'a much longer email text', 'tiny'])
+
+        assert [r['category'] for r in results] == ['forum', 'promotions', 'forum']
+        assert classifier.vectorizer.transform.call_count == 1
+        assert classifier.model.decision_function.call_count == 1
+
+    def test_predict_matches_batch_predict(self, classifier):
+        """predict возвращает тот же результат, что и batch_predict для одного письма"""
+        text = 'some email text'
+
+        assert classifier.predict(text) == classifier.batch_predict([text])[0]
+
+    def test_batch_predict_empty(self, classifier):
+        """Пустой список не вызывает модель"""
+        assert classifier.batch_predict([]) == []
+        classifier.model.decision_function.assert_not_called()
+
+    def test_confidence_from_decision_scores(self, classifier):
+        """Уверенность и вероятности классов получаются softmax по оценкам decision_function"""
+        result = classifier.batch_predict(['text one', 'text two'])[1]
+
+        expected = 1 / (1 + np.exp(-2.0))
+        assert result['category'] == 'promotions'
+        assert result['confidence'] == pytest.approx(expected)
+        assert result['probabilities'] == pytest.approx({'forum': 1 - expected, 'promotions': expected})
+        assert result['scores'] == {'forum': -1.0, 'promotions': 1.0}
+
+    def test_cache_skips_known_and_duplicate_texts(self, classifier):
+        """Повторные и одинаковые письма не доходят до vectorizer.transform"""
+        classifier.cache = PredictionCache(max_size=10, path=None)
+
+        first = classifier.batch_predict(['weekly newsletter', 'weekly newsletter', 'personal note'])
+        second = classifier.batch_predict(['Weekly newsletter!', 'another text'])
+
+        assert first[0] == first[1] == second[0]
+        assert [len(call.args[0]) for call in classifier.vectorizer.transform.call_args_list] == [2, 1]
+        assert classifier.cache.stats()['hits'] == 1
+
+
+class TestPickleBenchmarkVariant:
+    """Вариант vectorizer.pkl в бенчмарке векторизаторов"""
+
+    @pytest.fixture
+    def model_dir(self, tmp_path, monkeypatch):
+        import pickle
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.preprocessing import LabelEncoder
+        from ML.classifier import predictor
+        from ML.classifier.artifacts import ArtifactLinearModel, export_artifacts, load_artifacts, read_manifest
+
+        # обученное состояние задаётся вручную: fit в тестах недоступен (pandas замокан в conftest)
+        vectorizer = TfidfVectorizer()
+        vectorizer.vocabulary_ = {'sale': 0, 'forum': 1}
+        vectorizer.idf_ = np.array([1.0, 1.0])
+        # классы FakeLabelEncoder: 0 -> forum, 1 -> promotions
+        model = ArtifactLinearModel(np.array([[-1.0, 1.0], [1.0, -1.0]]), np.zeros(2), np.array([0, 1]))
+        label_encoder = LabelEncoder()
+        label_encoder.classes_ = FakeLabelEncoder.classes_.astype(object)
+        export_artifacts(vectorizer, model, label_encoder, str(tmp_path))
+        # в pickle кладутся те же объекты без mmap: transform и inverse_transform sklearn
+        # с замоканным pandas не работают
+        pickled_vectorizer, pickled_model, _ = load_artifacts(str(tmp_path), read_manifest(str(tmp_path)), mmap_mode=None)
+        pickles = {'vectorizer.pkl': pickled_vectorizer, 'model.pkl': pickled_model, 'label_encoder.pkl': FakeLabelEncoder()}
+        for name, obj in pickles.items():
+            with open(tmp_path / name, 'wb') as f:
+                pickle.dump(obj, f)
+        # joblib замокан в conftest
+        monkeypatch.setattr(predictor.joblib, 'load', lambda path: pickle.load(open(path, 'rb')))
+        monkeypatch.setattr(predictor, 'ML_CACHE_SIZE', 0)
+        return str(tmp_path)
+
+    def test_measure_pickle_variant(self, model_dir):
+        """Классификатор из pickle полностью инициализирован, measure() отрабатывает"""
+        from ML.classifier import benchmark_vectorizers as benchmark
+
+        classifier = benchmark._pickle_classifier(model_dir)
+        result = benchmark.measure(
+            "vectorizer.pkl", benchmark._load_pickle_vectorizer, benchmark._pickle_classifier, model_dir,
+            ['Big sale today', 'New forum reply'], ['sale today', 'forum reply'], ['promotions', 'forum'],
+            batch_size=1, repeats=1,
+        )
+
+        # .npy рядом есть, но загружен pickle
+        assert not isinstance(classifier.model.coef_, np.memmap)
+        assert classifier.model_version and classifier.confidence_temperature == 1.0
+        assert result['accuracy'] == 1.0
+        assert result['mmap_kb'] == 0.0
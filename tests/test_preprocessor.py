@@ -0,0 +1,99 @@
+import csv
+import json
+import random
+import re
+from pathlib import Path
+import pytest
+from ML.classifier import preprocessor
+from ML.classifier.preprocessor import clean_email_text, clean_email_texts
+
+DATA_DIR = Path(__file__).parent.parent / "ML" / "data"
+
+
+def legacy_clean_email_text(text):
+    """Исходная реализация очистки (эталон для регрессионной проверки)"""
+    if text is None or (isinstance(text, float) and text != text):
+        return ""
+
+    text = str(text)
+
+    text = text.lower()
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'http\S+|www\S+|https\S+', '', text, flags=re.MULTILINE)
+    text = re.sub(r'\S+@\S+', '', text)
+    text = re.sub(r'<.*?>', '', text)
+    text = re.sub(r'[^a-z\s]', '', text)
+
+    words = text.split()
+    words = [word for word in words if word not in preprocessor.STOP_WORDS and len(word) > 2]
+
+    return ' '.join(words)
+
+
+EDGE_CASES = [
+    "",
+    "   ",
+    "Hello World",
+    "The quick brown fox is AND the lazy dog",
+    "Visit https://example.com/path?x=1 or www.example.org now",
+    "mail me: user@example.com, or @handle, or trailing@ now",
+    "a@http://x.com b@@c @x x@",
+    "<b>Bold</b> <a href='http://x.com'>link</a> <unclosed tag",
+    "<a href=http://x>text</a>",
+    "line1\nline2\r\nline3\ttab\x0bvt\x0cff nbsp　ideographic",
+    "Ünïcödé İstanbul STRASSE straße Привет мир",
+    "numbers 12345 and symbols !@#$%^&*() mixed-in_words",
+    "<<nested>> <> >< <<<",
+    "HTTPS://UPPER.CASE/URL WWW.UPPER.COM",
+]
+
+
+def _dataset_corpus():
+    texts = []
+    with open(DATA_DIR / "test.csv", encoding='utf-8') as f:
+        texts.extend(row['text'] for row in csv.DictReader(f))
+    with open(DATA_DIR / "test_ru.json", encoding='utf-8') as f:
+        texts.extend(item.get('body', '') for item in json.load(f))
+    return texts
+
+
+def _fuzz_corpus(count=3000, seed=42):
+    alphabet = list("abcHTwWs:/.@<> \t\n\r xyzİßЖ-_'1") + [
+        'http', 'www', 'https://', '<b>', '</a>', 'user@x.com', ' the ', 'and ',
+    ]
+    rng = random.Random(seed)
+    return [''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 30))) for _ in range(count)]
+
+
+class TestCleanEmailText:
+    """Регрессионные тесты очистки текста"""
+
+    @pytest.mark.parametrize("text", EDGE_CASES)
+    def test_edge_cases_match_legacy(self, text):
+        """Граничные случаи совпадают с исходной реализацией"""
+        assert clean_email_text(text) == legacy_clean_email_text(text)
+
+    def test_dataset_corpus_matches_legacy(self):
+        """Письма из датасетов очищаются байт-в-байт как раньше"""
+        corpus = _dataset_corpus()
+
+        assert clean_email_texts(corpus) == [legacy_clean_email_text(text) for text in corpus]
+
+    def test_fuzz_corpus_matches_legacy(self):
+        """Случайные строки из «опасных» символов очищаются как раньше"""
+        corpus = _fuzz_corpus()
+
+        assert clean_email_texts(corpus) == [legacy_clean_email_text(text) for text in corpus]
+
+    @pytest.mark.parametrize("value", [None, float('nan')])
+    def test_missing_values(self, value):
+        """Пропущенные значения дают пустую строку"""
+        assert clean_email_text(value) == ""
+
+    def test_non_string_input(self):
+        """Нестроковые значения приводятся к строке"""
+        assert clean_email_text(12345) == legacy_clean_email_text(12345)
+
+    def test_batch_api(self):
+        """Пакетная очистка сохраняет порядок"""
+        assert clean_email_texts(["Hello World", None]) == ["hello world", ""]
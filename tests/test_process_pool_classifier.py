@@ -0,0 +1,87 @@
+import asyncio
+import os
+import threading
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+import bot.src.application.process_pool_classifier as process_pool_classifier
+from bot.src.application.process_pool_classifier import ProcessPoolClassifier
+
+
+class FakeModel:
+    def batch_predict(self, texts):
+        return [{'category': text.upper(), 'pid': os.getpid()} for text in texts]
+
+
+def fake_loader():
+    return FakeModel()
+
+
+def failing_loader():
+    return None
+
+
+class TestProcessPoolClassifier:
+    """Тесты классификации в пуле процессов"""
+
+    def test_chunks(self):
+        """Пакет делится по воркерам, но не мельче chunk_size"""
+        pool = ProcessPoolClassifier(workers=4, chunk_size=3, loader=fake_loader)
+
+        assert [len(chunk) for chunk in pool._chunks(list('abcdefghij'))] == [3, 3, 3, 1]
+        assert [len(chunk) for chunk in pool._chunks(list('a' * 40))] == [10, 10, 10, 10]
+
+    @pytest.mark.asyncio
+    async def test_results_from_worker_processes(self):
+        """Результаты приходят из других процессов в исходном порядке"""
+        pool = ProcessPoolClassifier(workers=2, chunk_size=2, loader=fake_loader)
+        try:
+            await pool.start_loading()
+            results = await pool.batch_predict(['a', 'b', 'c', 'd', 'e'])
+        finally:
+            pool.shutdown()
+
+        assert [r['category'] for r in results] == ['A', 'B', 'C', 'D', 'E']
+        assert os.getpid() not in {r['pid'] for r in results}
+        assert pool.ready and pool.depth == 0
+
+    @pytest.fixture
+    def in_process_pool(self, monkeypatch):
+        """Пул на потоках с моделью, загруженной в текущем процессе"""
+        monkeypatch.setattr(process_pool_classifier, '_classifier', None)
+
+        def make(loader, **kwargs):
+            process_pool_classifier._init_worker(loader)
+            pool = ProcessPoolClassifier(loader=loader, **kwargs)
+            pool._executor = ThreadPoolExecutor(max_workers=pool.workers)
+            return pool
+        return make
+
+    @pytest.mark.asyncio
+    async def test_backpressure_limits_pending_chunks(self, in_process_pool):
+        """В пул одновременно отправляется не больше max_pending кусков"""
+        release = threading.Event()
+
+        class SlowModel(FakeModel):
+            def batch_predict(self, texts):
+                release.wait(timeout=5)
+                return super().batch_predict(texts)
+
+        pool = in_process_pool(SlowModel, workers=1, max_pending=1, chunk_size=1)
+        tasks = [asyncio.create_task(pool.batch_predict([text])) for text in 'abc']
+        await asyncio.sleep(0.01)
+
+        assert pool.depth == 3
+        assert pool._semaphore.locked()
+        release.set()
+        assert [r[0]['category'] for r in await asyncio.gather(*tasks)] == ['A', 'B', 'C']
+        assert pool.depth == 0
+        pool.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_worker_without_model_raises(self, in_process_pool):
+        """Если модель в воркере не загрузилась, классификация сообщает об ошибке"""
+        pool = in_process_pool(failing_loader, workers=1)
+
+        with pytest.raises(RuntimeError):
+            await pool.batch_predict(['a'])
+        pool.shutdown()
@@ -0,0 +1,161 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import Mock, AsyncMock
+from flask import Flask
+from bot.src.application.push_notifications import WatchManager, PushNotificationQueue
+from bot.src.infrastructure.push_receiver import PushReceiver, decode_push_message
+from bot.src.infrastructure.local_push_publisher import LocalPushPublisher
+
+
+class TestPushReceiver:
+    """Тесты приёмника push-уведомлений"""
+
+    @pytest.fixture
+    def client_and_handler(self):
+        handler = Mock()
+        app = Flask(__name__)
+        PushReceiver(handler, verification_token='secret').register(app)
+        return app.test_client(), handler
+
+    def test_local_publisher_envelope_is_accepted(self, client_and_handler):
+        """Конверт локального издателя разбирается так же, как Pub/Sub"""
+        client, handler = client_and_handler
+        envelope = LocalPushPublisher().build_envelope('User@Example.com', '777')
+
+        response = client.post('/gmail/push?token=secret', json=envelope)
+
+        assert response.status_code == 204
+        handler.assert_called_once_with('User@Example.com', 777)
+        assert decode_push_message(envelope) == {'emailAddress': 'User@Example.com', 'historyId': 777}
+
+    def test_wrong_token_rejected(self, client_and_handler):
+        """Уведомление с неверным токеном отклоняется"""
+        client, handler = client_and_handler
+        envelope = LocalPushPublisher().build_envelope('a@b.c', '1')
+
+        response = client.post('/gmail/push?token=wrong', json=envelope)
+        missing = client.post('/gmail/push', json=envelope)
+
+        assert response.status_code == missing.status_code == 403
+        handler.assert_not_called()
+
+    def test_empty_token_refused(self):
+        """Без токена проверки приёмник не создаётся"""
+        with pytest.raises(ValueError):
+            PushReceiver(Mock(), verification_token='')
+
+    def test_malformed_payload(self, client_and_handler):
+        """Некорректное тело запроса возвращает 400"""
+        client, handler = client_and_handler
+
+        response = client.post('/gmail/push?token=secret', json={'message': {}})
+
+        assert response.status_code == 400
+
+
+class TestWatchManager:
+    """Тесты подписок users.watch"""
+
+    @pytest.mark.asyncio
+    async def test_watch_registers_email_and_is_not_renewed_early(self):
+        """После подписки адрес сопоставлен пользователю, повторный вызов не идёт в API"""
+        gmail = Mock()
+        gmail.get_service = AsyncMock(return_value=Mock())
+        gmail.get_profile = AsyncMock(return_value={'emailAddress': 'User@Example.com'})
+        expiration = int((time.time() + 7 * 86400) * 1000)
+        gmail.watch = AsyncMock(return_value={'historyId': '1', 'expiration': str(expiration)})
+        manager = WatchManager(gmail, topic_name='projects/p/topics/t', renew_margin=86400)
+
+        assert await manager.ensure_watch(5)
+        assert await manager.ensure_watch(5)
+
+        assert manager.resolve_user('user@example.com') == 5
+        gmail.watch.assert_awaited_once()
+
+    def test_needs_renewal_near_expiration(self):
+        """Подписка продлевается, когда до истечения меньше запаса"""
+        manager = WatchManager(Mock(), topic_name='t', renew_margin=3600)
+        manager.expirations[1] = time.time() + 60
+        manager.expirations[2] = time.time() + 7200
+
+        assert manager.needs_renewal(1)
+        assert not manager.needs_renewal(2)
+        assert manager.needs_renewal(3)
+
+    @pytest.mark.asyncio
+    async def test_disconnected_user_forgotten(self):
+        """Пользователь, ушедший из подключённых, больше не сопоставляется адресу и не продлевается"""
+        manager = WatchManager(Mock(), topic_name='t', renew_margin=3600)
+        manager.ensure_watch = AsyncMock(return_value=True)
+        manager.expirations = {1: time.time() + 86400, 2: time.time() + 86400}
+        manager.email_to_user = {'one@b.c': 1, 'two@b.c': 2}
+
+        task = asyncio.create_task(manager.run(lambda: [1], check_interval=3600))
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+        assert list(manager.expirations) == [1]
+        assert manager.resolve_user('two@b.c') is None
+        manager.ensure_watch.assert_awaited_once_with(1)
+
+    @pytest.mark.asyncio
+    async def test_unhealthy_users_not_renewed(self):
+        """Подписки запаркованных и поставленных на паузу пользователей не продлеваются и не забываются"""
+        from bot.src.application.user_health import UserHealthTracker
+        health = UserHealthTracker(failure_threshold=1)
+        health.park(2, 'invalid_grant')
+        health.record_failure(3, 'HTTP 500')
+        manager = WatchManager(Mock(), topic_name='t')
+        manager.ensure_watch = AsyncMock(return_value=True)
+        manager.expirations = {2: time.time() + 86400, 3: time.time() + 86400}
+
+        task = asyncio.create_task(manager.run(lambda: [1, 2, 3], check_interval=3600, can_renew=health.is_healthy))
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+        manager.ensure_watch.assert_awaited_once_with(1)
+        assert sorted(manager.expirations) == [2, 3]
+        assert health.backing_off() == [3]
+
+
+class TestPushNotificationQueue:
+    """Тесты очереди push-уведомлений"""
+
+    @pytest.mark.asyncio
+    async def test_duplicate_notifications_coalesced(self):
+        """Повторные уведомления для пользователя в очереди схлопываются"""
+        manager = WatchManager(Mock(), topic_name='t')
+        manager.email_to_user['a@b.c'] = 7
+        queue = PushNotificationQueue(manager)
+        processed = []
+
+        async def process(user_id):
+            processed.append(user_id)
+
+        consumer = asyncio.create_task(queue.consume(process))
+        await asyncio.sleep(0)
+        for _ in range(3):
+            queue.submit('a@b.c', '1')
+        queue.submit('unknown@b.c', '1')
+        await asyncio.sleep(0.05)
+        consumer.cancel()
+
+        assert processed == [7]
+
+    @pytest.mark.asyncio
+    async def test_submit_from_receiver_thread(self):
+        """Уведомление из потока Flask доставляется в event loop"""
+        manager = WatchManager(Mock(), topic_name='t')
+        manager.email_to_user['a@b.c'] = 7
+        queue = PushNotificationQueue(manager)
+        done = asyncio.Event()
+
+        async def process(user_id):
+            done.set()
+
+        consumer = asyncio.create_task(queue.consume(process))
+        await asyncio.sleep(0)
+        await asyncio.to_thread(queue.submit, 'a@b.c', '1')
+        await asyncio.wait_for(done.wait(), timeout=1)
+        consumer.cancel()
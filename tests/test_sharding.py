@@ -0,0 +1,63 @@
+from collections import Counter
+from bot.src.application.sharding import HashRing, ShardCoordinator
+from bot.src.domain.repositories.user_store import SqliteUserStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestHashRing:
+    """Тесты консистентного хеширования"""
+
+    def test_keys_spread_and_move_minimally(self):
+        """Ключи делятся примерно поровну, при добавлении узла переезжает около 1/N"""
+        users = range(3000)
+        ring = HashRing(['w1', 'w2', 'w3'])
+        before = {user_id: ring.node_for(user_id) for user_id in users}
+
+        assert min(Counter(before.values()).values()) > 700
+
+        after = HashRing(['w1', 'w2', 'w3', 'w4'])
+        moved = [user_id for user_id in users if after.node_for(user_id) != before[user_id]]
+        assert all(after.node_for(user_id) == 'w4' for user_id in moved)
+        assert 500 < len(moved) < 1000
+
+    def test_empty_ring(self):
+        assert HashRing([]).node_for(1) is None
+
+
+class TestShardCoordinator:
+    """Тесты распределения пользователей между воркерами"""
+
+    def test_workers_split_users_and_rebalance(self, tmp_path):
+        """Живые воркеры делят пользователей без пересечений; ушедший выпадает по TTL"""
+        store = SqliteUserStore(str(tmp_path / 'state.db'))
+        clock = FakeClock()
+        workers = [ShardCoordinator(store, f"w{i}", heartbeat_ttl=30, clock=clock) for i in range(3)]
+        for worker in workers:
+            worker.refresh()
+        for worker in workers:
+            worker.refresh()
+
+        users = list(range(300))
+        shares = [set(worker.filter(users)) for worker in workers]
+        assert sum(len(share) for share in shares) == 300
+        assert set.union(*shares) == set(users)
+
+        clock.now += 60
+        workers[1].refresh()
+        workers[0].refresh()
+        workers[1].refresh()
+
+        assert workers[0].workers == ['w0', 'w1']
+        assert set(workers[0].filter(users)) | set(workers[1].filter(users)) == set(users)
+
+        workers[1].leave()
+        assert workers[0].refresh() is True
+        assert workers[0].filter(users) == users
+        store.close()
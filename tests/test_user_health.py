@@ -0,0 +1,67 @@
+from bot.src.application.user_health import UserHealthTracker, CLOSED, OPEN, HALF_OPEN, PARKED
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestUserHealthTracker:
+    """Тесты circuit breaker пользователей"""
+
+    def _tracker(self, clock, token_version=None):
+        return UserHealthTracker(token_version, base_delay=10, max_delay=40, failure_threshold=2, clock=clock)
+
+    def test_opens_after_threshold_with_growing_pause(self):
+        """Цепь размыкается после порога ошибок, пауза растёт до max_delay"""
+        clock = FakeClock()
+        tracker = self._tracker(clock)
+        tracker.record_failure(1, 'HTTP 503')
+        assert tracker.allow(1) and tracker.state(1) == CLOSED
+
+        tracker.record_failure(1, 'HTTP 503')
+        assert tracker.state(1) == OPEN
+        assert not tracker.allow(1)
+
+        pauses = []
+        for _ in range(4):
+            retry_at = tracker._users[1].retry_at
+            pauses.append(retry_at - clock.now)
+            clock.now = retry_at
+            assert tracker.allow(1) and tracker.state(1) == HALF_OPEN
+            assert not tracker.allow(1)
+            tracker.record_failure(1, 'HTTP 503')
+
+        assert pauses == [10, 20, 40, 40]
+
+    def test_half_open_success_closes(self):
+        """Успешная пробная попытка возвращает пользователя в обычный опрос"""
+        clock = FakeClock()
+        tracker = self._tracker(clock)
+        tracker.record_failure(1, 'HTTP 429')
+        tracker.record_failure(1, 'HTTP 429')
+        clock.now = 10
+
+        assert tracker.allow(1)
+        tracker.record_success(1)
+
+        assert tracker.state(1) == CLOSED
+        assert tracker.backing_off() == []
+
+    def test_parked_until_new_token(self):
+        """Запаркованный пользователь не опрашивается, пока не сохранён новый токен"""
+        versions = {1: 1}
+        tracker = self._tracker(FakeClock(), token_version=versions.get)
+        tracker.park(1, 'invalid_grant')
+        tracker.record_failure(1, 'HTTP 401')
+
+        assert tracker.state(1) == PARKED and not tracker.allow(1)
+        assert tracker.parked() == {1: 'invalid_grant'}
+        assert 'запаркованы 1' in tracker.summary()
+
+        versions[1] = 2
+        assert tracker.allow(1)
+        assert tracker.parked() == {}
@@ -0,0 +1,77 @@
+import json
+import pytest
+from bot.src.domain.repositories.user_store import (
+    FileUserStore, SqliteUserStore, create_user_store, migrate_user_store,
+)
+from bot.src.domain.repositories.state_repository import StateRepository
+
+TOKEN = json.dumps({'token': 'access', 'refresh_token': 'refresh', 'client_id': 'id', 'client_secret': 'secret'})
+
+
+class TestUserStore:
+    """Тесты хранилищ токенов и состояния пользователей"""
+
+    @pytest.fixture(params=['sqlite', 'files'])
+    def store(self, request, tmp_path):
+        if request.param == 'sqlite':
+            store = SqliteUserStore(str(tmp_path / 'state.db'))
+        else:
+            store = FileUserStore(str(tmp_path / 'tokens'))
+        yield store
+        store.close()
+
+    def test_tokens(self, store):
+        """Токен сохраняется, версия меняется при перезаписи, пользователь попадает в список"""
+        assert store.token_version(1) is None
+        store.save_token(1, TOKEN)
+        first_version = store.token_version(1)
+        store.save_token(1, TOKEN.replace('access', 'refreshed'))
+
+        assert store.get_token(1) == TOKEN.replace('access', 'refreshed')
+        assert store.token_version(1) != first_version
+        assert store.connected_users() == [1]
+        assert store.has_token(1) and not store.has_token(2)
+
+    def test_history_ids_batch(self, store):
+        """historyId нескольких пользователей сохраняются одним вызовом"""
+        store.save_history_ids({1: '100', 2: '200'})
+        store.save_history_id(1, '101')
+
+        assert store.get_history_id(1) == '101'
+        assert store.get_history_id(2) == '200'
+        assert store.has_state(2) and not store.has_state(3)
+
+    def test_worker_heartbeats(self, store):
+        """Живыми считаются воркеры с heartbeat не старше порога"""
+        store.heartbeat('w1', 100.0)
+        store.heartbeat('w2', 50.0)
+        store.heartbeat('w2', 120.0)
+        store.heartbeat('w3', 10.0)
+
+        assert store.live_workers(90.0) == ['w1', 'w2']
+        store.remove_worker('w1')
+        assert store.live_workers(90.0) == ['w2']
+
+    def test_sqlite_uses_wal(self, tmp_path):
+        """База SQLite открывается в режиме WAL"""
+        store = SqliteUserStore(str(tmp_path / 'state.db'))
+
+        assert store._conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+        store.close()
+
+    def test_migration_from_files(self, tmp_path):
+        """Пустая база при создании заполняется из каталога токенов"""
+        files = FileUserStore(str(tmp_path / 'tokens'))
+        files.save_token(1, TOKEN)
+        files.save_token(2, TOKEN)
+        files.save_history_id(1, '100')
+        (tmp_path / 'tokens' / 'notes.json').write_text('{}')
+
+        store = create_user_store('sqlite', str(tmp_path / 'state.db'), str(tmp_path / 'tokens'))
+
+        assert store.connected_users() == [1, 2]
+        assert store.get_token(2) == TOKEN
+        assert StateRepository(store).get(1).last_history_id == '100'
+        assert StateRepository(store).get(2) is None
+        assert migrate_user_store(files, store) == (2, 1)
+        store.close()